@@ -0,0 +1,102 @@
+"""Compares float32 and float64 lattices on speed and accuracy.
+
+Each model is run in both precisions from the same initial state. The
+report gives the time per step of each mode, and how far the float32 run
+drifts from the float64 run: the largest absolute difference of the state
+and of the mean field, and the first step at which any site differs by
+more than the tolerance.
+
+Usage:
+    python benchmarks/precision.py -n 256 -t 200
+"""
+from __future__ import annotations
+
+import time
+from argparse import ArgumentParser
+
+import numpy as np
+from cmlattice import CoupledMapLattice
+from cmlattice import KanekoLattice
+from cmlattice import RulkovLattice
+
+MODELS = {
+    'cml': lambda n, dtype: CoupledMapLattice(
+        n, 3.9, 0.4, retention='none', dtype=dtype,
+    ),
+    'kaneko': lambda n, dtype: KanekoLattice(
+        n, 1.5, 0.4, retention='none', dtype=dtype,
+    ),
+    'rulkov': lambda n, dtype: RulkovLattice(
+        n, 4.1, 0.001, -1.0, 0.5, retention='none', dtype=dtype,
+    ),
+}
+
+
+def compare(key: str, n: int, steps: int, tolerance: float) -> dict:
+    """Runs one model in both precisions and compares the runs."""
+    double = MODELS[key](n, np.float64)
+    single = MODELS[key](n, np.float32)
+    single.state = double.state.astype(np.float32)
+
+    timings = {}
+    for lattice in (double, single):
+        start = time.perf_counter()
+        for _ in range(steps):
+            lattice._step()
+        timings[lattice.dtype.name] = (time.perf_counter() - start) / steps
+
+    double = MODELS[key](n, np.float64)
+    single = MODELS[key](n, np.float32)
+    single.state = double.state.astype(np.float32)
+    max_error = mean_error = 0.0
+    diverged = None
+    for t in range(1, steps + 1):
+        double._step()
+        single._step()
+        error = np.abs(double._frame() - single._frame())
+        max_error = max(max_error, float(np.nanmax(error)))
+        mean_error = max(
+            mean_error,
+            abs(float(double._frame().mean() - single._frame().mean())),
+        )
+        if diverged is None and max_error > tolerance:
+            diverged = t
+
+    return {
+        'model': key,
+        'float64_ms': 1e3 * timings['float64'],
+        'float32_ms': 1e3 * timings['float32'],
+        'speedup': timings['float64'] / timings['float32'],
+        'max_error': max_error,
+        'mean_field_error': mean_error,
+        'diverged_at': diverged,
+    }
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-n', type=int, default=256, help='Lattice size.')
+    parser.add_argument('-t', '--time', type=int, default=200, help='Number of steps.')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=1e-3,
+        help='Site difference that counts as diverged.',
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'model':<8}{'f64 ms':>10}{'f32 ms':>10}{'speedup':>9}"
+        f"{'max err':>11}{'mean err':>11}{'diverged':>10}",
+    )
+    for key in MODELS:
+        row = compare(key, args.n, args.time, args.tolerance)
+        print(
+            f"{row['model']:<8}{row['float64_ms']:>10.3f}{row['float32_ms']:>10.3f}"
+            f"{row['speedup']:>9.2f}{row['max_error']:>11.2e}"
+            f"{row['mean_field_error']:>11.2e}{row['diverged_at'] or '-':>10}",
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,41 @@
 from __future__ import annotations
 
-from .cli import main
+import importlib
+
 from .cmlattice import CoupledMapLattice
+from .ensemble import CoupledMapEnsemble
+from .ensemble import KanekoEnsemble
+from .ensemble import RulkovEnsemble
+from .history import load_history
 from .kaneko import KanekoLattice
 from .rulkov import RulkovLattice
-from .viz import Visualization
+
+# Loaded on first use, so the lattices import without matplotlib and Pillow.
+_LAZY = {
+    'Visualization': 'viz',
+    'main': 'cli',
+}
 
 __all__ = [
     'CoupledMapLattice',
+    'CoupledMapEnsemble',
+    'KanekoEnsemble',
+    'RulkovEnsemble',
     'Visualization',
     'KanekoLattice',
     'RulkovLattice',
+    'load_history',
     'main',
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY:
+        value = getattr(importlib.import_module(f".{_LAZY[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
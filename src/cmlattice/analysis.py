@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import numpy as np
+
+WINDOWS = ('hann', 'boxcar')
+
+
+def structure_factor(history, chunk: int = 256) -> np.ndarray:
+    """Computes the time-averaged structure factor of a history.
+
+    The structure factor is the spatial power spectrum of the fluctuations
+    of every frame around its spatial mean, `|fft2(x - mean(x))|**2 / N`
+    for `N` sites, averaged over time. Frames are transformed `chunk` at a
+    time with one batched real FFT, so memory is bounded by the chunk and
+    histories can be memory-mapped files or archives. Its mean over all
+    wavevectors is the mean spatial variance.
+
+    Args:
+        history (np.ndarray | Archive | CoupledMapLattice): A `(T, ..., n, n)`
+            history, or a lattice whose history is used. The history of a
+            Rulkov lattice holds its `x` plane.
+        chunk (int): The number of frames transformed at once. Defaults to 256.
+
+    Returns:
+        np.ndarray: The `(..., n, n)` structure factor, indexed by
+            wavevector in `np.fft.fftfreq` order, with the leading axes of
+            an ensemble history.
+    """
+    history = _history(history)
+    half = _power(history, chunk)
+    n, m = history.shape[-2:]
+    full = np.empty((*half.shape[:-1], m))
+    full[..., :half.shape[-1]] = half
+    # The spectrum of real frames is symmetric, S(-k) = S(k).
+    rows = -np.arange(n) % n
+    cols = m - np.arange(half.shape[-1], m)
+    full[..., half.shape[-1]:] = half[..., rows, :][..., cols]
+    return full
+
+
+def spatial_correlation(history, chunk: int = 256) -> np.ndarray:
+    """Computes the time-averaged spatial correlation function of a history.
+
+    The correlation between sites `d` apart is the mean product of the
+    fluctuations of every frame around its spatial mean, over all pairs of
+    sites `d` apart on the periodic lattice and all frames, divided by the
+    mean spatial variance. It is the inverse transform of the structure
+    factor, computed in time chunks like `structure_factor`.
+
+    Args:
+        history (np.ndarray | Archive | CoupledMapLattice): A `(T, ..., n, n)`
+            history, or a lattice whose history is used.
+        chunk (int): The number of frames transformed at once. Defaults to 256.
+
+    Returns:
+        np.ndarray: The `(..., n, n)` correlations, indexed by the periodic
+            displacement `(dy, dx)`, so the correlation of a site with itself
+            is at `[..., 0, 0]` and is 1. It is NaN for lattices with no
+            spatial fluctuations.
+    """
+    history = _history(history)
+    half = _power(history, chunk)
+    covariance = np.fft.irfft2(half, s=history.shape[-2:])
+    variance = covariance[..., :1, :1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return covariance / variance
+
+
+def power_spectrum(
+    history,
+    segment: int = 256,
+    overlap: float = 0.5,
+    window: str = 'hann',
+    spacing: float = 1.0,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Estimates the temporal power spectrum of the sites of a history.
+
+    The spectrum is estimated with Welch's method: the history is split
+    into segments of `segment` frames overlapping by the fraction
+    `overlap`, the mean of every site over a segment is removed, and the
+    windowed segments are transformed along the time axis with one batched
+    real FFT each. The one-sided power spectral densities are averaged
+    over all segments and sites. Only one segment is held at a time, so
+    memory is bounded by the segment length.
+
+    Args:
+        history (np.ndarray | Archive | CoupledMapLattice): A `(T, ..., n, n)`
+            history, or a lattice whose history is used.
+        segment (int): The number of frames of each segment. Defaults to
+            256, or the length of the history if it is shorter.
+        overlap (float): The overlapping fraction of consecutive segments,
+            in `[0, 1)`. Defaults to 0.5.
+        window (str): The window applied to each segment, `'hann'` or
+            `'boxcar'`. Defaults to `'hann'`.
+        spacing (float): The number of steps between frames, such as the
+            `every` of the run. Defaults to 1.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The frequencies in cycles per step,
+            and the `(..., segment // 2 + 1)` power spectral densities,
+            with the leading axes of an ensemble history.
+    """
+    if window not in WINDOWS:
+        raise ValueError(f"Window must be one of {WINDOWS}.")
+    if not 0 <= overlap < 1:
+        raise ValueError('Overlap must be in [0, 1).')
+    if segment < 1 or spacing <= 0:
+        raise ValueError('Segment and spacing must be positive.')
+    history = _history(history)
+    frames = len(history)
+    if frames == 0:
+        raise ValueError('The history is empty.')
+    segment = min(segment, frames)
+    hop = max(1, segment - int(overlap * segment))
+    starts = range(0, frames - segment + 1, hop)
+
+    weights = np.ones(segment)
+    if window == 'hann':
+        weights = 0.5 - 0.5 * np.cos(2 * np.pi * np.arange(segment) / segment)
+    batch = history.shape[1:-2]
+    weights = weights.reshape((segment,) + (1,) * (len(batch) + 2))
+    dtype = _dtype(history)
+    total = np.zeros((segment // 2 + 1, *batch))
+    for start in starts:
+        block = np.array(history[start:start + segment], dtype=dtype)
+        block -= block.mean(axis=0)
+        block *= weights
+        spectrum = np.fft.rfft(block, axis=0)
+        power = np.abs(spectrum, out=np.empty(spectrum.shape, dtype))
+        power *= power
+        total += power.sum(axis=(-2, -1))
+
+    sites = history.shape[-2] * history.shape[-1]
+    total *= spacing / (len(starts) * sites * np.sum(weights**2))
+    # Fold the negative frequencies onto the positive ones.
+    total[1:segment - segment // 2] *= 2
+    return np.fft.rfftfreq(segment, spacing), np.moveaxis(total, 0, -1)
+
+
+def radial_average(field: np.ndarray) -> np.ndarray:
+    """Averages a spectrum or correlation function over shells of equal radius.
+
+    Args:
+        field (np.ndarray): A `(..., n, n)` array indexed by periodic offset,
+            such as the result of `structure_factor` or `spatial_correlation`.
+
+    Returns:
+        np.ndarray: The `(..., r)` means over the offsets whose length
+            rounds to `0, 1, ..., r - 1`, in sites or wavevector indices.
+    """
+    n, m = field.shape[-2:]
+    rows = np.minimum(np.arange(n), n - np.arange(n))
+    cols = np.minimum(np.arange(m), m - np.arange(m))
+    radius = np.rint(np.hypot(rows[:, None], cols[None, :])).astype(np.intp).ravel()
+    counts = np.bincount(radius)
+    flat = field.reshape(-1, n * m)
+    sums = np.stack([np.bincount(radius, weights=values) for values in flat])
+    return (sums / counts).reshape((*field.shape[:-2], len(counts)))
+
+
+def _power(history, chunk: int) -> np.ndarray:
+    """Returns the time-averaged `|rfft2|**2 / N` of the spatial fluctuations."""
+    if chunk < 1:
+        raise ValueError('Chunk must be a positive integer.')
+    frames = len(history)
+    if frames == 0:
+        raise ValueError('The history is empty.')
+    n, m = history.shape[-2:]
+    dtype = _dtype(history)
+    total = np.zeros((*history.shape[1:-1], m // 2 + 1))
+    for start in range(0, frames, chunk):
+        block = np.array(history[start:start + chunk], dtype=dtype)
+        block -= block.mean(axis=(-2, -1), keepdims=True)
+        spectrum = np.fft.rfft2(block)
+        power = np.abs(spectrum, out=np.empty(spectrum.shape, dtype))
+        power *= power
+        total += power.sum(axis=0)
+    total /= frames * n * m
+    return total
+
+
+def _history(source):
+    """Returns the history of a lattice, or the source if it is a history."""
+    if hasattr(source, 'shape') and hasattr(source, '__getitem__'):
+        return source
+    if hasattr(source, 'history'):
+        return source.history
+    return np.asarray(source)
+
+
+def _dtype(history) -> np.dtype:
+    """Returns the floating dtype the frames of a history are transformed in."""
+    return np.result_type(history.dtype, np.float32)
+
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import json
+import lzma
+import operator
+import os
+import struct
+import zlib
+from collections.abc import Iterable
+from collections.abc import Iterator
+from typing import Self
+
+import numpy as np
+
+from .history import neuron_trace
+
+MAGIC = b'CMLARC01'
+CODECS = ('zlib', 'lzma', 'none')
+_FOOTER = struct.Struct('<Q8s')
+_PLANE = struct.Struct('<BQ')
+
+
+class ArchiveWriter:
+    """Writes frames to a compressed, chunked archive as they arrive.
+
+    The frames are split into chunks of `chunk` frames, and each chunk into
+    blocks of `rows` rows, so a time window or a few neurons can be read
+    back without decompressing the rest. Each block is encoded with:
+
+    * optional quantization, either to float16 or to fixed point with a
+      step of `precision`, stored as integers;
+    * temporal delta encoding, the XOR of the bits of consecutive frames,
+      or their difference for fixed point, which zeroes the bytes that do
+      not change;
+    * a byte shuffle, which groups the bytes of equal significance;
+    * zlib or lzma compression of each group of bytes, which are stored
+      raw when they do not compress.
+
+    Without quantization the archive is lossless. The index of the blocks
+    is written at the end of the file by `close`.
+
+    Attributes:
+        path (str | os.PathLike): The path of the archive.
+        shape (tuple[int, ...]): The shape of a frame.
+        dtype (np.dtype): The dtype of the frames.
+        count (int): The number of frames written.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        shape: tuple[int, ...],
+        dtype: np.dtype = np.float64,
+        chunk: int = 64,
+        rows: int | None = None,
+        precision: str | float | None = None,
+        delta: bool = True,
+        codec: str = 'zlib',
+        level: int = 1,
+    ) -> None:
+        """Creates the archive.
+
+        Args:
+            path (str | os.PathLike): The path of the archive.
+            shape (tuple[int, ...]): The shape of a frame, `(..., n, n)`.
+            dtype (np.dtype): The dtype of the frames. Defaults to `np.float64`.
+            chunk (int): The number of frames per chunk. Defaults to 64.
+            rows (int | None): The number of rows per block. Defaults to
+                about 4096 sites per frame of a block.
+            precision (str | float | None): `'float16'`, a fixed-point step
+                such as `1e-6`, or None to store the frames exactly.
+                Defaults to None.
+            delta (bool): Whether to delta encode consecutive frames.
+                Defaults to True.
+            codec (str): One of `'zlib'`, `'lzma'` or `'none'`. Defaults to `'zlib'`.
+            level (int): The compression level. Defaults to 1, the fastest.
+        """
+        if len(shape) < 2:
+            raise ValueError('Frames must have at least two dimensions.')
+        if chunk < 1:
+            raise ValueError('Chunk must be a positive integer.')
+        if codec not in CODECS:
+            raise ValueError(f"Codec must be one of {CODECS}.")
+        fixed = isinstance(precision, (int, float)) and precision > 0
+        if precision is not None and precision != 'float16' and not fixed:
+            raise ValueError("Precision must be 'float16' or a positive step.")
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        n = self.shape[-2]
+        rows = rows or max(1, 4096 // (int(np.prod(self.shape)) // n))
+        self.count = 0
+        self._meta = {
+            'shape': list(self.shape),
+            'dtype': self.dtype.str,
+            'chunk': chunk,
+            'rows': min(rows, n),
+            'precision': precision,
+            'delta': delta,
+            'codec': codec,
+        }
+        self._level = level
+        self._blocks = []
+        self._frames = np.empty((chunk, *self.shape), dtype=self.dtype)
+        self._filled = 0
+        self._file = open(path, 'wb')  # noqa: SIM115 - open until close().
+        try:
+            self._file.write(MAGIC)
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __repr__(self) -> str:
+        return f"ArchiveWriter(path={self.path!r}, frames={self.count})"
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if exc[0] is None:
+            self.close()
+        else:
+            # Without its index, the archive of a failed run cannot be loaded.
+            self._file.close()
+
+    def append(self, frame: np.ndarray) -> None:
+        """Appends a frame.
+
+        Args:
+            frame (np.ndarray): The frame to append.
+        """
+        if np.shape(frame) != self.shape:
+            raise ValueError(f"Frame must be of shape {self.shape}.")
+        self._frames[self._filled] = frame
+        self._filled += 1
+        self.count += 1
+        if self._filled == len(self._frames):
+            self._write_chunk()
+
+    def extend(self, frames: Iterable[np.ndarray]) -> None:
+        """Appends frames.
+
+        Args:
+            frames (Iterable[np.ndarray]): The frames to append.
+        """
+        for frame in frames:
+            self.append(frame)
+
+    def close(self) -> None:
+        """Writes the last chunk and the index, and closes the file."""
+        if self._file.closed:
+            return
+        if self._filled:
+            self._write_chunk()
+        index = self._file.tell()
+        meta = {**self._meta, 'frames': self.count, 'blocks': self._blocks}
+        self._file.write(json.dumps(meta).encode())
+        self._file.write(_FOOTER.pack(index, MAGIC))
+        self._file.close()
+
+    def _write_chunk(self) -> None:
+        """Encodes the buffered frames block by block and writes them."""
+        frames = self._frames[:self._filled]
+        rows = self._meta['rows']
+        for start in range(0, self.shape[-2], rows):
+            data = _encode(frames[..., start:start + rows, :], self._meta, self._level)
+            self._blocks.append([self._file.tell(), len(data)])
+            self._file.write(data)
+        self._filled = 0
+
+
+class Archive:
+    """A read-only, lazily decoded view of a compressed archive.
+
+    Archives index like a `(T, ..., n, n)` history: integers and slices
+    along the time axis only decode the chunks they cover, and
+    `neuron_trace` or `trace` only decode the blocks holding the requested
+    neurons. Iterating yields the frames a chunk at a time, so archives
+    can be passed to `Visualization`, `FrameEncoder` and the analysis
+    functions without loading them.
+
+    Attributes:
+        path (str | os.PathLike): The path of the archive.
+        shape (tuple[int, ...]): The `(T, ..., n, n)` shape of the history.
+        dtype (np.dtype): The dtype of the frames.
+        ndim (int): The number of dimensions of the history.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        """Opens an archive and reads its index.
+
+        Args:
+            path (str | os.PathLike): The path of the archive.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a lattice archive.")
+            end = f.seek(0, os.SEEK_END) - _FOOTER.size
+            magic = None
+            if end >= len(MAGIC):
+                f.seek(end)
+                index, magic = _FOOTER.unpack(f.read(_FOOTER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Archive {path} was not closed.")
+            f.seek(index)
+            self._meta = json.loads(f.read(end - index))
+        self._frame_shape = tuple(self._meta['shape'])
+        self.shape = (self._meta['frames'], *self._frame_shape)
+        self.dtype = np.dtype(self._meta['dtype'])
+        self.ndim = len(self.shape)
+        self._chunk = self._meta['chunk']
+        self._rows = self._meta['rows']
+        self._per_chunk = -(-self._frame_shape[-2] // self._rows)
+        self._cached = (None, None)
+
+    def __repr__(self) -> str:
+        return f"Archive(path={self.path!r}, shape={self.shape})"
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for start in range(0, len(self), self._chunk):
+            yield from self._read_chunk(start // self._chunk)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        return self.read().astype(dtype or self.dtype, copy=False)
+
+    def __getitem__(self, key):
+        """Reads frames or sites, decoding only the chunks and blocks they cover."""
+        if (
+            isinstance(key, tuple)
+            and len(key) == 3
+            and key[0] is Ellipsis
+            and not any(isinstance(k, slice) or k is None for k in key[1:])
+        ):
+            return self._sites(key[1], key[2])
+        key = key if isinstance(key, tuple) else (key,)
+        time, rest = key[0], key[1:]
+        if time is Ellipsis:
+            time, rest = slice(None), key
+        if isinstance(time, slice):
+            times = range(*time.indices(len(self)))
+            if not times:
+                frames = np.empty((0, *self._frame_shape), dtype=self.dtype)
+            else:
+                low, high = min(times[0], times[-1]), max(times[0], times[-1])
+                frames = self.read(low, high + 1)[times.start - low::times.step]
+        else:
+            t = operator.index(time)
+            t += len(self) if t < 0 else 0
+            if not 0 <= t < len(self):
+                raise IndexError(f"Time {time} is out of range for {len(self)} frames.")
+            frames = self.read(t, t + 1)[0]
+        return frames[rest] if rest else frames
+
+    def read(self, start: int = 0, stop: int | None = None) -> np.ndarray:
+        """Reads a window of consecutive frames.
+
+        Args:
+            start (int): The first frame. Defaults to 0.
+            stop (int | None): The frame after the last. Defaults to the end.
+
+        Returns:
+            np.ndarray: The `(stop - start, ..., n, n)` frames.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return np.empty((0, *self._frame_shape), dtype=self.dtype)
+        first, last = start // self._chunk, (stop - 1) // self._chunk
+        frames = np.concatenate([self._read_chunk(c) for c in range(first, last + 1)])
+        offset = first * self._chunk
+        return frames[start - offset:stop - offset]
+
+    def trace(self, neurons) -> np.ndarray:
+        """Reads the time series of neurons, decoding only their row blocks.
+
+        Args:
+            neurons (tuple[int, int] | Sequence[tuple[int, int]]): The
+                `(i, j)` index of a neuron, or a sequence of them.
+
+        Returns:
+            np.ndarray: The time series, as returned by `neuron_trace`.
+        """
+        return neuron_trace(self, neurons)
+
+    def _sites(self, rows, cols) -> np.ndarray:
+        """Reads the values of sites at every time, as `history[..., rows, cols]`."""
+        n = self._frame_shape[-2]
+        rows = np.asarray(rows) % n
+        blocks = np.unique(rows // self._rows).tolist()
+        # Map every row to its position among the rows of the decoded blocks.
+        position = np.searchsorted(blocks, rows // self._rows) * self._rows + rows % self._rows
+        values = []
+        for c in range(-(-len(self) // self._chunk)):
+            decoded = np.concatenate(
+                [self._read_block(c, block) for block in blocks],
+                axis=-2,
+            )
+            values.append(decoded[..., position, cols])
+        return np.concatenate(values)
+
+    def _read_chunk(self, c: int) -> np.ndarray:
+        """Decodes every block of a chunk, keeping the last chunk read."""
+        if self._cached[0] != c:
+            blocks = [self._read_block(c, block) for block in range(self._per_chunk)]
+            frames = np.concatenate(blocks, axis=-2)
+            frames.flags.writeable = False
+            self._cached = (c, frames)
+        return self._cached[1]
+
+    def _read_block(self, c: int, block: int) -> np.ndarray:
+        """Reads and decodes one block of a chunk."""
+        offset, length = self._meta['blocks'][c * self._per_chunk + block]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        frames = min(self._chunk, len(self) - c * self._chunk)
+        n = self._frame_shape[-2]
+        rows = min(self._rows, n - block * self._rows)
+        shape = (frames, *self._frame_shape[:-2], rows, self._frame_shape[-1])
+        return _decode(data, shape, self.dtype, self._meta)
+
+
+def save_archive(
+    path: str | os.PathLike,
+    history: np.ndarray | Iterable[np.ndarray],
+    **options,
+) -> None:
+    """Writes a history to a compressed, chunked archive.
+
+    Args:
+        path (str | os.PathLike): The path of the archive.
+        history (np.ndarray | Iterable[np.ndarray]): The history, such as
+            `lattice.history` or `load_history(path)`, or an iterable of frames.
+        **options: The options of `ArchiveWriter`, such as `precision`,
+            `delta`, `codec` and `chunk`.
+    """
+    frames = iter(history)
+    first = np.asarray(next(frames))
+    with ArchiveWriter(path, first.shape, first.dtype, **options) as writer:
+        writer.append(first)
+        writer.extend(frames)
+
+
+def load_archive(path: str | os.PathLike) -> Archive:
+    """Opens a compressed archive as a lazy, read-only history.
+
+    Args:
+        path (str | os.PathLike): The path of the archive.
+
+    Returns:
+        Archive: The archive, indexed like a `(T, ..., n, n)` array.
+    """
+    return Archive(path)
+
+
+def _encode(frames: np.ndarray, meta: dict, level: int) -> bytes:
+    """Quantizes, delta encodes, shuffles and compresses a block of frames."""
+    precision = meta['precision']
+    if precision == 'float16':
+        values = frames.astype(np.float16)
+    elif precision is not None:
+        if not np.isfinite(frames).all():
+            raise ValueError('Fixed-point archives cannot store NaN or infinite values.')
+        values = np.rint(frames / precision)
+        if values.size and np.abs(values).max() >= 2.0**63:
+            raise ValueError('Values are too large for fixed point with this precision.')
+        values = values.astype(np.int64)
+    else:
+        values = np.ascontiguousarray(frames)
+    bits = values.view(f"u{values.itemsize}")
+    if meta['delta'] and len(bits) > 1:
+        bits = bits.copy()
+        if precision is not None and precision != 'float16':
+            bits[1:] -= bits[:-1].copy()
+        else:
+            bits[1:] ^= bits[:-1].copy()
+    planes = bits.view(np.uint8).reshape(-1, bits.itemsize).T
+    return b''.join(_compress(plane.tobytes(), meta['codec'], level) for plane in planes)
+
+
+def _decode(data: bytes, shape: tuple[int, ...], dtype: np.dtype, meta: dict) -> np.ndarray:
+    """Reverses `_encode` for a block of the given shape."""
+    precision = meta['precision']
+    if precision == 'float16':
+        stored = np.dtype(np.float16)
+    elif precision is not None:
+        stored = np.dtype(np.int64)
+    else:
+        stored = dtype
+    shuffled = np.empty((stored.itemsize, int(np.prod(shape))), dtype=np.uint8)
+    offset = 0
+    for plane in shuffled:
+        offset = _decompress(data, offset, meta['codec'], plane)
+    bits = np.ascontiguousarray(shuffled.T).view(f"u{stored.itemsize}").reshape(shape)
+    if meta['delta']:
+        if precision is not None and precision != 'float16':
+            np.cumsum(bits, axis=0, out=bits)
+        else:
+            np.bitwise_xor.accumulate(bits, axis=0, out=bits)
+    values = bits.view(stored)
+    if precision is not None and precision != 'float16':
+        return (values * precision).astype(dtype)
+    return values.astype(dtype, copy=False)
+
+
+def _compress(data: bytes, codec: str, level: int) -> bytes:
+    """Compresses one byte plane, prefixed with its flag and length.
+
+    Planes whose first 64 KiB do not shrink by a tenth, such as the low
+    mantissa bytes of chaotic states, are stored raw, which skips most of
+    the cost of compressing them.
+    """
+    if codec != 'none':
+        sample = data[:1 << 16]
+        compress = zlib.compress if codec == 'zlib' else lzma.compress
+        options = {'level': level} if codec == 'zlib' else {'preset': level}
+        if len(compress(sample, **options)) < 0.9 * len(sample):
+            data = compress(data, **options)
+            return _PLANE.pack(1, len(data)) + data
+    return _PLANE.pack(0, len(data)) + data
+
+
+def _decompress(data: bytes, offset: int, codec: str, out: np.ndarray) -> int:
+    """Decodes the byte plane at `offset` into `out` and returns the next offset."""
+    compressed, length = _PLANE.unpack_from(data, offset)
+    start = offset + _PLANE.size
+    plane = data[start:start + length]
+    if compressed:
+        plane = zlib.decompress(plane) if codec == 'zlib' else lzma.decompress(plane)
+    out[:] = np.frombuffer(plane, dtype=np.uint8)
+    return start + length
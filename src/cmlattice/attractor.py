@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from collections import deque
+
+import numpy as np
+
+from .observers import Observer
+
+
+class AttractorDetector(Observer):
+    """Detects when a lattice settles on a fixed point or a periodic orbit.
+
+    Every `interval`-th recorded state is quantized to a grid of spacing
+    `tolerance` and hashed to a fingerprint, the dot product of the integer
+    cells with fixed random odd weights, wrapping modulo 2**64. The
+    arithmetic is exact, so states that differ by a single cell always get
+    different fingerprints, whatever the size of the lattice and the
+    tolerance. The fingerprints of the last `max_period` checked
+    states are kept in a bounded cache. A state whose fingerprint is in
+    the cache repeats an earlier state, so the lattice may be on a cycle
+    whose period is the time between them. Once `confirm` consecutive
+    checked states repeat with the same period, the cycle is reported.
+    Every state is hashed on two grids offset by half a cell. Two states
+    match on a grid only if every site falls in the same cell, so a single
+    site within half the tolerance of its earlier value always matches on
+    one of the grids, but on a lattice each grid can split a different
+    site, and nearby states then match on neither. States with values
+    that do not fit on the grid, such as the NaN or infinite values of a
+    diverged run, are not hashed and never repeat.
+
+    A check costs a little more than one update of the logistic lattice,
+    so raise `interval` to check less often. Only periods that are multiples
+    of the time between checks are seen, so the reported period may be a
+    multiple of the period of the orbit, which does not affect stopping
+    or extrapolating.
+
+    Pass a detector to `CoupledMapLattice.simulate` or `advance` to stop
+    the run when the lattice is on a cycle, or with `extrapolate=True` to
+    fill in the remaining recorded states from the cycle instead of
+    simulating them. Attached with `add_observer`, it only reports. The
+    whole state is hashed, including the slow variable of Rulkov lattices.
+
+    For ensembles, every member is detected on its own, and the run stops
+    once all of them are on a cycle.
+
+    Attributes:
+        tolerance (float): The spacing of the quantization grid.
+        max_period (int): The number of checked states kept in the cache,
+            which is the longest period detected, in checks.
+        confirm (int): The number of consecutive repeats needed.
+        interval (int): The number of recorded states between checks.
+        extrapolate (bool): Whether a run fills in the remaining recorded
+            states from the cycle instead of stopping.
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 1e-9,
+        max_period: int = 64,
+        confirm: int = 2,
+        interval: int = 1,
+        extrapolate: bool = False,
+    ) -> None:
+        """Initializes the detector.
+
+        Args:
+            tolerance (float): The spacing of the quantization grid.
+                Defaults to `1e-9`.
+            max_period (int): The longest period detected, in checks.
+                Defaults to 64.
+            confirm (int): The number of consecutive repeats needed.
+                Defaults to 2.
+            interval (int): The number of recorded states between checks.
+                Defaults to 1, which checks every recorded state.
+            extrapolate (bool): Whether a run fills in the remaining
+                recorded states from the cycle. Defaults to False, which
+                stops the run.
+        """
+        if tolerance <= 0:
+            raise ValueError('Tolerance must be positive.')
+        if max_period < 1 or confirm < 1 or interval < 1:
+            raise ValueError('Max period, confirm and interval must be positive integers.')
+        self.tolerance = tolerance
+        self.max_period = max_period
+        self.confirm = confirm
+        self.interval = interval
+        self.extrapolate = extrapolate
+        self._period = np.full((), -1, dtype=np.int64)
+        self._onset = np.full((), -1, dtype=np.int64)
+
+    def __repr__(self) -> str:
+        return f"AttractorDetector(tolerance={self.tolerance}, period={self.period})"
+
+    @property
+    def detected(self) -> bool:
+        """Returns whether the lattice, or every member, is on a cycle."""
+        return bool((self._period > 0).all())
+
+    @property
+    def period(self) -> np.ndarray | int:
+        """Returns the period of the cycle in steps, or -1 if none was detected."""
+        return self._period[()]
+
+    @property
+    def periods(self) -> np.ndarray:
+        """Returns the `(members,)` periods of every lattice, flattened, or -1."""
+        return self._period.reshape(-1)
+
+    @property
+    def onset(self) -> np.ndarray | int:
+        """Returns the time of the first checked state on the cycle, or -1."""
+        return self._onset[()]
+
+    def start(self, lattice, steps: int) -> None:
+        """Clears the cache and the detected cycles."""
+        batch = lattice._frame().shape[:-2]
+        members = int(np.prod(batch, dtype=np.intp))
+        size = lattice._state.size // members
+        self._period = np.full(batch, -1, dtype=np.int64)
+        self._onset = np.full(batch, -1, dtype=np.int64)
+        self._caches = [{} for _ in range(members)]
+        self._entries = deque()
+        self._candidate = np.zeros(members, dtype=np.int64)
+        self._streak = np.zeros(members, dtype=np.int64)
+        self._first = np.zeros(members, dtype=np.int64)
+        self._calls = 0
+        self._grids = np.empty((2, members, size))
+        self._cells = np.empty((2, members, size), dtype=np.int64)
+        # Odd weights are invertible modulo 2**64, so no single cell cancels out.
+        weights = np.random.default_rng(0).integers(0, 2**63, size, dtype=np.uint64)
+        self._weights = weights * np.uint64(2) + np.uint64(1)
+        self._hashes = np.empty((2, members), dtype=np.uint64)
+
+    def __call__(self, lattice) -> None:
+        """Hashes the latest state and checks it against the cache."""
+        if not hasattr(self, '_caches'):
+            self.start(lattice, 0)
+        self._calls += 1
+        if self._calls % self.interval:
+            return
+        time = lattice.time
+        period = self._period.reshape(-1)
+        onset = self._onset.reshape(-1)
+        hashes, valid = self._hash(lattice._state.reshape(len(self._caches), -1))
+        hashes = hashes.tolist()
+        keys = []
+        for m, cache in enumerate(self._caches):
+            if period[m] > 0:
+                keys.append(())
+                continue
+            if not valid[m]:
+                self._streak[m] = 0
+                keys.append(())
+                continue
+            member = ((0, hashes[0][m]), (1, hashes[1][m]))
+            previous = max(cache.get(member[0], -1), cache.get(member[1], -1))
+            if previous < 0:
+                self._streak[m] = 0
+            elif time - previous == self._candidate[m] and self._streak[m]:
+                self._streak[m] += 1
+            else:
+                self._candidate[m] = time - previous
+                self._streak[m] = 1
+                self._first[m] = time
+            if self._streak[m] >= self.confirm:
+                period[m] = self._candidate[m]
+                onset[m] = self._first[m] - self._candidate[m]
+            for key in member:
+                cache[key] = time
+            keys.append(member)
+        self._entries.append((time, keys))
+        if len(self._entries) > self.max_period:
+            self._evict()
+
+    def _hash(self, state: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the `(2, members)` fingerprints of the state on both grids.
+
+        Also returns which members have every cell in the range of int64.
+        The cells of the others, including NaN and infinite values, are
+        zeroed before the cast instead of taking undefined values.
+        """
+        grids = self._grids
+        np.multiply(state, 1 / self.tolerance, out=grids[0])
+        np.add(grids[0], 0.5, out=grids[1])
+        np.floor(grids, out=grids)
+        # NaN fails both comparisons, so it marks its member as invalid.
+        valid = (grids.max(axis=-1) < 2.0**63) & (grids.min(axis=-1) >= -2.0**63)
+        valid = valid.all(axis=0)
+        if not valid.all():
+            grids[:, ~valid] = 0
+        np.copyto(self._cells, grids, casting='unsafe')
+        cells = self._cells.view(np.uint64)
+        cells *= self._weights
+        return cells.sum(axis=-1, dtype=np.uint64, out=self._hashes), valid
+
+    def _evict(self) -> None:
+        """Drops the hashes of the oldest cached state."""
+        time, keys = self._entries.popleft()
+        for cache, member in zip(self._caches, keys):
+            for key in member:
+                if cache.get(key) == time:
+                    del cache[key]
@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import itertools
+import json
+import os
+import platform
+import time
+import tracemalloc
+from importlib.metadata import version
+
+import numpy as np
+
+from .cmlattice import CoupledMapLattice
+from .kaneko import KanekoLattice
+from .rulkov import RulkovLattice
+
+MODELS = ('cml', 'kaneko', 'rulkov')
+MODES = ('coupled', 'independent')
+HISTORIES = ('on', 'off')
+
+
+def make_lattice(key: str, n: int, mode: str, history: str) -> CoupledMapLattice:
+    """Builds the lattice timed by a benchmark case.
+
+    Args:
+        key (str): The model, one of `'cml'`, `'kaneko'` or `'rulkov'`.
+        n (int): The size of the lattice.
+        mode (str): Either `'coupled'` or `'independent'`.
+        history (str): Either `'on'`, which keeps every state, or `'off'`.
+
+    Returns:
+        CoupledMapLattice: The lattice.
+    """
+    epsilon = 0.4 if mode == 'coupled' else 1
+    retention = 'all' if history == 'on' else 'none'
+    if key == 'kaneko':
+        return KanekoLattice(n, 1.5, epsilon, retention=retention)
+    if key == 'rulkov':
+        return RulkovLattice(n, 4.1, 0.001, -1.0, epsilon, retention=retention)
+    return CoupledMapLattice(n, 3.9, epsilon, retention=retention)
+
+
+def run_benchmark(
+    key: str,
+    n: int,
+    mode: str,
+    history: str,
+    steps: int = 100,
+    repeat: int = 3,
+) -> dict:
+    """Times `simulate` for one benchmark case.
+
+    The best of `repeat` timed runs gives the rate. Peak memory is measured
+    in a separate run under `tracemalloc`, which tracks numpy allocations,
+    so that tracing does not slow down the timed runs.
+
+    Args:
+        key (str): The model, one of `'cml'`, `'kaneko'` or `'rulkov'`.
+        n (int): The size of the lattice.
+        mode (str): Either `'coupled'` or `'independent'`.
+        history (str): Either `'on'` or `'off'`.
+        steps (int): The number of steps of each run. Defaults to 100.
+        repeat (int): The number of timed runs. Defaults to 3.
+
+    Returns:
+        dict: The case, `steps_per_sec` and `peak_memory` in bytes.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        lattice = make_lattice(key, n, mode, history)
+        start = time.perf_counter()
+        for _ in lattice.simulate(steps):
+            pass
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        lattice = make_lattice(key, n, mode, history)
+        tracemalloc.reset_peak()
+        for _ in lattice.simulate(steps):
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'model': key,
+        'n': n,
+        'mode': mode,
+        'history': history,
+        'steps': steps,
+        'steps_per_sec': steps / best,
+        'peak_memory': peak,
+    }
+
+
+def run_suite(
+    models=MODELS,
+    sizes=(64, 256),
+    modes=MODES,
+    histories=HISTORIES,
+    steps: int = 100,
+    repeat: int = 3,
+) -> dict:
+    """Runs every combination of models, sizes, modes and history settings.
+
+    Kaneko lattices are always coupled, so they skip the independent mode.
+
+    Args:
+        models (Sequence[str]): The models to run.
+        sizes (Sequence[int]): The lattice sizes to run.
+        modes (Sequence[str]): The update modes to run.
+        histories (Sequence[str]): The history settings to run.
+        steps (int): The number of steps of each run. Defaults to 100.
+        repeat (int): The number of timed runs per case. Defaults to 3.
+
+    Returns:
+        dict: The `environment` the suite ran in and a list of `results`.
+    """
+    results = [
+        run_benchmark(key, n, mode, history, steps, repeat)
+        for key, n, mode, history in itertools.product(models, sizes, modes, histories)
+        if not (key == 'kaneko' and mode == 'independent')
+    ]
+    return {
+        'environment': {
+            'cmlattice': version('cmlattice'),
+            'numpy': np.__version__,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'processor': platform.processor(),
+            'cpus': os.cpu_count(),
+        },
+        'results': results,
+    }
+
+
+def save_results(path: str | os.PathLike, results: dict) -> None:
+    """Saves benchmark results as JSON.
+
+    Args:
+        path (str | os.PathLike): The path of the JSON file.
+        results (dict): The results returned by `run_suite`.
+    """
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str | os.PathLike) -> dict:
+    """Loads benchmark results saved with `save_results`."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list[dict]:
+    """Finds the cases that got slower between two benchmark runs.
+
+    Args:
+        baseline (dict): The results of the reference run.
+        current (dict): The results of the new run.
+        threshold (float): The relative drop in steps per second that
+            counts as a regression. Defaults to 0.1.
+
+    Returns:
+        list[dict]: One entry per regressed case, with both rates and the
+            relative `change`.
+    """
+    def case(result):
+        return result['model'], result['n'], result['mode'], result['history']
+
+    reference = {case(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = reference.get(case(result))
+        if before is None:
+            continue
+        change = result['steps_per_sec'] / before['steps_per_sec'] - 1
+        if change < -threshold:
+            regressions.append({
+                'model': result['model'],
+                'n': result['n'],
+                'mode': result['mode'],
+                'history': result['history'],
+                'baseline': before['steps_per_sec'],
+                'current': result['steps_per_sec'],
+                'change': change,
+            })
+    return regressions
+
+
+def format_results(results: dict) -> str:
+    """Formats benchmark results as a table."""
+    lines = [
+        f"{'model':<8}{'n':>6}{'mode':>13}{'history':>9}{'steps/s':>12}{'peak MB':>10}",
+    ]
+    for result in results['results']:
+        lines.append(
+            f"{result['model']:<8}{result['n']:>6}{result['mode']:>13}"
+            f"{result['history']:>9}{result['steps_per_sec']:>12.1f}"
+            f"{result['peak_memory'] / 2**20:>10.2f}",
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import shutil
+from importlib import metadata
+from pathlib import Path
+
+import numpy as np
+
+
+class ResultCache:
+    """A content-addressed cache of simulation results on disk.
+
+    A run is identified by the model, its parameters and coupling, the
+    initial state, history and random generator of the lattice, the
+    history options, the burn-in and recording stride, and the version of
+    the code. The initial state and generator follow from the seed, so
+    two lattices built with the same arguments share their results. The
+    number of steps is not part of the key: each run keeps its history and
+    a checkpoint at every length it was run for, so a longer run resumes
+    from the longest cached prefix instead of starting over, and a shorter
+    one resumes from an earlier checkpoint.
+
+    Every run is a directory of the cache. When the cache grows beyond
+    `max_bytes`, the least recently used runs are removed. Files are
+    replaced atomically, so concurrent jobs can share a cache.
+
+    Attributes:
+        directory (Path): The directory of the cache.
+        max_bytes (int): The size the cache is trimmed to after each run.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_bytes: int = 2**30) -> None:
+        """Opens or creates a cache directory.
+
+        Args:
+            directory (str | os.PathLike): The directory of the cache.
+            max_bytes (int): The size the cache is trimmed to. Defaults to 1 GiB.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    def __repr__(self) -> str:
+        return f"ResultCache(directory={str(self.directory)!r}, runs={len(self)})"
+
+    def __len__(self) -> int:
+        return len(self._entries())
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the size of the cached files."""
+        return sum(_size(entry) for entry in self._entries())
+
+    def advance(
+        self,
+        lattice,
+        steps: int,
+        burn_in: int = 0,
+        every: int = 1,
+    ) -> int:
+        """Advances a new lattice like `CoupledMapLattice.advance`, reusing cached runs.
+
+        Afterwards the lattice holds the same state, time, generator and
+        history as if it had been simulated. Steps past the longest cached
+        checkpoint are simulated and added to the cache.
+
+        Args:
+            lattice (CoupledMapLattice): A lattice at time 0, without observers.
+            steps (int): The number of steps to simulate after the burn-in.
+            burn_in (int): The number of steps to run first without
+                recording anything. Defaults to 0.
+            every (int): Only every `every`-th state is recorded. Defaults to 1.
+
+        Returns:
+            int: The number of steps that were simulated.
+        """
+        if lattice.time != 0 or lattice._observers:
+            raise ValueError('Cached runs must start at time 0 without observers.')
+        if lattice._history.mode == 'ring':
+            raise ValueError('Cached runs do not support ring retention.')
+        if burn_in < 0 or every < 1:
+            raise ValueError('Burn-in must be non-negative and every positive.')
+        entry = self.directory / self.key(lattice, burn_in, every)
+        done = self._resume(lattice, entry, steps, every)
+        if done == steps:
+            _touch(entry)
+            return 0
+
+        simulated = 0
+        # Also keep the last recorded step, which later runs can resume from.
+        for length in dict.fromkeys((steps - steps % every, steps)):
+            if length <= done:
+                continue
+            if done:
+                lattice.advance(length - done, every=every)
+                simulated += length - done
+            else:
+                lattice.advance(length, burn_in=burn_in, every=every)
+                simulated += burn_in + length
+            done = length
+            self._store(lattice, entry, length)
+        self._evict(keep=entry)
+        return simulated
+
+    def key(self, lattice, burn_in: int = 0, every: int = 1) -> str:
+        """Returns the key of the runs of a lattice.
+
+        Args:
+            lattice (CoupledMapLattice): The lattice, at the start of its run.
+            burn_in (int): The burn-in of the run. Defaults to 0.
+            every (int): The recording stride of the run. Defaults to 1.
+
+        Returns:
+            str: A hexadecimal digest.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        config = {
+            'model': type(lattice).__name__,
+            'version': _code_version(),
+            'retention': lattice._history.mode,
+            'every': lattice._history.every,
+            'dtype': lattice.dtype.str,
+            'count': lattice._history.count,
+            'run': [burn_in, every],
+        }
+        digest.update(json.dumps(config, sort_keys=True).encode())
+        _digest_params(digest, lattice._params())
+        if lattice.coupling is not None:
+            digest.update(type(lattice.coupling).__name__.encode())
+            _digest_params(digest, lattice.coupling._params())
+        digest.update(json.dumps(lattice.rng.bit_generator.state, sort_keys=True).encode())
+        digest.update(np.ascontiguousarray(lattice._state).tobytes())
+        digest.update(np.ascontiguousarray(lattice.history).tobytes())
+        return digest.hexdigest()
+
+    def clear(self) -> None:
+        """Removes every cached run."""
+        for entry in self._entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def _resume(self, lattice, entry: Path, steps: int, every: int) -> int:
+        """Restores the longest cached prefix of a run and returns its length."""
+        lengths = [
+            int(path.stem) for path in entry.glob('*.npz')
+            if path.stem.isdigit()
+        ]
+        # Later recordings only line up with runs resumed on a recorded step.
+        lengths = [
+            length for length in lengths
+            if length == steps or (length < steps and length % every == 0)
+        ]
+        store = lattice._history
+        for length in sorted(lengths, reverse=True):
+            try:
+                with np.load(entry / f"{length}.npz") as checkpoint:
+                    data = dict(checkpoint)
+                count = int(data['cursor'])
+                kept = 0 if store.mode == 'none' else -(-count // store.every)
+                frames = None
+                if kept:
+                    frames = np.load(entry / 'history.npy', mmap_mode='r')[:kept]
+                    if len(frames) < kept:
+                        continue
+            except (OSError, ValueError, KeyError):
+                continue
+            lattice._restore(data)
+            if frames is not None:
+                store.restore(frames, count)
+            else:
+                store.clear()
+                store.count = count
+            return length
+        return 0
+
+    def _store(self, lattice, entry: Path, length: int) -> None:
+        """Saves the checkpoint of a run, and its history if it is the longest."""
+        entry.mkdir(exist_ok=True)
+        path = entry / 'history.npy'
+        if lattice._history.mode != 'none' and len(lattice.history) > _frames(path):
+            partial = entry / 'history.npy.partial'
+            with open(partial, 'wb') as f:
+                np.save(f, lattice.history)
+            os.replace(partial, path)
+        lattice.save_checkpoint(entry / f"{length}.npz")
+        _touch(entry)
+
+    def _entries(self) -> list[Path]:
+        """Returns the directories of the cached runs."""
+        return [path for path in self.directory.iterdir() if path.is_dir()]
+
+    def _evict(self, keep: Path) -> None:
+        """Removes the least recently used runs until the cache fits `max_bytes`."""
+        entries = []
+        for entry in self._entries():
+            try:
+                entries.append((entry.stat().st_mtime, _size(entry), entry))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda item: item[0]):
+            if total <= self.max_bytes:
+                break
+            if entry != keep:
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+
+
+@functools.cache
+def _code_version() -> str:
+    """Returns the package version and a digest of its source files."""
+    try:
+        version = metadata.version('cmlattice')
+    except metadata.PackageNotFoundError:
+        version = 'unknown'
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(Path(__file__).parent.glob('*.py')):
+        digest.update(path.read_bytes())
+    return f"{version}+{digest.hexdigest()}"
+
+
+def _digest_params(digest, params: dict) -> None:
+    """Adds named arrays to a digest, with their dtypes and shapes."""
+    for name, value in sorted(params.items()):
+        value = np.asarray(value)
+        digest.update(f"{name}:{value.dtype.str}:{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+
+
+def _frames(path: Path) -> int:
+    """Returns the number of frames in a history file, or 0 if there is none."""
+    try:
+        return len(np.load(path, mmap_mode='r'))
+    except (OSError, ValueError):
+        return 0
+
+
+def _size(entry: Path) -> int:
+    """Returns the size of the files of a run."""
+    return sum(path.stat().st_size for path in entry.iterdir() if path.is_file())
+
+
+def _touch(entry: Path) -> None:
+    """Marks a run as recently used."""
+    try:
+        os.utime(entry)
+    except FileNotFoundError:
+        pass
@@ -1,14 +1,174 @@
 from __future__ import annotations
 
+import os
 from argparse import ArgumentParser
 
+import numpy as np
+
+from .attractor import AttractorDetector
+from .bench import compare
+from .bench import format_results
+from .bench import HISTORIES
+from .bench import load_results
+from .bench import MODELS
+from .bench import MODES
+from .bench import run_suite
+from .bench import save_results
+from .cache import ResultCache
 from .cmlattice import CoupledMapLattice
 from .kaneko import KanekoLattice
+from .observers import Checkpointer
+from .pipeline import GifWriter
+from .pipeline import HistoryWriter
+from .pipeline import Pipeline
 from .rulkov import RulkovLattice
-from .viz import Visualization
+from .sweep import lyapunov_sweep
+from .sweep import parameter_grid
+from .sweep import save_sweep
+from .sweep import sweep
+
+
+def _values(text: str) -> list[float]:
+    """Parses a parameter value, or a `start:stop:num` range of values."""
+    if ':' in text:
+        start, stop, num = text.split(':')
+        return np.linspace(float(start), float(stop), int(num)).tolist()
+    return [float(text)]
+
+
+def _flatten(values: list[list[float]] | None) -> list[float] | None:
+    """Joins the values parsed from several arguments."""
+    if values is None:
+        return None
+    return [value for group in values for value in group]
+
+
+def _simulate(args) -> None:
+    """Runs the `simulate` command."""
+    if args.cache is not None:
+        assert args.seed is not None, 'Caching requires a seed.'
+        assert not args.resume and args.checkpoint is None, (
+            'Caching does not support checkpoints.'
+        )
+        assert args.history_file is None, 'Caching does not support history files.'
+    if args.resume:
+        assert args.checkpoint is not None, 'Resuming requires a checkpoint file.'
+    if args.renderer == 'direct' and args.cache is None:
+        _stream_and_render(args)
+    else:
+        _simulate_then_render(args)
+
+
+def _stream_and_render(args) -> None:
+    """Encodes the GIF from a pipeline while the lattice is simulated.
+
+    The frames reach the GIF, and the history file if one is given,
+    through the pipeline, so the lattice keeps no history unless it
+    streams the history file itself. A resumed run encodes the frames
+    restored from its history file first.
+    """
+    from .render import FrameEncoder
+    from .viz import Visualization
+
+    lattice_streams = _lattice_streams_history(args)
+    lattice = _make_lattice(args, 'all' if lattice_streams else 'none')
+    os.makedirs('map_animations', exist_ok=True)
+    path = os.path.join('map_animations', Visualization.generate_filename())
+    stages = [GifWriter(path, FrameEncoder(resolution=args.resolution))]
+    frames = lattice.history if args.resume and len(lattice.history) else None
+    _run_pipeline(lattice, args, stages, frames)
+
+
+def _simulate_then_render(args) -> None:
+    """Simulates the lattice with its history kept, then renders or animates it.
+
+    The history file, if one is given, is still written by a pipeline
+    while the lattice is simulated.
+    """
+    from .viz import Visualization
+
+    lattice = _make_lattice(args, 'all')
+    if args.cache is not None:
+        cache = ResultCache(args.cache, args.cache_size)
+        cache.advance(lattice, args.time, burn_in=args.burn_in, every=args.every)
+    else:
+        _run_pipeline(lattice, args, [])
+
+    viz = Visualization(lattice, resolution=args.resolution)
+    if args.renderer == 'direct':
+        viz.render()
+    else:
+        viz.animate(show=False)
+
+
+def _lattice_streams_history(args) -> bool:
+    """Returns whether the lattice writes the history file instead of a pipeline.
+
+    Checkpointed runs stream the history file from the simulation thread,
+    so every checkpoint refers to frames that are already in the file,
+    and resumed runs keep appending to the file of their checkpoint.
+    """
+    return args.history_file is not None and args.checkpoint is not None
+
+
+def _run_pipeline(lattice, args, stages, frames=None) -> None:
+    """Advances a lattice to the end of the run, feeding its frames to the stages.
 
+    A `HistoryWriter` stage is added for the history file unless the
+    lattice streams it, and checkpoints are saved on the simulation thread.
+    """
+    history_file = None
+    if _lattice_streams_history(args):
+        # A resumed lattice already streams to the history file of its checkpoint.
+        history_file = None if args.resume else args.history_file
+    elif args.history_file is not None:
+        stages = [*stages, HistoryWriter(args.history_file)]
+    if args.checkpoint is not None:
+        lattice.add_observer(Checkpointer(args.checkpoint, args.checkpoint_every))
+    if not stages:
+        _advance(lattice, args, history_file)
+        return
 
-def main():
+    pipeline = Pipeline(stages)
+    pipeline.attach(lattice, frames)
+    try:
+        _advance(lattice, args, history_file)
+    finally:
+        pipeline.close()
+
+
+def _make_lattice(args, retention: str) -> CoupledMapLattice:
+    """Builds the lattice of the `simulate` command, or restores it from a checkpoint."""
+    if args.resume:
+        return CoupledMapLattice.from_checkpoint(
+            args.checkpoint, history_file=args.history_file, retention=retention,
+        )
+    options = {'retention': retention, 'dtype': args.dtype, 'seed': args.seed}
+    if args.key == 'kaneko':
+        return KanekoLattice(args.nuerons, args.r, args.epsilon, **options)
+    if args.key == 'rulkov':
+        assert args.mu is not None, 'Mu parameter is required for Rulkov lattice.'
+        assert args.sigma is not None, (
+            'Sigma parameter is required for Rulkov lattice.'
+        )
+        return RulkovLattice(
+            args.nuerons, args.r, args.mu, args.sigma, args.epsilon, **options,
+        )
+    return CoupledMapLattice(args.nuerons, args.r, args.epsilon, **options)
+
+
+def _advance(lattice, args, history_file) -> None:
+    """Advances a lattice to the end of the run, from the time it is at."""
+    burn_in = max(0, args.burn_in - lattice.time)
+    lattice.advance(
+        args.burn_in + args.time - lattice.time - burn_in,
+        history_file=history_file,
+        burn_in=burn_in,
+        every=args.every,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
     parser = ArgumentParser(
         description='Run Coupled Map Lattice simulations.',
         prog='cml',
@@ -75,30 +235,339 @@ def main():
         help='Parameter sigma for the Rulkov lattice.',
     )
 
-    args = parser.parse_args()
+    sim_parser.add_argument(
+        '--dtype',
+        default='float64',
+        choices=['float32', 'float64'],
+        help='Precision of the lattice state.',
+    )
+
+    sim_parser.add_argument(
+        '--renderer',
+        default='matplotlib',
+        choices=['matplotlib', 'direct'],
+        help='Renderer used to save the animation.',
+    )
+
+    sim_parser.add_argument(
+        '--resolution',
+        type=int,
+        default=None,
+        help='Largest number of pixels along each axis of the animation.',
+    )
+
+    sim_parser.add_argument(
+        '--history-file',
+        default=None,
+        help='Stream the history to this memory-mapped .npy file.',
+    )
+
+    sim_parser.add_argument(
+        '--burn-in',
+        type=int,
+        default=0,
+        help='Number of time steps to run before recording.',
+    )
+
+    sim_parser.add_argument(
+        '--every',
+        type=int,
+        default=1,
+        help='Record every k-th time step.',
+    )
+
+    sim_parser.add_argument(
+        '--seed',
+        type=int,
+        default=None,
+        help='Seed of the random initial state.',
+    )
+
+    sim_parser.add_argument(
+        '--checkpoint',
+        default=None,
+        help='Save checkpoints of the run to this .npz file.',
+    )
+
+    sim_parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        default=100,
+        help='Number of time steps between checkpoints.',
+    )
+
+    sim_parser.add_argument(
+        '--cache',
+        default=None,
+        help='Reuse and store the results of identical runs in this directory.',
+    )
+
+    sim_parser.add_argument(
+        '--cache-size',
+        type=int,
+        default=2**30,
+        help='Size in bytes the cache directory is trimmed to.',
+    )
+
+    sim_parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Resume the run from the checkpoint file.',
+    )
+
+    sweep_parser = subparsers.add_parser(
+        'sweep',
+        help='Runs a cml simulation for every point of a parameter grid.',
+    )
+
+    sweep_parser.add_argument(
+        '-n',
+        '--nuerons',
+        type=int,
+        required=True,
+        help='Number of neurons in each lattice.',
+    )
+
+    sweep_parser.add_argument(
+        '-r',
+        '--r',
+        type=_values,
+        nargs='+',
+        required=True,
+        help='Values of r, or start:stop:num ranges.',
+    )
+
+    sweep_parser.add_argument(
+        '-e',
+        '--epsilon',
+        type=_values,
+        nargs='+',
+        default=[[0.5]],
+        help='Values of epsilon, or start:stop:num ranges.',
+    )
+
+    sweep_parser.add_argument(
+        '-m',
+        '--mu',
+        type=_values,
+        nargs='+',
+        default=None,
+        help='Values of mu for the Rulkov lattice.',
+    )
+
+    sweep_parser.add_argument(
+        '-s',
+        '--sigma',
+        type=_values,
+        nargs='+',
+        default=None,
+        help='Values of sigma for the Rulkov lattice.',
+    )
+
+    sweep_parser.add_argument(
+        '--seeds',
+        type=int,
+        nargs='+',
+        default=[0],
+        help='Seeds of the initial states.',
+    )
+
+    sweep_parser.add_argument(
+        '-t',
+        '--time',
+        type=int,
+        default=100,
+        help='Number of time steps to simulate.',
+    )
+
+    sweep_parser.add_argument(
+        '-k',
+        '--key',
+        help='Type of simulation to run.',
+        default='cml',
+        choices=['cml', 'kaneko', 'rulkov'],
+    )
+
+    sweep_parser.add_argument(
+        '-w',
+        '--workers',
+        type=int,
+        default=None,
+        help='Number of worker processes. Defaults to the available cores.',
+    )
+
+    sweep_parser.add_argument(
+        '--dtype',
+        default='float64',
+        choices=['float32', 'float64'],
+        help='Precision of the lattice state.',
+    )
+
+    sweep_parser.add_argument(
+        '--attractor',
+        type=float,
+        default=None,
+        metavar='TOLERANCE',
+        help='Extrapolate points that settle on a cycle within this tolerance.',
+    )
+
+    sweep_parser.add_argument(
+        '--lyapunov',
+        type=int,
+        default=None,
+        metavar='VECTORS',
+        help='Estimate this many Lyapunov exponents instead of the mean field.',
+    )
+
+    sweep_parser.add_argument(
+        '--transient',
+        type=int,
+        default=0,
+        help='Number of time steps run before estimating Lyapunov exponents.',
+    )
+
+    sweep_parser.add_argument(
+        '-o',
+        '--output',
+        default='sweep.npz',
+        help='Path of the .npz file the results are saved to.',
+    )
+
+    bench_parser = subparsers.add_parser(
+        'bench',
+        help='Runs the performance benchmarks.',
+    )
+
+    bench_parser.add_argument(
+        '--models',
+        nargs='+',
+        default=list(MODELS),
+        choices=MODELS,
+        help='Models to benchmark.',
+    )
+
+    bench_parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=[64, 256],
+        help='Lattice sizes to benchmark.',
+    )
+
+    bench_parser.add_argument(
+        '--modes',
+        nargs='+',
+        default=list(MODES),
+        choices=MODES,
+        help='Update modes to benchmark.',
+    )
+
+    bench_parser.add_argument(
+        '--histories',
+        nargs='+',
+        default=list(HISTORIES),
+        choices=HISTORIES,
+        help='Whether to benchmark with history kept, switched off, or both.',
+    )
+
+    bench_parser.add_argument(
+        '-t',
+        '--time',
+        type=int,
+        default=100,
+        help='Number of time steps of each run.',
+    )
+
+    bench_parser.add_argument(
+        '--repeat',
+        type=int,
+        default=3,
+        help='Number of timed runs of each case.',
+    )
+
+    bench_parser.add_argument(
+        '-o',
+        '--output',
+        default=None,
+        help='Path of the JSON file the results are saved to.',
+    )
+
+    bench_parser.add_argument(
+        '--compare',
+        default=None,
+        help='JSON results of a previous run to check for regressions.',
+    )
+
+    bench_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.1,
+        help='Relative slowdown that counts as a regression.',
+    )
+
+    args = parser.parse_args(argv)
     if args.command == 'simulate':
-        if args.key == 'kaneko':
-            lattice = KanekoLattice(args.nuerons, args.r, args.epsilon)
-        elif args.key == 'rulkov':
+        _simulate(args)
+    elif args.command == 'sweep':
+        if args.key == 'rulkov':
             assert args.mu is not None, 'Mu parameter is required for Rulkov lattice.'
             assert args.sigma is not None, (
                 'Sigma parameter is required for Rulkov lattice.'
             )
-            lattice = RulkovLattice(
+        grid = parameter_grid(
+            _flatten(args.r),
+            _flatten(args.epsilon),
+            _flatten(args.mu),
+            _flatten(args.sigma),
+            args.seeds,
+        )
+        attractor = None
+        if args.attractor is not None:
+            attractor = AttractorDetector(args.attractor, extrapolate=True)
+        if args.lyapunov is not None:
+            results = lyapunov_sweep(
+                args.key,
                 args.nuerons,
-                args.r,
-                args.mu,
-                args.sigma,
-                args.epsilon,
+                args.time,
+                grid,
+                args.lyapunov,
+                args.transient,
+                args.workers,
+                dtype=args.dtype,
             )
         else:
-            lattice = CoupledMapLattice(args.nuerons, args.r, args.epsilon)
-
-        for _ in range(args.time):
-            lattice.update()
-
-        viz = Visualization(lattice)
-        viz.animate(show=False)
+            results = sweep(
+                args.key,
+                args.nuerons,
+                args.time,
+                grid,
+                args.workers,
+                dtype=args.dtype,
+                attractor=attractor,
+            )
+        save_sweep(args.output, results)
+    elif args.command == 'bench':
+        results = run_suite(
+            args.models,
+            args.sizes,
+            args.modes,
+            args.histories,
+            args.time,
+            args.repeat,
+        )
+        print(format_results(results))
+        if args.output is not None:
+            save_results(args.output, results)
+        if args.compare is not None:
+            regressions = compare(load_results(args.compare), results, args.threshold)
+            for regression in regressions:
+                print(
+                    f"Regression: {regression['model']} n={regression['n']} "
+                    f"{regression['mode']} history={regression['history']} "
+                    f"{regression['change']:+.1%}",
+                )
+            if regressions:
+                raise SystemExit(1)
 
 
 if __name__ == '__main__':
@@ -1,9 +1,73 @@
 from __future__ import annotations
 
+import json
+import os
 from collections.abc import Generator
 
 import numpy as np
 
+from .attractor import AttractorDetector
+from .coupling import Coupling
+from .history import History
+from .history import MemmapHistory
+from .history import neuron_trace
+from .instrument import Instrumentation
+from .lyapunov import lyapunov_spectrum
+from .observables import Observables
+from .observables import QUANTITIES
+from .observers import Observer
+from .observers import Probe
+from .parallel import DomainDecomposition
+from .preview import Preview
+
+
+def _roll_rows(src: np.ndarray, offset: int, out: np.ndarray) -> np.ndarray:
+    """Writes the rows of `src` shifted by `offset` into `out`.
+    Row `i` of `out` receives row `(i + offset) % n` of `src`.
+    """
+    n = src.shape[-2]
+    k = offset % n
+    np.copyto(out[..., :n - k, :], src[..., k:, :])
+    np.copyto(out[..., n - k:, :], src[..., :k, :])
+    return out
+
+
+def _add_rows(out: np.ndarray, src: np.ndarray, offset: int) -> np.ndarray:
+    """Adds the rows of `src` shifted by `offset` to `out` in place.
+    Row `i` of `out` receives row `(i + offset) % n` of `src`.
+    """
+    n = src.shape[-2]
+    k = offset % n
+    out[..., :n - k, :] += src[..., k:, :]
+    out[..., n - k:, :] += src[..., :k, :]
+    return out
+
+
+def _row(values: np.ndarray, i: int) -> np.ndarray:
+    """Returns a view of row `i` of every plane, keeping the row axis."""
+    return values[..., i:i + 1, :]
+
+
+def _subclasses(cls: type) -> Generator[type]:
+    """Yields `cls` and all of its subclasses."""
+    yield cls
+    for subclass in cls.__subclasses__():
+        yield from _subclasses(subclass)
+
+
+def _load_coupling(data: dict[str, np.ndarray]) -> Coupling:
+    """Rebuilds the coupling saved in a checkpoint from its arrays."""
+    name = data['coupling']
+    couplings = {coupling.__name__: coupling for coupling in _subclasses(Coupling)}
+    if name.dtype.kind != 'U' or str(name) not in couplings:
+        raise ValueError('Unknown coupling, or a checkpoint from an older version.')
+    params = {
+        key.removeprefix('coupling_'): value.item() if value.ndim == 0 else value
+        for key, value in data.items()
+        if key.startswith('coupling_')
+    }
+    return couplings[str(name)](**params)
+
 
 class CoupledMapLattice:
     """An implementation of a coupled map lattice (CML) model.
@@ -14,16 +78,66 @@ class CoupledMapLattice:
         r (float): The parameter for the map function.
         epsilion (float): The coupling strength.
         state (np.ndarray): The current state of the lattice.
-        history (list[np.ndarray]): The history of the lattice states.
+        history (np.ndarray): A read-only view of the recorded lattice states.
         time (int): The current time step.
+        dtype (np.dtype): The precision of the state and history.
+        rng (np.random.Generator): The random number generator of the lattice.
     """
 
-    def __init__(self, n: int, r: float, epsilon: float = 1) -> None:
+    def __init__(
+        self,
+        n: int,
+        r: float,
+        epsilon: float = 1,
+        *,
+        retention: str = 'all',
+        window: int | None = None,
+        every: int = 1,
+        dtype: np.dtype = np.float64,
+        seed: int | None = None,
+        coupling: Coupling | None = None,
+    ) -> None:
+        """Initializes the lattice.
+
+        Args:
+            n (int): The size of the lattice.
+            r (float): The parameter for the map function.
+            epsilon (float): The coupling strength. Defaults to 1.
+            retention (str): The history retention mode, one of `'all'`,
+                `'ring'`, `'every'` or `'none'`. See `History`. Defaults to `'all'`.
+            window (int | None): The number of states kept in `'ring'` mode.
+            every (int): The stride between kept states in `'every'` mode.
+                Defaults to 1.
+            dtype (np.dtype): The precision of the state and history, either
+                `np.float32` or `np.float64`. Defaults to `np.float64`.
+            seed (int | None): The seed of the random number generator of
+                the lattice. Defaults to None, which seeds it from the OS.
+            coupling (Coupling | None): The neighbour structure of the
+                lattice, such as a `Topology`. Defaults to None, for the
+                fixed row neighbours of the model.
+        """
         self.n = n
         self.r = r
         self.epsilon = epsilon
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError('Dtype must be float32 or float64.')
+        self.rng = np.random.default_rng(seed)
+        if coupling is not None:
+            coupling._check(n)
+        self.coupling = coupling
+        self._buffers = {}
         self.state = self.init_state()
-        self.history = [self.state]
+        self._history = History(
+            self._frame().shape,
+            self._state.dtype,
+            retention,
+            window,
+            every,
+        )
+        self.history = [self._frame()]
+        self._observers = []
+        self.instrumentation = None
         self.time = 0
 
     def __repr__(self) -> str:
@@ -31,7 +145,11 @@ class CoupledMapLattice:
 
     def init_state(self) -> np.ndarray:
         """Initializes the state of the lattice."""
-        return np.random.uniform(0, 1, (self.n, self.n))
+        return self.rng.uniform(0, 1, self._state_shape()).astype(self.dtype)
+
+    def _state_shape(self) -> tuple[int, ...]:
+        """Returns the shape of the state of the lattice."""
+        return (self.n, self.n)
 
     @property
     def state(self) -> np.ndarray:
@@ -46,35 +164,45 @@ class CoupledMapLattice:
         """
         if not isinstance(value, np.ndarray):
             raise ValueError('State must be a numpy array.')
-        if value.ndim != 2:
-            raise ValueError('State must be a 2D array.')
-        if value.dtype != np.float64:
-            raise ValueError('State must be a float64 array.')
+        shape = self._state_shape()
+        if value.ndim != len(shape):
+            raise ValueError(f"State must be a {len(shape)}D array.")
+        if value.dtype != self.dtype:
+            raise ValueError(f"State must be a {self.dtype} array.")
 
-        if value.shape != (self.n, self.n):
-            raise ValueError(f"State must be of shape ({self.n}, {self.n}).")
-        self._state = value
+        if value.shape != shape:
+            raise ValueError(f"State must be of shape {shape}.")
+        # The update kernels reuse the previous state as a scratch buffer,
+        # so never keep a reference to an array owned by the caller.
+        self._state = value.copy()
 
     @property
-    def history(self) -> list[np.ndarray]:
-        """Returns the history of the lattice."""
-        return self._history.copy()
+    def history(self) -> np.ndarray:
+        """Returns a read-only view of the history of the lattice.
+        The view is not copied, so reading it is O(1).
+        """
+        return self._history.view()
 
     @history.setter
-    def history(self, value: list[np.ndarray]) -> None:
+    def history(self, value: list[np.ndarray] | np.ndarray) -> None:
         """Sets the history of the lattice.
+        The states are copied into the history store, subject to its retention mode.
+
         Args:
-            value (List[np.ndarray]): The new history of the lattice.
+            value (list[np.ndarray] | np.ndarray): The new history of the lattice.
         """
-        if not isinstance(value, list):
-            raise ValueError('History must be a list.')
+        if not isinstance(value, (list, np.ndarray)):
+            raise ValueError('History must be a list or a numpy array.')
         if not all(isinstance(x, np.ndarray) for x in value):
             raise ValueError('All elements in history must be numpy arrays.')
 
-        self._history = value
+        self._history.clear()
+        self._history.extend(value)
 
     def append_history(self, value: np.ndarray) -> None:
         """Appends a new state to the history of the lattice.
+        The state is copied, so the caller may keep modifying it.
+
         Args:
             value (np.ndarray): The new state to append.
         """
@@ -82,6 +210,291 @@ class CoupledMapLattice:
             raise ValueError('Value must be a numpy array.')
         self._history.append(value)
 
+    def stream_history(self, path: str | os.PathLike) -> None:
+        """Moves the history of the lattice to a memory-mapped `.npy` file.
+
+        States recorded so far are copied to the file and every later state
+        is written to it as it is produced. Use `load_history` to read the
+        file back lazily.
+
+        Args:
+            path (str | os.PathLike): The path of the `.npy` file.
+        """
+        self._history = MemmapHistory.from_history(path, self._history)
+
+    def trace(self, neurons) -> np.ndarray:
+        """Returns the time series of one or many neurons from the history.
+
+        Args:
+            neurons (tuple[int, int] | Sequence[tuple[int, int]]): The
+                `(i, j)` index of a neuron, or a sequence of them.
+
+        Returns:
+            np.ndarray: A strided view for one neuron, or a `(T, k)` array.
+        """
+        return neuron_trace(self.history, neurons)
+
+    def add_probe(self, neurons) -> Probe:
+        """Starts recording the time series of selected neurons.
+
+        The probe records the current state immediately and every state
+        recorded afterwards, independently of the history retention mode.
+
+        Args:
+            neurons (Sequence[tuple[int, int]]): The `(i, j)` indices of the neurons.
+
+        Returns:
+            Probe: The probe holding the recorded values.
+        """
+        probe = Probe(neurons, self._frame().shape, self.dtype)
+        probe.record(self._frame())
+        self.add_observer(probe)
+        return probe
+
+    def add_observables(
+        self,
+        quantities=QUANTITIES,
+        bins: int = 64,
+        range: tuple[float, float] | None = None,
+    ) -> Observables:
+        """Starts computing aggregate quantities of every recorded state.
+
+        The observables record the current state immediately and every state
+        recorded afterwards, independently of the history retention mode.
+
+        Args:
+            quantities (Sequence[str]): The quantities to compute, among
+                `'mean'`, `'variance'`, `'sync'` and `'histogram'`. Defaults to all.
+            bins (int): The number of histogram bins. Defaults to 64.
+            range (tuple[float, float] | None): The range of the histogram.
+                Defaults to the range of the current state.
+
+        Returns:
+            Observables: The observables holding the computed quantities.
+        """
+        observables = Observables(self._frame().shape, quantities, bins, range)
+        observables.record(self._frame())
+        self.add_observer(observables)
+        return observables
+
+    def add_preview(
+        self,
+        resolution: int = 256,
+        reduce: str = 'mean',
+        every: int = 1,
+    ) -> Preview:
+        """Starts recording a downsampled stream of the states.
+
+        The preview records the current state immediately and every state
+        recorded afterwards, pooled down to at most `resolution` sites along
+        each axis, independently of the history retention mode.
+
+        Args:
+            resolution (int): The largest number of sites along each axis.
+                Defaults to 256.
+            reduce (str): How blocks of sites are pooled, `'mean'` or
+                `'max'`. Defaults to `'mean'`.
+            every (int): Only every `every`-th recorded state is kept.
+                Defaults to 1.
+
+        Returns:
+            Preview: The preview holding the pooled frames.
+        """
+        preview = Preview(self._frame().shape, resolution, reduce, self.dtype, every)
+        preview.record(self._frame())
+        self.add_observer(preview)
+        return preview
+
+    def add_observer(self, observer) -> None:
+        """Attaches a callback that is called with the lattice after every recorded update.
+
+        Burn-in steps, the steps skipped by `every` and `update(record=False)`
+        do not call it.
+
+        Args:
+            observer (Callable[[CoupledMapLattice], None]): The callback. If it
+                is an `Observer`, its `start` hook is also called by `simulate`.
+        """
+        self._observers.append(observer)
+
+    def remove_observer(self, observer) -> None:
+        """Detaches a callback attached with `add_observer`."""
+        self._observers.remove(observer)
+
+    def decompose(self, workers: int | None = None) -> DomainDecomposition:
+        """Starts worker processes that update blocks of rows of the lattice.
+
+        Use the returned engine as a context manager, and its `simulate`
+        and `advance` methods in place of the ones of the lattice. The
+        results are bit-identical. See `DomainDecomposition`.
+
+        Args:
+            workers (int | None): The number of worker processes. Defaults
+                to the number of cores available to this process.
+
+        Returns:
+            DomainDecomposition: The engine running the workers.
+        """
+        return DomainDecomposition(self, workers)
+
+    def instrument(
+        self,
+        window: int = 100,
+        track_memory: bool = False,
+        keep: int = 1000,
+    ) -> Instrumentation:
+        """Starts measuring the time and memory of every update.
+
+        Set `instrumentation` back to None to stop measuring.
+
+        Args:
+            window (int): The number of updates the rolling rate is taken
+                over. Defaults to 100.
+            track_memory (bool): Whether to trace the bytes allocated by each
+                update with `tracemalloc`, which slows updates down.
+                Defaults to False.
+            keep (int): The number of latest per-update records kept.
+                Defaults to 1000.
+
+        Returns:
+            Instrumentation: The measurements.
+        """
+        self.instrumentation = Instrumentation(window, track_memory, keep)
+        return self.instrumentation
+
+    def lyapunov(
+        self,
+        steps: int,
+        vectors: int = 1,
+        transient: int = 0,
+        renormalize: int = 1,
+    ) -> np.ndarray:
+        """Estimates the leading Lyapunov exponents of the lattice.
+
+        The lattice is advanced by `transient + steps` steps, which are not
+        recorded in history. See `lyapunov_spectrum`.
+
+        Args:
+            steps (int): The number of steps to average the growth over.
+            vectors (int): The number of exponents to estimate. Defaults to 1.
+            transient (int): The number of steps to run first. Defaults to 0.
+            renormalize (int): The number of steps between renormalizations
+                of the tangent vectors. Defaults to 1.
+
+        Returns:
+            np.ndarray: The exponents in decreasing order.
+        """
+        return lyapunov_spectrum(self, steps, vectors, transient, renormalize)
+
+    def save_checkpoint(self, path: str | os.PathLike) -> None:
+        """Saves the lattice so a run can be resumed with `from_checkpoint`.
+
+        The checkpoint holds the state, the time, the parameters and the
+        coupling, the state of the random number generator and the history
+        cursor, but not the history itself. Everything is stored as plain
+        arrays, so loading a checkpoint never unpickles anything. The file
+        is replaced atomically, so an interrupted save leaves the previous
+        checkpoint intact.
+
+        Args:
+            path (str | os.PathLike): The path of the `.npz` checkpoint.
+        """
+        params = {f"param_{name}": value for name, value in self._params().items()}
+        if self.coupling is not None:
+            params['coupling'] = type(self.coupling).__name__
+            for name, value in self.coupling._params().items():
+                params[f"coupling_{name}"] = value
+        options = {
+            'retention': self._history.mode,
+            'window': self._history.window,
+            'every': self._history.every,
+            'dtype': self.dtype.name,
+        }
+        partial = f"{os.fspath(path)}.partial"
+        with open(partial, 'wb') as f:
+            np.savez(
+                f,
+                model=type(self).__name__,
+                state=self._state,
+                time=self.time,
+                cursor=self._history.count,
+                options=json.dumps(options),
+                rng=json.dumps(self.rng.bit_generator.state),
+                **params,
+            )
+        os.replace(partial, path)
+
+    @classmethod
+    def from_checkpoint(
+        cls,
+        path: str | os.PathLike,
+        history_file: str | os.PathLike | None = None,
+        retention: str | None = None,
+    ) -> CoupledMapLattice:
+        """Restores a lattice saved with `save_checkpoint`.
+
+        The restored lattice starts with an empty history whose cursor
+        continues from the checkpoint. If `history_file` is the file the
+        original run streamed its history to, later states are appended to
+        it right after the states recorded up to the checkpoint.
+
+        Args:
+            path (str | os.PathLike): The path of the `.npz` checkpoint.
+            history_file (str | os.PathLike | None): A history file to resume
+                streaming to. Defaults to None.
+            retention (str | None): The retention mode of the restored
+                history, for example `'all'` to keep the states of a run
+                that only streamed them. Defaults to the mode of the
+                checkpoint.
+
+        Returns:
+            CoupledMapLattice: The restored lattice.
+        """
+        with np.load(path) as checkpoint:
+            data = dict(checkpoint)
+        name = str(data['model'])
+        models = {model.__name__: model for model in _subclasses(CoupledMapLattice)}
+        if name not in models:
+            raise ValueError(f"Unknown lattice model {name}.")
+        model = models[name]
+        params = {
+            name.removeprefix('param_'): value.item() if value.ndim == 0 else value
+            for name, value in data.items()
+            if name.startswith('param_')
+        }
+        options = json.loads(str(data['options']))
+        if retention is not None:
+            options['retention'] = retention
+        if 'coupling' in data:
+            options['coupling'] = _load_coupling(data)
+        lattice = model(**params, **options)
+        lattice._restore(data)
+
+        cursor = int(data['cursor'])
+        if history_file is not None:
+            lattice._history = MemmapHistory.resume(
+                history_file,
+                lattice._history.shape,
+                lattice.dtype,
+                lattice._history.mode,
+                lattice._history.every,
+                cursor,
+            )
+        else:
+            lattice._history.clear()
+            lattice._history.count = cursor
+        return lattice
+
+    def _restore(self, data: dict[str, np.ndarray]) -> None:
+        """Restores the state, time and generator of a checkpoint."""
+        self.rng.bit_generator.state = json.loads(str(data['rng']))
+        self.state = data['state']
+        self.time = int(data['time'])
+
+    def _params(self) -> dict[str, float]:
+        """Returns the model parameters, as passed to the constructor."""
+        return {'n': self.n, 'r': self.r, 'epsilon': self.epsilon}
+
     def state_function(self, x: np.ndarray) -> np.ndarray:
         """Applies a function to the state of the lattice.
         Args:
@@ -92,32 +505,176 @@ class CoupledMapLattice:
         """
         return self.r * x * (1 - x)
 
-    def update(self) -> None:
+    def update(self, record: bool = True) -> None:
         """Updates the state of the lattice.
         If `coupled` is True, the update is coupled.
+
+        Args:
+            record (bool): Whether to record the new state in history and
+                notify the observers. Defaults to True.
         """
+        if self.instrumentation is not None:
+            self.instrumentation.measure(self, record)
+        else:
+            self._step()
+            if record:
+                self._record()
+        self.time += 1
+        if record:
+            for observer in self._observers:
+                observer(self)
+
+    def _step(self) -> None:
+        """Advances the state by one step without recording it."""
         if self.epsilon < 1:
             self._update_coupled()
         else:
             self._update_independent()
-        self.append_history(self.state)
-        self.time += 1
+
+    def _record(self) -> None:
+        """Records the current state in history."""
+        self.append_history(self._frame())
+
+    def _frame(self) -> np.ndarray:
+        """Returns a view of the part of the state recorded in history."""
+        return self._state
+
+    def _weights(self) -> tuple[float, float]:
+        """Returns the weights of a site and of its neighbours in a coupled update."""
+        return self.epsilon, 1 - self.epsilon
 
     def _update_coupled(self) -> None:
-        """Updates the state of the lattice using a coupled map."""
-        new_lattice = self.state.copy()
-        for i in range(self.n):
-            left_neighbor = self.state[(i - 1) % self.n]
-            for j in range(self.n):
-                # Apply the coupled map update
-                new_lattice[i, j] = self.epsilon * self.state_function(
-                    self.state[i, j],
-                ) + (1 - self.epsilon) * self.state_function(left_neighbor[j])
-        self.state = new_lattice
+        """Updates the state of the lattice using a coupled map.
+
+        Each site is coupled to its neighbours, by default its left
+        neighbour, the site in the previous row with periodic boundaries.
+        See `_neighbours`. The whole lattice is updated at once into a
+        scratch buffer which is then swapped with the current state.
+        """
+        center, neighbour = self._weights()
+        mapped = self._map(self._state, self._buffer('mapped'))
+        out = self._neighbours(mapped, self._buffer('next'))
+        out *= neighbour
+        mapped *= center
+        out += mapped
+        self._swap('next')
+
+    def _neighbours(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the neighbour term of every site into `out`.
+
+        The term is computed by the `coupling` of the lattice if it has one,
+        and is otherwise the value of the site in the previous row.
+
+        Args:
+            values (np.ndarray): The mapped values of the lattice.
+            out (np.ndarray): The array to write the result to.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        if self.coupling is not None:
+            return self.coupling.gather(values, out)
+        return _roll_rows(values, -1, out)
 
     def _update_independent(self) -> None:
         """Updates the state of the lattice using an independent map."""
-        self.state = self.state_function(self.state)
+        self._map(self._state, self._buffer('next'))
+        self._swap('next')
+
+    def _tangent(self, v: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the Jacobian of the next step at the current state times `v`.
+
+        Args:
+            v (np.ndarray): Tangent vectors, of shape `(k, *state.shape)`.
+            out (np.ndarray): The array to write the result to.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        if self.epsilon < 1:
+            return self._tangent_coupled(v, out)
+        return self._derivative(self._state, v, out)
+
+    def _tangent_coupled(self, v: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the Jacobian of `_update_coupled` times `v` into `out`."""
+        center, neighbour = self._weights()
+        mapped = self._derivative(self._state, v, self._buffer('tangent_mapped', v))
+        self._neighbours(mapped, out)
+        out *= neighbour
+        mapped *= center
+        out += mapped
+        return out
+
+    def _derivative(self, x: np.ndarray, v: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the derivative of `state_function` at `x` times `v` into `out`.
+
+        Subclasses that override `state_function` must override this
+        method too to support `lyapunov`.
+
+        Args:
+            x (np.ndarray): The point the derivative is taken at.
+            v (np.ndarray): Tangent vectors, broadcasting against `x`.
+            out (np.ndarray): The array to write the result to.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        if type(self).state_function is not CoupledMapLattice.state_function:
+            raise NotImplementedError(
+                'Lattices with a custom state_function must implement _derivative.',
+            )
+        slope = self._buffer('slope', x)
+        np.multiply(x, -2 * self.r, out=slope)
+        slope += self.r
+        return np.multiply(v, slope, out=out)
+
+    def _map(self, x: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes `state_function(x)` into `out` without allocating.
+
+        Subclasses that override `state_function` fall back to calling it
+        and copying the result.
+
+        Args:
+            x (np.ndarray): The input array.
+            out (np.ndarray): The array to write the result to.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        if type(self).state_function is not CoupledMapLattice.state_function:
+            np.copyto(out, self.state_function(x))
+            return out
+        tmp = self._buffer('map_tmp', x)
+        np.multiply(x, self.r, out=out)
+        np.subtract(1, x, out=tmp)
+        out *= tmp
+        return out
+
+    def _buffer(self, name: str, like: np.ndarray | None = None) -> np.ndarray:
+        """Returns a named scratch buffer shaped like `like`.
+
+        Buffers are allocated on first use and reused on every later step.
+
+        Args:
+            name (str): The name of the buffer.
+            like (np.ndarray | None): The array whose shape and dtype the
+                buffer must match. Defaults to the current state.
+
+        Returns:
+            np.ndarray: The scratch buffer.
+        """
+        if like is None:
+            like = self._state
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != like.shape or buf.dtype != like.dtype:
+            buf = self._buffers[name] = np.empty_like(like)
+        return buf
+
+    def _swap(self, name: str) -> None:
+        """Makes the named buffer the current state.
+        The previous state becomes the buffer for the next step.
+        """
+        self._state, self._buffers[name] = self._buffers[name], self._state
 
     def reset(self) -> None:
         """Resets the lattice to its initial state."""
@@ -125,15 +682,133 @@ class CoupledMapLattice:
         self.history = []
         self.time = 0
 
-    def simulate(self, steps: int) -> Generator[np.ndarray]:
+    def simulate(
+        self,
+        steps: int,
+        history_file: str | os.PathLike | None = None,
+        burn_in: int = 0,
+        every: int = 1,
+        attractor: AttractorDetector | None = None,
+    ) -> Generator[np.ndarray]:
         """Simulates the lattice for a given number of steps.
 
         Args:
-            steps (int): The number of steps to simulate.
+            steps (int): The number of steps to simulate after the burn-in.
+            history_file (str | os.PathLike | None): If given, the history is
+                streamed to this memory-mapped `.npy` file. See `stream_history`.
+            burn_in (int): The number of steps to run first without recording
+                or yielding anything. Defaults to 0.
+            every (int): Only every `every`-th state is recorded, passed to
+                the observers and yielded. Defaults to 1.
+            attractor (AttractorDetector | None): If given, checks every
+                recorded state for a cycle, and once one is detected stops
+                the run or extrapolates it. See `AttractorDetector`.
 
         Yields:
-            np.ndarray: The state of the lattice at each step.
+            np.ndarray: The state of the lattice at each recorded step.
         """
-        for _ in range(steps):
-            self.update()
+        for _ in self._run(steps, history_file, burn_in, every, attractor):
             yield self.state
+
+    def advance(
+        self,
+        steps: int,
+        history_file: str | os.PathLike | None = None,
+        burn_in: int = 0,
+        every: int = 1,
+        attractor: AttractorDetector | None = None,
+    ) -> None:
+        """Simulates the lattice like `simulate`, without yielding the states.
+
+        Steps that are not recorded only run the update kernel, which works
+        in place, so `lattice.advance(100_000, every=100_000)` skips a long
+        transient at the cost of the arithmetic alone.
+
+        Args:
+            steps (int): The number of steps to simulate after the burn-in.
+            history_file (str | os.PathLike | None): If given, the history is
+                streamed to this memory-mapped `.npy` file. See `stream_history`.
+            burn_in (int): The number of steps to run first without recording
+                anything. Defaults to 0.
+            every (int): Only every `every`-th state is recorded and passed to
+                the observers. Defaults to 1.
+            attractor (AttractorDetector | None): If given, stops or
+                extrapolates the run once the lattice is on a cycle.
+        """
+        for _ in self._run(steps, history_file, burn_in, every, attractor):
+            pass
+
+    def _run(
+        self,
+        steps: int,
+        history_file: str | os.PathLike | None,
+        burn_in: int,
+        every: int,
+        attractor: AttractorDetector | None = None,
+    ) -> Generator[None]:
+        """Runs a simulation, yielding after every recorded step."""
+        if burn_in < 0 or every < 1:
+            raise ValueError('Burn-in must be non-negative and every positive.')
+        if history_file is not None:
+            self.stream_history(history_file)
+        for _ in range(burn_in):
+            self.update(record=False)
+        recorded = steps // every
+        self._history.reserve(recorded)
+        for observer in self._observers:
+            if isinstance(observer, Observer):
+                observer.start(self, recorded)
+        if attractor is not None:
+            attractor.start(self, recorded)
+        end = self.time + steps
+        try:
+            for t in range(1, steps + 1):
+                record = t % every == 0
+                self.update(record)
+                if record:
+                    if attractor is not None:
+                        attractor(self)
+                    yield
+                    if attractor is not None and attractor.detected:
+                        if attractor.extrapolate:
+                            yield from self._extrapolate(attractor, end, every)
+                        break
+        finally:
+            if isinstance(self._history, MemmapHistory):
+                self._history.flush()
+
+    def _extrapolate(
+        self,
+        attractor: AttractorDetector,
+        end: int,
+        every: int,
+    ) -> Generator[None]:
+        """Fills in the recorded states up to time `end` from detected cycles.
+
+        One period of states is simulated and kept, and every later recorded
+        state is copied from it, with each member of an ensemble following
+        its own period. Steps after the last recorded state are simulated.
+        """
+        lengths = attractor.periods // every
+        members = len(lengths)
+        cycle = np.empty((int(lengths.max()), *self._state.shape), self.dtype)
+        cycle[0] = self._state
+        for k in range(1, len(cycle)):
+            for _ in range(every):
+                self._step()
+            cycle[k] = self._state
+        flat = cycle.reshape((len(cycle), members, -1))
+        index = np.arange(members)
+        start = self.time
+        remaining = (end - start) // every
+        for k in range(1, remaining + 1):
+            self._state[...] = flat[k % lengths, index].reshape(self._state.shape)
+            self.time = start + k * every
+            self._record()
+            for observer in self._observers:
+                observer(self)
+            yield
+        self._state[...] = flat[remaining % lengths, index].reshape(self._state.shape)
+        self.time = start + remaining * every
+        for _ in range(end - self.time):
+            self.update(record=False)
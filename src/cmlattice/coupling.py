@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+from collections.abc import Sequence
+
+import numpy as np
+
+
+class Coupling:
+    """Base class for the neighbour structure of a lattice.
+
+    A coupling computes the neighbour term of every site from the mapped
+    values of the lattice, in place of the fixed row neighbours of the
+    models. It is passed to a lattice as its `coupling` argument, and the
+    model weights apply to its result as they do to the default neighbours.
+
+    Checkpoints store a coupling as the arrays returned by `_params` and
+    rebuild it by passing them back to the constructor, so subclasses that
+    should be saved implement `_params`.
+    """
+
+    def gather(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the neighbour term of every site into `out`.
+
+        Args:
+            values (np.ndarray): The mapped values, of shape `(..., n, n)`.
+            out (np.ndarray): The array to write the result to.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        raise NotImplementedError
+
+    def _check(self, n: int) -> None:
+        """Checks that the coupling fits a lattice of size `n`."""
+
+    def _params(self) -> dict[str, np.ndarray]:
+        """Returns the arguments of the constructor, as arrays."""
+        raise NotImplementedError(f"{type(self).__name__} cannot be saved in a checkpoint.")
+
+    def __getstate__(self) -> dict:
+        # Cached buffers and spectra are rebuilt on first use.
+        state = dict(self.__dict__)
+        if '_buffers' in state:
+            state['_buffers'] = {}
+        return state
+
+
+class Topology(Coupling):
+    """A coupling topology stored as a compressed sparse row (CSR) index.
+
+    The sites of an `n` by `n` lattice are the nodes `0 .. n * n - 1` in
+    row-major order. Node `i` receives the sum of the values of the nodes
+    `indices[indptr[i]:indptr[i + 1]]`, times their `weights` if given.
+    Applying it gathers the values of every edge at once and sums them per
+    node, in O(edges) time without allocating.
+
+    Attributes:
+        size (int): The number of nodes.
+        indptr (np.ndarray): The `(size + 1,)` offsets of the edges of each node.
+        indices (np.ndarray): The source node of every edge.
+        weights (np.ndarray | None): The weight of every edge, or None for
+            unit weights.
+    """
+
+    def __init__(
+        self,
+        indptr: np.ndarray,
+        indices: np.ndarray,
+        weights: np.ndarray | None = None,
+    ) -> None:
+        """Initializes the topology from a CSR index.
+
+        Args:
+            indptr (np.ndarray): The offsets of the edges of each node.
+            indices (np.ndarray): The source node of every edge.
+            weights (np.ndarray | None): The weight of every edge. Defaults
+                to None, for unit weights.
+        """
+        indptr = np.asarray(indptr, dtype=np.int64)
+        size = len(indptr) - 1
+        index_dtype = np.int32 if size < 2**31 else np.int64
+        indices = np.asarray(indices, dtype=index_dtype)
+        if (
+            size < 1
+            or indptr[0] != 0
+            or indptr[-1] != len(indices)
+            or (np.diff(indptr) < 0).any()
+        ):
+            raise ValueError('Indptr must be non-decreasing offsets into indices.')
+        if len(indices) and (indices.min() < 0 or indices.max() >= size):
+            raise ValueError(f"Indices must be nodes between 0 and {size - 1}.")
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            if weights.shape != indices.shape:
+                raise ValueError('Weights must have one entry per edge.')
+        self.size = size
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        degrees = np.diff(indptr)
+        self._degree = int(degrees[0]) if (degrees == degrees[0]).all() else None
+        self._empty = degrees == 0
+        self._starts = indptr[:-1]
+        self._buffers = {}
+
+    def __repr__(self) -> str:
+        return f"Topology(size={self.size}, edges={len(self.indices)})"
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    @classmethod
+    def from_edges(
+        cls,
+        sources,
+        targets,
+        size: int,
+        weights=None,
+    ) -> Topology:
+        """Builds a topology from a list of directed edges.
+
+        Args:
+            sources (Sequence[int]): The node each edge reads from.
+            targets (Sequence[int]): The node each edge is summed into.
+            size (int): The number of nodes.
+            weights (Sequence[float] | None): The weight of every edge.
+                Defaults to None, for unit weights.
+
+        Returns:
+            Topology: The topology.
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if sources.shape != targets.shape:
+            raise ValueError('Sources and targets must have the same length.')
+        if len(targets) and (targets.min() < 0 or targets.max() >= size):
+            raise ValueError(f"Targets must be nodes between 0 and {size - 1}.")
+        order = np.argsort(targets, kind='stable')
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(targets, minlength=size), out=indptr[1:])
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)[order]
+        return cls(indptr, sources[order], weights)
+
+    @classmethod
+    def from_adjacency(cls, adjacency: Sequence[Iterable[int]], weights=None) -> Topology:
+        """Builds a topology from an adjacency list.
+
+        Args:
+            adjacency (Sequence[Iterable[int]]): The neighbours of each node.
+            weights (Sequence[Iterable[float]] | None): The weight of each
+                neighbour of each node. Defaults to None, for unit weights.
+
+        Returns:
+            Topology: The topology.
+        """
+        neighbours = [np.asarray(list(row), dtype=np.int64) for row in adjacency]
+        indptr = np.zeros(len(neighbours) + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in neighbours], out=indptr[1:])
+        indices = np.concatenate(neighbours) if neighbours else np.empty(0, np.int64)
+        if weights is not None:
+            weights = np.concatenate(
+                [np.asarray(list(row), dtype=np.float64) for row in weights],
+            )
+        return cls(indptr, indices, weights)
+
+    @classmethod
+    def stencil(cls, n: int, offsets: Sequence[tuple[int, int]], weights=None) -> Topology:
+        """Builds a periodic stencil on an `n` by `n` lattice.
+
+        Args:
+            n (int): The size of the lattice.
+            offsets (Sequence[tuple[int, int]]): The `(row, column)` offset of
+                each neighbour. Site `(i, j)` receives site `(i + di, j + dj)`,
+                with periodic boundaries, so `(-1, 0)` is the row above.
+            weights (Sequence[float] | None): The weight of each offset.
+                Defaults to None, for unit weights.
+
+        Returns:
+            Topology: The topology, with `len(offsets)` edges per site.
+        """
+        offsets = np.asarray(offsets, dtype=np.int64).reshape(-1, 2)
+        rows, cols = np.divmod(np.arange(n * n), n)
+        indices = (
+            (rows[:, None] + offsets[:, 0]) % n * n + (cols[:, None] + offsets[:, 1]) % n
+        ).ravel()
+        indptr = np.arange(n * n + 1, dtype=np.int64) * len(offsets)
+        if weights is not None:
+            weights = np.tile(np.asarray(weights, dtype=np.float64), n * n)
+        return cls(indptr, indices, weights)
+
+    @classmethod
+    def von_neumann(cls, n: int, radius: int = 1) -> Topology:
+        """Builds the periodic von Neumann neighbourhood of a given radius.
+
+        Args:
+            n (int): The size of the lattice.
+            radius (int): The largest Manhattan distance of a neighbour. Defaults to 1.
+
+        Returns:
+            Topology: The topology.
+        """
+        return cls.stencil(n, _offsets(radius, lambda di, dj: abs(di) + abs(dj)))
+
+    @classmethod
+    def moore(cls, n: int, radius: int = 1) -> Topology:
+        """Builds the periodic Moore neighbourhood of a given radius.
+
+        Args:
+            n (int): The size of the lattice.
+            radius (int): The largest Chebyshev distance of a neighbour. Defaults to 1.
+
+        Returns:
+            Topology: The topology.
+        """
+        return cls.stencil(n, _offsets(radius, lambda di, dj: max(abs(di), abs(dj))))
+
+    @classmethod
+    def small_world(
+        cls,
+        n: int,
+        k: int = 4,
+        p: float = 0.1,
+        seed: int | None = None,
+    ) -> Topology:
+        """Builds a Watts-Strogatz small-world graph over the sites of a lattice.
+
+        The `n * n` sites form a ring in row-major order, and every site
+        reads from its `k // 2` nearest sites on each side. Each of these
+        edges is then rewired with probability `p` to read from a random site.
+
+        Args:
+            n (int): The size of the lattice.
+            k (int): The number of neighbours of each site. Defaults to 4.
+            p (float): The rewiring probability. Defaults to 0.1.
+            seed (int | None): The seed of the rewiring. Defaults to None.
+
+        Returns:
+            Topology: The topology, with `k` edges per site.
+        """
+        if k < 2 or k % 2:
+            raise ValueError('K must be a positive even integer.')
+        size = n * n
+        rng = np.random.default_rng(seed)
+        shifts = np.concatenate([np.arange(1, k // 2 + 1), -np.arange(1, k // 2 + 1)])
+        indices = (np.arange(size)[:, None] + shifts).ravel() % size
+        rewire = rng.random(len(indices)) < p
+        indices[rewire] = rng.integers(0, size, int(rewire.sum()))
+        return cls(np.arange(size + 1, dtype=np.int64) * k, indices)
+
+    def degrees(self) -> np.ndarray:
+        """Returns the number of edges of every node."""
+        return np.diff(self.indptr)
+
+    def normalized(self) -> Topology:
+        """Returns the topology with the weights of every node summing to one."""
+        degrees = np.repeat(self.degrees(), self.degrees())
+        weights = self.weights if self.weights is not None else np.ones(len(self.indices))
+        return Topology(self.indptr, self.indices, weights / degrees)
+
+    def gather(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        batch = values.shape[:-2]
+        flat = values.reshape((*batch, self.size))
+        target = out.reshape((*batch, self.size))
+        # The last column is a zero sentinel, so nodes without edges at the
+        # end still start at a valid index and do not cut the range before them.
+        buffer = self._buffer(batch, values.dtype)
+        gathered = buffer[..., :-1]
+        np.take(flat, self.indices, axis=-1, out=gathered)
+        if self.weights is not None:
+            gathered *= self._weights(values.dtype)
+        if self._degree is not None:
+            # Every node has the same number of edges: sum strided columns.
+            edges = gathered.reshape((*batch, self.size, self._degree))
+            if self._degree == 0:
+                target.fill(0)
+            else:
+                np.copyto(target, edges[..., 0])
+                for k in range(1, self._degree):
+                    target += edges[..., k]
+        else:
+            np.add.reduceat(buffer, self._starts, axis=-1, out=target)
+            target[..., self._empty] = 0
+        return out
+
+    def _check(self, n: int) -> None:
+        if self.size != n * n:
+            raise ValueError(f"Topology must have {n * n} nodes, one per site.")
+
+    def _params(self) -> dict[str, np.ndarray]:
+        params = {'indptr': self.indptr, 'indices': self.indices}
+        if self.weights is not None:
+            params['weights'] = self.weights
+        return params
+
+    def _buffer(self, batch: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Returns the scratch buffer the values of the edges are gathered into."""
+        key = (batch, np.dtype(dtype))
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = np.empty((*batch, len(self.indices) + 1), dtype=dtype)
+            buf[..., -1] = 0
+        return buf
+
+    def _weights(self, dtype: np.dtype) -> np.ndarray:
+        """Returns the edge weights cast to a dtype, cached."""
+        key = ('weights', np.dtype(dtype))
+        weights = self._buffers.get(key)
+        if weights is None:
+            weights = self._buffers[key] = self.weights.astype(dtype)
+        return weights
+
+
+class Convolution(Coupling):
+    """A translation-invariant coupling applied as a periodic FFT convolution.
+
+    Site `(i, j)` receives the sum of the values of every site `(i + di,
+    j + dj)` times `kernel[di, dj]`, with periodic boundaries, so the
+    kernel covers the whole lattice and offsets wrap around as in
+    `Topology.stencil`. The sum is computed in O(n * n * log n) time with
+    real FFTs over the last two axes. The spectrum of the kernel is
+    computed once per dtype on first use and cached with the transform
+    buffers. Uniform kernels take the path of `GlobalCoupling` instead.
+
+    Attributes:
+        kernel (np.ndarray): The `(n, n)` weight of every offset.
+    """
+
+    def __init__(self, kernel: np.ndarray) -> None:
+        """Initializes the convolution.
+
+        Args:
+            kernel (np.ndarray): The `(n, n)` weight of every offset, with
+                `kernel[0, 0]` the weight of the site itself.
+        """
+        kernel = np.asarray(kernel, dtype=np.float64)
+        if kernel.ndim != 2 or kernel.shape[0] != kernel.shape[1] or not kernel.size:
+            raise ValueError('Kernel must be a square two-dimensional array.')
+        self.kernel = kernel
+        self._uniform = bool((kernel == kernel.flat[0]).all())
+        self._buffers = {}
+
+    def __repr__(self) -> str:
+        return f"Convolution(n={len(self.kernel)})"
+
+    @classmethod
+    def from_distance(cls, n: int, weight) -> Convolution:
+        """Builds a kernel from a function of the distance between two sites.
+
+        Distances are Euclidean with periodic boundaries, so they are at
+        most `n / sqrt(2)`. The site itself gets a weight of zero.
+
+        Args:
+            n (int): The size of the lattice.
+            weight (Callable[[np.ndarray], np.ndarray]): The weight of each
+                distance, applied to an array of distances.
+
+        Returns:
+            Convolution: The convolution.
+        """
+        offsets = np.minimum(np.arange(n), n - np.arange(n))
+        distance = np.hypot(offsets[:, None], offsets[None, :])
+        kernel = np.zeros((n, n))
+        kernel.flat[1:] = np.asarray(weight(distance.flat[1:]), dtype=np.float64)
+        return cls(kernel)
+
+    @classmethod
+    def power_law(cls, n: int, alpha: float) -> Convolution:
+        """Builds a normalized kernel decaying as a power of the distance.
+
+        Args:
+            n (int): The size of the lattice.
+            alpha (float): The decay exponent. Every other site gets a
+                weight proportional to `distance ** -alpha`.
+
+        Returns:
+            Convolution: The convolution, with weights summing to one.
+        """
+        return cls.from_distance(n, lambda distance: distance ** -alpha).normalized()
+
+    def normalized(self) -> Convolution:
+        """Returns the convolution with weights summing to one."""
+        total = self.kernel.sum()
+        if total == 0:
+            raise ValueError('Cannot normalize a kernel summing to zero.')
+        return Convolution(self.kernel / total)
+
+    def gather(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        if self._uniform:
+            return _mean_field(values, out, self.kernel.flat[0] * self.kernel.size)
+        n = values.shape[-1]
+        spectrum = self._buffer(values.shape[:-2], values.dtype)
+        np.fft.rfft2(values, axes=(-2, -1), out=spectrum)
+        spectrum *= self._spectrum(values.dtype)
+        return np.fft.irfft2(spectrum, s=(n, n), axes=(-2, -1), out=out)
+
+    def _check(self, n: int) -> None:
+        if self.kernel.shape != (n, n):
+            raise ValueError(f"Kernel must be of shape {(n, n)}.")
+
+    def _params(self) -> dict[str, np.ndarray]:
+        return {'kernel': self.kernel}
+
+    def _buffer(self, batch: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Returns the scratch buffer the spectrum of the values is written to."""
+        key = (batch, np.dtype(dtype))
+        buf = self._buffers.get(key)
+        if buf is None:
+            n = len(self.kernel)
+            buf = self._buffers[key] = np.empty(
+                (*batch, n, n // 2 + 1),
+                dtype=np.result_type(dtype, np.complex64),
+            )
+        return buf
+
+    def _spectrum(self, dtype: np.dtype) -> np.ndarray:
+        """Returns the cached spectrum of the kernel for a dtype."""
+        key = ('spectrum', np.dtype(dtype))
+        spectrum = self._buffers.get(key)
+        if spectrum is None:
+            # The conjugate turns the convolution into the sum over offsets.
+            spectrum = np.conj(np.fft.rfft2(self.kernel))
+            spectrum = self._buffers[key] = spectrum.astype(
+                np.result_type(dtype, np.complex64),
+            )
+        return spectrum
+
+
+class GlobalCoupling(Coupling):
+    """Mean-field coupling, where every site receives the mean of all sites.
+
+    The neighbour term is the same for every site, so it costs one mean
+    per lattice and step. With `CoupledMapLattice` this gives the globally
+    coupled map, `epsilon * f(x) + (1 - epsilon) * mean(f(x))`.
+
+    Attributes:
+        weight (float): The factor applied to the mean.
+    """
+
+    def __init__(self, weight: float = 1.0) -> None:
+        """Initializes the coupling.
+
+        Args:
+            weight (float): The factor applied to the mean. Defaults to 1.
+        """
+        self.weight = weight
+
+    def __repr__(self) -> str:
+        return f"GlobalCoupling(weight={self.weight})"
+
+    def gather(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        return _mean_field(values, out, self.weight)
+
+    def _params(self) -> dict[str, np.ndarray]:
+        return {'weight': np.asarray(self.weight)}
+
+
+def _mean_field(values: np.ndarray, out: np.ndarray, weight: float) -> np.ndarray:
+    """Fills every lattice in `out` with the weighted mean of its values."""
+    mean = values.mean(axis=(-2, -1), keepdims=True)
+    if weight != 1:
+        mean *= weight
+    out[...] = mean
+    return out
+
+
+def _offsets(radius: int, distance) -> list[tuple[int, int]]:
+    """Returns the non-zero offsets within a radius under a distance."""
+    return [
+        (di, dj)
+        for di in range(-radius, radius + 1)
+        for dj in range(-radius, radius + 1)
+        if 0 < distance(di, dj) <= radius
+    ]
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .cmlattice import CoupledMapLattice
+from .kaneko import KanekoLattice
+from .rulkov import RulkovLattice
+
+
+class _Ensemble:
+    """Runs a batch of lattices of one model as a single array.
+
+    The state gains a leading batch axis of length `size`, and the per-member
+    parameters are stored reshaped to broadcast against it, so every member
+    is advanced by the same whole-array kernel call. Members with
+    `epsilon >= 1` are updated independently, as single lattices are.
+
+    Attributes:
+        size (int): The number of lattices in the ensemble.
+    """
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(size={self.size}, n={self.n})"
+
+    def __len__(self) -> int:
+        return self.size
+
+    def _batch(self, *params, dtype: np.dtype = np.float64) -> list[np.ndarray]:
+        """Broadcasts per-member parameters to vectors of a common length."""
+        params = np.broadcast_arrays(
+            *(np.atleast_1d(np.asarray(p, dtype=dtype)) for p in params),
+        )
+        if params[0].ndim != 1:
+            raise ValueError('Ensemble parameters must be scalars or 1D arrays.')
+        self.size = len(params[0])
+        return params
+
+    def _expand(self, param: np.ndarray, ndim: int) -> np.ndarray:
+        """Reshapes a parameter vector to broadcast over `ndim` trailing axes."""
+        return param.reshape((self.size,) + (1,) * ndim)
+
+    def _params(self) -> dict[str, np.ndarray]:
+        """Returns the per-member parameters as vectors."""
+        return {
+            name: value if name in ('n', 'synchronous') else np.ravel(value)
+            for name, value in super()._params().items()
+        }
+
+    def _state_shape(self) -> tuple[int, ...]:
+        return (self.size, *super()._state_shape())
+
+    def _step(self) -> None:
+        """Advances all members with one coupled update.
+        Uncoupled members get a neighbour weight of zero.
+        """
+        self._update_coupled()
+
+    def _tangent(self, v: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Applies the Jacobian of the coupled update to tangent vectors."""
+        return self._tangent_coupled(v, out)
+
+    def _weights(self) -> tuple[np.ndarray, np.ndarray]:
+        center, neighbour = super()._weights()
+        coupled = self._coupled()
+        return np.where(coupled, center, 1), np.where(coupled, neighbour, 0)
+
+    def _coupled(self) -> np.ndarray:
+        """Returns which members use the coupled update."""
+        return self.epsilon < 1
+
+
+class CoupledMapEnsemble(_Ensemble, CoupledMapLattice):
+    """A batch of `CoupledMapLattice` lattices with a `(B, n, n)` state.
+
+    Args:
+        n (int): The size of each lattice.
+        r (float | np.ndarray): The map parameter of each member.
+        epsilon (float | np.ndarray): The coupling strength of each member.
+            Defaults to 1.
+    """
+
+    def __init__(self, n: int, r, epsilon=1, **kwargs) -> None:
+        r, epsilon = self._batch(r, epsilon, dtype=kwargs.get('dtype', np.float64))
+        super().__init__(n, self._expand(r, 2), self._expand(epsilon, 2), **kwargs)
+
+
+class KanekoEnsemble(_Ensemble, KanekoLattice):
+    """A batch of `KanekoLattice` lattices with a `(B, n, n)` state.
+
+    Args:
+        n (int): The size of each lattice.
+        r (float | np.ndarray): The map parameter of each member.
+        epsilon (float | np.ndarray): The coupling strength of each member.
+            Defaults to 1.
+    """
+
+    def __init__(self, n: int, r, epsilon=1, **kwargs) -> None:
+        r, epsilon = self._batch(r, epsilon, dtype=kwargs.get('dtype', np.float64))
+        super().__init__(n, self._expand(r, 2), self._expand(epsilon, 2), **kwargs)
+
+    def _coupled(self) -> np.ndarray:
+        """Kaneko lattices are always coupled."""
+        return np.True_
+
+
+class RulkovEnsemble(_Ensemble, RulkovLattice):
+    """A batch of `RulkovLattice` lattices with a `(B, 2, n, n)` state.
+
+    Args:
+        n (int): The size of each lattice.
+        r (float | np.ndarray): The `r` parameter of each member.
+        mu (float | np.ndarray): The `mu` parameter of each member.
+        sigma (float | np.ndarray): The `sigma` parameter of each member.
+        epsilon (float | np.ndarray): The coupling strength of each member.
+            Defaults to 1.
+    """
+
+    def __init__(self, n: int, r, mu, sigma, epsilon=1, **kwargs) -> None:
+        r, mu, sigma, epsilon = self._batch(
+            r, mu, sigma, epsilon, dtype=kwargs.get('dtype', np.float64),
+        )
+        super().__init__(
+            n,
+            self._expand(r, 2),
+            self._expand(mu, 2),
+            self._expand(sigma, 2),
+            self._expand(epsilon, 3),
+            **kwargs,
+        )
@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+
+import numpy as np
+
+
+class History:
+    """A contiguous, preallocated store of lattice states.
+
+    Frames are copied into a single `(T, *shape)` buffer, so reading the
+    history is an O(1) view rather than a copy. The retention mode decides
+    which frames are kept:
+
+    * `'all'` keeps every frame. The buffer doubles in size when full.
+    * `'ring'` keeps the last `window` frames. Every frame is written twice
+      into a buffer of `2 * window` frames, so the newest `window` frames
+      are always one contiguous slice.
+    * `'every'` keeps every `every`-th frame, starting with the first.
+    * `'none'` keeps nothing, for runs that only need the current state.
+
+    Attributes:
+        shape (tuple[int, ...]): The shape of a single frame.
+        dtype (np.dtype): The dtype of the stored frames.
+        mode (str): The retention mode.
+        window (int | None): The number of frames kept in `'ring'` mode.
+        every (int): The stride between kept frames in `'every'` mode.
+        count (int): The number of frames appended since the last clear.
+    """
+
+    MODES = ('all', 'ring', 'every', 'none')
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        dtype: np.dtype = np.float64,
+        mode: str = 'all',
+        window: int | None = None,
+        every: int = 1,
+    ) -> None:
+        if mode not in self.MODES:
+            raise ValueError(f"Retention mode must be one of {self.MODES}.")
+        if mode == 'ring' and (window is None or window < 1):
+            raise ValueError('Ring retention requires a positive window.')
+        if every < 1:
+            raise ValueError('Every must be a positive integer.')
+
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.mode = mode
+        self.window = window
+        self.every = every if mode == 'every' else 1
+        self._buffer = self._allocate(2 * window if mode == 'ring' else 0)
+        self.clear()
+
+    def __repr__(self) -> str:
+        return f"History(shape={self.shape}, mode={self.mode}, frames={len(self)})"
+
+    def __len__(self) -> int:
+        if self.mode == 'ring':
+            return min(self._written, self.window)
+        return self._written
+
+    def __getitem__(self, key):
+        return self.view()[key]
+
+    def __iter__(self):
+        return iter(self.view())
+
+    @property
+    def nbytes(self) -> int:
+        """Returns the number of bytes held by the buffer."""
+        return self._buffer.nbytes
+
+    def clear(self) -> None:
+        """Removes all frames, keeping the allocated buffer."""
+        self.count = 0
+        self._written = 0
+
+    def reserve(self, appends: int) -> None:
+        """Preallocates room for a number of future appends.
+
+        Args:
+            appends (int): The number of frames that will be appended.
+        """
+        if self.mode in ('ring', 'none'):
+            return
+        first = -self.count % self.every
+        stored = 0 if appends <= first else (appends - first - 1) // self.every + 1
+        if self._written + stored > len(self._buffer):
+            self._grow(self._written + stored)
+
+    def append(self, frame: np.ndarray) -> None:
+        """Copies a frame into the store, subject to the retention mode.
+
+        Args:
+            frame (np.ndarray): The frame to append.
+        """
+        if frame.shape != self.shape:
+            raise ValueError(f"Frame must be of shape {self.shape}.")
+        keep = self.mode != 'none' and self.count % self.every == 0
+        self.count += 1
+        if not keep:
+            return
+
+        if self.mode == 'ring':
+            slot = self._written % self.window
+            self._buffer[slot] = frame
+            self._buffer[slot + self.window] = frame
+        else:
+            if self._written == len(self._buffer):
+                self._grow(max(1, 2 * self._written))
+            self._buffer[self._written] = frame
+        self._written += 1
+
+    def extend(self, frames: Iterable[np.ndarray]) -> None:
+        """Appends several frames in order.
+
+        Args:
+            frames (Iterable[np.ndarray]): The frames to append.
+        """
+        for frame in frames:
+            self.append(frame)
+
+    def restore(self, frames: np.ndarray, count: int) -> None:
+        """Replaces the stored frames, for example with those of a saved run.
+
+        Args:
+            frames (np.ndarray): The frames kept by the retention mode, in time order.
+            count (int): The number of appends the frames were kept from.
+        """
+        if self.mode == 'ring':
+            raise ValueError('Ring retention cannot be restored.')
+        self.clear()
+        if len(frames) > len(self._buffer):
+            self._grow(len(frames))
+        self._buffer[:len(frames)] = frames
+        self._written = len(frames)
+        self.count = count
+
+    def view(self) -> np.ndarray:
+        """Returns a read-only view of the stored frames in time order.
+
+        Returns:
+            np.ndarray: An array of shape `(len(self), *shape)`.
+        """
+        if self.mode == 'ring' and self._written > self.window:
+            start = self._written % self.window
+            view = self._buffer[start:start + self.window]
+        else:
+            view = self._buffer[:len(self)]
+        view.flags.writeable = False
+        return view
+
+    def _allocate(self, frames: int) -> np.ndarray:
+        """Allocates a buffer for a number of frames."""
+        return np.empty((frames, *self.shape), dtype=self.dtype)
+
+    def _grow(self, frames: int) -> None:
+        """Grows the buffer to hold a number of frames, keeping its contents."""
+        buffer = self._allocate(frames)
+        buffer[:self._written] = self._buffer[:self._written]
+        self._buffer = buffer
+
+
+class MemmapHistory(History):
+    """A history store backed by a memory-mapped `.npy` file.
+
+    Frames are written straight to disk as they are appended, so the
+    history of long runs does not need to fit in memory. The file is a
+    regular `.npy` file whose header is rewritten on `flush`, and can be
+    read lazily with `load_history`. Ring retention is not supported.
+
+    Attributes:
+        path (str | os.PathLike): The path of the `.npy` file.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        shape: tuple[int, ...],
+        dtype: np.dtype = np.float64,
+        mode: str = 'all',
+        every: int = 1,
+        truncate: bool = True,
+    ) -> None:
+        if mode == 'ring':
+            raise ValueError('Memory-mapped history does not support ring retention.')
+        self.path = path
+        with open(path, 'wb' if truncate else 'r+b'):
+            pass
+        super().__init__(shape, dtype, mode, every=every)
+
+    @classmethod
+    def from_history(cls, path: str | os.PathLike, history: History) -> MemmapHistory:
+        """Creates a memory-mapped store holding the frames of another store.
+
+        Args:
+            path (str | os.PathLike): The path of the `.npy` file.
+            history (History): The store to copy frames and counters from.
+
+        Returns:
+            MemmapHistory: The new store.
+        """
+        store = cls(path, history.shape, history.dtype, history.mode, history.every)
+        frames = history.view()
+        store._grow(len(frames))
+        store._buffer[:len(frames)] = frames
+        store._written = len(frames)
+        store.count = history.count
+        return store
+
+    @classmethod
+    def resume(
+        cls,
+        path: str | os.PathLike,
+        shape: tuple[int, ...],
+        dtype: np.dtype = np.float64,
+        mode: str = 'all',
+        every: int = 1,
+        count: int = 0,
+    ) -> MemmapHistory:
+        """Reopens a history file to continue appending after `count` frames.
+
+        Frames stored after the first `count` appends, for example by a run
+        that was interrupted after its last checkpoint, are overwritten.
+
+        Args:
+            path (str | os.PathLike): The path of an existing `.npy` file.
+            shape (tuple[int, ...]): The shape of a single frame.
+            dtype (np.dtype): The dtype of the stored frames. Defaults to `np.float64`.
+            mode (str): The retention mode. Defaults to `'all'`.
+            every (int): The stride between kept frames. Defaults to 1.
+            count (int): The number of frames appended before the file was
+                left. Defaults to 0.
+
+        Returns:
+            MemmapHistory: The reopened store.
+        """
+        written = 0 if mode == 'none' else -(-count // (every if mode == 'every' else 1))
+        if written:
+            frames = load_history(path)
+            if frames.shape[1:] != tuple(shape) or len(frames) < written:
+                raise ValueError(f"History file {path} does not hold {written} frames.")
+            del frames
+        store = cls(path, shape, dtype, mode, every, truncate=False)
+        store._grow(written)
+        store._written = written
+        store.count = count
+        return store
+
+    def flush(self) -> None:
+        """Writes the current number of frames to the header and flushes to disk."""
+        if isinstance(self._buffer, np.memmap):
+            self._buffer.flush()
+        with open(self.path, 'r+b') as f:
+            self._write_header(f, len(self))
+
+    def close(self) -> None:
+        """Flushes the store and trims unused preallocated frames from the file."""
+        self.flush()
+        self._buffer = self._allocate(len(self), trim=True)
+
+    def _allocate(self, frames: int, trim: bool = False) -> np.ndarray:
+        """Resizes the file to hold a number of frames and maps it."""
+        frame_bytes = self.dtype.itemsize * int(np.prod(self.shape))
+        with open(self.path, 'r+b') as f:
+            offset = self._write_header(f, frames)
+            size = offset + frames * frame_bytes
+            f.seek(0, os.SEEK_END)
+            if trim or f.tell() < size:
+                f.truncate(size)
+        if frames == 0:
+            return np.empty((0, *self.shape), dtype=self.dtype)
+        return np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode='r+',
+            offset=offset,
+            shape=(frames, *self.shape),
+        )
+
+    def _grow(self, frames: int) -> None:
+        """Grows the file to hold a number of frames. Written frames stay in place."""
+        if isinstance(self._buffer, np.memmap):
+            self._buffer.flush()
+        self._buffer = self._allocate(frames)
+
+    def _write_header(self, f, frames: int) -> int:
+        """Writes a `.npy` header for a number of frames and returns its length."""
+        f.seek(0)
+        np.lib.format.write_array_header_1_0(
+            f,
+            {
+                'descr': np.lib.format.dtype_to_descr(self.dtype),
+                'fortran_order': False,
+                'shape': (frames, *self.shape),
+            },
+        )
+        return f.tell()
+
+
+def load_history(path: str | os.PathLike) -> np.ndarray:
+    """Opens a history `.npy` file as a lazy, read-only memory map.
+
+    Slicing the result only reads the requested frames from disk, so it
+    can be passed to `Visualization` or sliced along the time axis without
+    loading the whole history.
+
+    Args:
+        path (str | os.PathLike): The path of the `.npy` file.
+
+    Returns:
+        np.ndarray: A read-only memory map of shape `(T, n, n)`.
+    """
+    return np.load(path, mmap_mode='r')
+
+
+def neuron_trace(history: np.ndarray, neurons) -> np.ndarray:
+    """Extracts the time series of one or many neurons from a history.
+
+    A single neuron is returned as a strided view of the history, so no
+    frame is copied and memory-mapped histories are read lazily. Several
+    neurons are gathered into a new `(T, k)` array, which costs O(T * k).
+
+    Args:
+        history (np.ndarray): A history of shape `(T, ..., n, n)`.
+        neurons (tuple[int, int] | Sequence[tuple[int, int]]): The `(i, j)`
+            index of a neuron, or a sequence of them.
+
+    Returns:
+        np.ndarray: The time series, of shape `(T, ...)` for one neuron or
+            `(T, ..., k)` for `k` neurons.
+    """
+    if np.ndim(neurons) == 1:
+        i, j = neurons
+        return history[..., i, j]
+    rows, cols = np.asarray(neurons).T
+    return history[..., rows, cols]
@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import time
+import tracemalloc
+from collections import deque
+
+import numpy as np
+
+from .history import History
+
+
+class Instrumentation:
+    """Measures where the time of each lattice update goes.
+
+    Enabled with `CoupledMapLattice.instrument`. Each update then records
+    the time spent in the update kernel, the time spent appending to the
+    history, the wall time since the previous update and, if
+    `track_memory` is set, the bytes allocated during the update. When
+    it is disabled, the lattice does not measure anything.
+
+    Only the latest `keep` records are kept, in a ring, so long runs use
+    bounded memory. `summary` is computed from running totals over every
+    measured update.
+
+    Attributes:
+        window (int): The number of updates the rolling rate is taken over.
+        track_memory (bool): Whether allocations are traced with `tracemalloc`.
+        records (History): The `(kernel, history, wall, bytes)` records of
+            the latest `keep` updates.
+        steps (int): The number of measured updates.
+    """
+
+    FIELDS = ('kernel', 'history', 'wall', 'bytes')
+
+    def __init__(
+        self,
+        window: int = 100,
+        track_memory: bool = False,
+        keep: int = 1000,
+    ) -> None:
+        self.window = window
+        self.track_memory = track_memory
+        self.records = History((len(self.FIELDS),), mode='ring', window=keep)
+        self.steps = 0
+        self._totals = np.zeros(len(self.FIELDS))
+        self._walls = deque(maxlen=window)
+        self._last = None
+        self._tracing = track_memory and not tracemalloc.is_tracing()
+        if self._tracing:
+            tracemalloc.start()
+
+    def __repr__(self) -> str:
+        return f"Instrumentation(steps={self.steps}, rate={self.rate:.1f})"
+
+    @property
+    def rate(self) -> float:
+        """Returns the rolling number of updates per second."""
+        total = sum(self._walls)
+        return len(self._walls) / total if total > 0 else 0.0
+
+    @property
+    def last(self) -> dict[str, float]:
+        """Returns the record of the latest update."""
+        if len(self.records) == 0:
+            return {}
+        return dict(zip(self.FIELDS, self.records[-1].tolist()))
+
+    def measure(self, lattice, record: bool = True) -> None:
+        """Updates a lattice while timing the kernel and the history append.
+
+        Args:
+            lattice (CoupledMapLattice): The lattice to update.
+            record (bool): Whether to record the new state in history.
+                Defaults to True.
+        """
+        if self.track_memory:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        lattice._step()
+        kernel = time.perf_counter()
+        if record:
+            lattice._record()
+        end = time.perf_counter()
+
+        allocated = 0
+        if self.track_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            allocated = peak - before
+        wall = end - (self._last if self._last is not None else start)
+        self._last = end
+        self._walls.append(wall)
+        record = np.array([kernel - start, end - kernel, wall, allocated])
+        self.records.append(record)
+        self._totals += record
+        self.steps += 1
+
+    def close(self) -> None:
+        """Stops tracing allocations, if this instrumentation started it."""
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+        self.track_memory = False
+
+    def summary(self) -> dict[str, float]:
+        """Returns totals and means over every measured update.
+
+        Returns:
+            dict[str, float]: The number of `steps`, the mean of each field,
+                the total `bytes` allocated and the current rolling `rate`.
+        """
+        means = self._totals / max(self.steps, 1)
+        summary = {'steps': self.steps}
+        summary.update(
+            {f"mean_{field}": float(mean) for field, mean in zip(self.FIELDS, means)},
+        )
+        summary['bytes'] = float(self._totals[3])
+        summary['rate'] = self.rate
+        return summary
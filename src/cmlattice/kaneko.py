@@ -1,33 +1,146 @@
 from __future__ import annotations
 
+import numpy as np
+
+from .cmlattice import _add_rows
+from .cmlattice import _roll_rows
+from .cmlattice import _row
 from .cmlattice import CoupledMapLattice
 
 
 class KanekoLattice(CoupledMapLattice):
-    """An implementation of the Kaneko map."""
+    """An implementation of the Kaneko map.
+
+    By default the rows are updated one after the other, and each row is
+    coupled to the already updated row before it, as in a sequential loop
+    over the sites. With `synchronous=True`, every site is updated at
+    once from the previous state instead.
+
+    Attributes:
+        synchronous (bool): Whether all sites are updated from the previous state.
+    """
 
-    def __init__(self, n: int, r: float, epsilon: float = 1) -> None:
-        super().__init__(n, r, epsilon)
+    def __init__(
+        self,
+        n: int,
+        r: float,
+        epsilon: float = 1,
+        synchronous: bool = False,
+        **kwargs,
+    ) -> None:
+        if kwargs.get('coupling') is not None:
+            raise ValueError(
+                'Kaneko lattices couple the state and the mapped state of '
+                'different neighbours and do not support a coupling.',
+            )
+        self.synchronous = synchronous
+        super().__init__(n, r, epsilon, **kwargs)
 
     def __repr__(self):
         return f"KenekoLattice(n={self.n}, r={self.r}, epsilion={self.epsilon})"
 
-    def update(self):
-        """Updates the state of the lattice using the Kaneko map."""
-        state = self.state.copy()
-        for i in range(self.n):
-            left_neighbor = state[(i - 1) % self.n]
-            right_neighbor = state[(i + 1) % self.n]
-            for j in range(self.n):
-                # Apply the Kaneko map update
-                state[i, j] = self.epsilon * self.state_function(state[i, j]) + (
-                    self.epsilon / 2
-                ) * (
-                    self.state_function(
-                        left_neighbor[j] +
-                        self.state_function(right_neighbor[j]),
-                    )
-                )
-        self.state = state
-        self.append_history(self.state)
-        self.time += 1
+    def _params(self) -> dict[str, float]:
+        return {**super()._params(), 'synchronous': self.synchronous}
+
+    def _step(self) -> None:
+        """Advances the state by one step. The Kaneko map is always coupled."""
+        self._update_coupled()
+
+    def _update_coupled(self) -> None:
+        """Updates the state of the lattice using the Kaneko map.
+
+        Each site is coupled to its left and right neighbours, the sites in
+        the previous and next rows with periodic boundaries. See `_sweep`
+        for the default sequential update. Synchronous lattices update all
+        sites at once from the previous state.
+        """
+        if not self.synchronous:
+            self._sweep(self._buffer('next'))
+            self._swap('next')
+            return
+        center, neighbour = self._weights()
+        mapped = self._map(self._state, self._buffer('mapped'))
+        inner = _roll_rows(self._state, -1, self._buffer('inner'))
+        _add_rows(inner, mapped, 1)
+        out = self._map(inner, self._buffer('next'))
+        out *= neighbour
+        mapped *= center
+        out += mapped
+        self._swap('next')
+
+    def _sweep(
+        self,
+        out: np.ndarray,
+        v: np.ndarray | None = None,
+        tangent: np.ndarray | None = None,
+    ) -> None:
+        """Writes the next state of a sequential update into `out`.
+
+        The rows are updated in order, and row `i` sees the updated row
+        `i - 1` and the previous row `i + 1`, except that the last row sees
+        the updated first row. The sites of a row do not depend on each
+        other, so each row is updated at once. If `v` is given, the
+        Jacobian of the update times `v` is written into `tangent`.
+
+        Args:
+            out (np.ndarray): The array to write the next state to.
+            v (np.ndarray | None): Tangent vectors, of shape `(k, *state.shape)`.
+            tangent (np.ndarray | None): The array to write the tangent to.
+        """
+        center, neighbour = self._weights()
+        state = self._state
+        n = state.shape[-2]
+        mapped = self._buffer('mapped')
+        inner = self._buffer('sweep_inner', _row(state, 0))
+        right = self._buffer('sweep_right', _row(state, 0))
+        for i in range(n):
+            self._map(_row(state, i), _row(mapped, i))
+        if v is not None:
+            local = self._buffer('sweep_local', _row(v, 0))
+            shifted = self._buffer('sweep_shifted', _row(v, 0))
+        for i in range(n):
+            last = 0 < i == n - 1
+            before = _row(state, n - 1) if i == 0 else _row(out, i - 1)
+            after = _row(out, 0) if last else _row(state, (i + 1) % n)
+            if last:
+                self._map(after, right)
+            np.add(before, right if last else _row(mapped, (i + 1) % n), out=inner)
+            if v is not None:
+                # The chain rule through the rows updated earlier in the sweep.
+                self._derivative(after, _row(tangent if last else v, (i + 1) % n), shifted)
+                shifted += _row(v, n - 1) if i == 0 else _row(tangent, i - 1)
+                row = self._derivative(inner, shifted, _row(tangent, i))
+                row *= neighbour
+                local = self._derivative(_row(state, i), _row(v, i), local)
+                local *= center
+                row += local
+            row = self._map(inner, _row(out, i))
+            row *= neighbour
+            mapped_row = _row(mapped, i)
+            mapped_row *= center
+            row += mapped_row
+    def _weights(self) -> tuple[float, float]:
+        """Returns the weights of a site and of its neighbour term."""
+        return self.epsilon, self.epsilon / 2
+
+    def _tangent(self, v: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """The Kaneko map is always coupled."""
+        return self._tangent_coupled(v, out)
+
+    def _tangent_coupled(self, v: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the Jacobian of `_update_coupled` times `v` into `out`."""
+        if not self.synchronous:
+            self._sweep(self._buffer('tangent_next'), v, out)
+            return out
+        center, neighbour = self._weights()
+        mapped = self._map(self._state, self._buffer('mapped'))
+        inner = _roll_rows(self._state, -1, self._buffer('inner'))
+        _add_rows(inner, mapped, 1)
+        local = self._derivative(self._state, v, self._buffer('tangent_mapped', v))
+        shifted = _roll_rows(v, -1, self._buffer('tangent_inner', v))
+        _add_rows(shifted, local, 1)
+        self._derivative(inner, shifted, out)
+        out *= neighbour
+        local *= center
+        out += local
+        return out
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def lyapunov_spectrum(
+    lattice,
+    steps: int,
+    vectors: int = 1,
+    transient: int = 0,
+    renormalize: int = 1,
+) -> np.ndarray:
+    """Estimates the leading Lyapunov exponents of a lattice.
+
+    Tangent vectors are evolved alongside the state with the analytic
+    Jacobian of the lattice update, all vectors at once as one array, and
+    re-orthonormalized with a QR decomposition every `renormalize` steps.
+    The exponents are the mean logarithmic growth per step of the
+    orthonormalized vectors. The lattice is advanced by `transient + steps`
+    steps, and its `time` with it, but the states are not recorded in its
+    history or passed to its observers.
+
+    For ensembles, the exponents of every member are estimated at once,
+    so one call covers a whole grid of parameter values.
+
+    Args:
+        lattice (CoupledMapLattice): The lattice to analyse.
+        steps (int): The number of steps to average the growth over.
+        vectors (int): The number of exponents to estimate. Defaults to 1,
+            which only gives the largest exponent.
+        transient (int): The number of steps to run before averaging.
+            Defaults to 0.
+        renormalize (int): The number of steps between renormalizations.
+            Defaults to 1.
+
+    Returns:
+        np.ndarray: The exponents in decreasing order, of shape `(vectors,)`
+            for a lattice or `(size, vectors)` for an ensemble.
+    """
+    if steps < 1 or renormalize < 1:
+        raise ValueError('Steps and renormalize must be positive integers.')
+    shape = lattice._state.shape
+    batch = lattice._frame().shape[:-2]
+    dimension = int(np.prod(shape[len(batch):]))
+    if not 1 <= vectors <= dimension:
+        raise ValueError(f"Vectors must be between 1 and {dimension}.")
+
+    for _ in range(transient):
+        lattice._step()
+        lattice.time += 1
+
+    tangent = lattice.rng.standard_normal((vectors, *shape)).astype(lattice.dtype)
+    tangent, _ = _orthonormalize(tangent, batch)
+    out = np.empty_like(tangent)
+    growth = np.zeros((*batch, vectors))
+    for t in range(1, steps + 1):
+        lattice._tangent(tangent, out)
+        lattice._step()
+        lattice.time += 1
+        tangent, out = out, tangent
+        if t % renormalize == 0 or t == steps:
+            tangent, logs = _orthonormalize(tangent, batch)
+            growth += logs
+    return growth / steps
+
+
+def _orthonormalize(
+    tangent: np.ndarray,
+    batch: tuple[int, ...],
+) -> tuple[np.ndarray, np.ndarray]:
+    """Orthonormalizes tangent vectors per lattice.
+
+    Args:
+        tangent (np.ndarray): The `(k, *batch, ...)` tangent vectors.
+        batch (tuple[int, ...]): The batch shape of the lattice.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The orthonormalized vectors, and the
+            `(*batch, k)` logarithms of the stretch of each vector.
+    """
+    k = tangent.shape[0]
+    if k == 1:
+        axes = tuple(range(1 + len(batch), tangent.ndim))
+        norms = np.sqrt(np.square(tangent, dtype=np.float64).sum(axis=axes))
+        tangent /= norms.reshape(norms.shape + (1,) * len(axes)).astype(tangent.dtype)
+        return tangent, np.log(np.moveaxis(norms, 0, -1))
+    # Stack the vectors of each lattice as the columns of a (*batch, d, k) matrix.
+    matrix = np.moveaxis(tangent.reshape((k, *batch, -1)), 0, -1)
+    q, r = np.linalg.qr(matrix)
+    logs = np.log(np.abs(np.diagonal(r, axis1=-2, axis2=-1)))
+    tangent = np.ascontiguousarray(np.moveaxis(q, -1, 0)).reshape(tangent.shape)
+    return tangent, logs
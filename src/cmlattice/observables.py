@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .history import History
+from .observers import Observer
+
+QUANTITIES = ('mean', 'variance', 'sync', 'histogram')
+
+
+class Observables(Observer):
+    """Computes aggregate quantities of every recorded state as it is produced.
+
+    Observables are attached with `CoupledMapLattice.add_observables` and
+    update in one O(n * n) pass per state, so a run that only needs these
+    quantities can switch its history off with `retention='none'`. The
+    quantities are:
+
+    * `'mean'`: the mean field of every state.
+    * `'variance'`: the spatial variance of every state.
+    * `'sync'`: the synchronization order parameter, the variance of the
+      mean field over time divided by the mean variance of a site over
+      time. It is 1 for fully synchronized lattices and tends to 0 for
+      uncorrelated sites.
+    * `'histogram'`: the counts of site values over all states, in `bins`
+      equal bins. Values outside the range are counted in the edge bins.
+
+    The mean field and the variance cost one value per state and lattice.
+    The order parameter and the histogram are running totals, of O(n * n)
+    and O(bins) memory. For ensembles, every quantity is kept per member.
+
+    Attributes:
+        quantities (tuple[str, ...]): The computed quantities.
+        bins (int): The number of histogram bins.
+        range (tuple[float, float] | None): The range of the histogram. If
+            None, it is taken from the first recorded state.
+        count (int): The number of recorded states.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        quantities=QUANTITIES,
+        bins: int = 64,
+        range: tuple[float, float] | None = None,
+    ) -> None:
+        """Initializes the observables.
+
+        Args:
+            shape (tuple[int, ...]): The shape of the frames it records.
+            quantities (Sequence[str]): The quantities to compute. Defaults to all.
+            bins (int): The number of histogram bins. Defaults to 64.
+            range (tuple[float, float] | None): The range of the histogram.
+                Defaults to the range of the first recorded state.
+        """
+        unknown = set(quantities) - set(QUANTITIES)
+        if unknown:
+            raise ValueError(f"Quantities must be among {QUANTITIES}.")
+        if bins < 1:
+            raise ValueError('Bins must be a positive integer.')
+        self.quantities = tuple(quantities)
+        self.bins = bins
+        self.range = range
+        self.count = 0
+        self._shape = tuple(shape)
+        batch = self._shape[:-2]
+        self._mean = History(batch)
+        self._variance = History(batch)
+        self._scratch = np.empty(self._shape)
+        if 'sync' in self.quantities:
+            self._work = np.empty(self._shape)
+            self._site_mean = np.zeros(self._shape)
+            self._site_m2 = np.zeros(self._shape)
+            self._field_mean = np.zeros(batch)
+            self._field_m2 = np.zeros(batch)
+        if 'histogram' in self.quantities:
+            self._counts = np.zeros((*batch, bins), dtype=np.int64)
+            members = int(np.prod(batch, dtype=np.intp))
+            self._offsets = (np.arange(members) * bins).reshape((*batch, 1, 1))
+
+    def __repr__(self) -> str:
+        return f"Observables(quantities={self.quantities}, steps={self.count})"
+
+    def __len__(self) -> int:
+        return self.count
+
+    @property
+    def mean(self) -> np.ndarray:
+        """Returns a read-only `(T, ...)` view of the mean field of every state."""
+        return self._mean.view()
+
+    @property
+    def variance(self) -> np.ndarray:
+        """Returns a read-only `(T, ...)` view of the spatial variance of every state."""
+        return self._variance.view()
+
+    @property
+    def sync(self) -> np.ndarray | float:
+        """Returns the synchronization order parameter of the recorded states."""
+        site = self._site_m2.mean(axis=(-2, -1))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sync = np.where(site > 0, self._field_m2 / site, 1.0)
+        return sync[()]
+
+    @property
+    def histogram(self) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the histogram counts and the `bins + 1` bin edges."""
+        edges = np.linspace(*(self.range or (0, 1)), self.bins + 1)
+        return self._counts.copy(), edges
+
+    def results(self) -> dict[str, np.ndarray]:
+        """Returns every computed quantity as compact arrays.
+
+        Returns:
+            dict[str, np.ndarray]: The `mean` and `variance` series, the
+                `sync` order parameter and the `histogram` counts with their
+                `edges`, for the computed quantities.
+        """
+        results = {}
+        if 'mean' in self.quantities:
+            results['mean'] = self.mean.copy()
+        if 'variance' in self.quantities:
+            results['variance'] = self.variance.copy()
+        if 'sync' in self.quantities:
+            results['sync'] = np.asarray(self.sync)
+        if 'histogram' in self.quantities:
+            results['histogram'], results['edges'] = self.histogram
+        return results
+
+    def start(self, lattice, steps: int) -> None:
+        """Preallocates room for the states of a run."""
+        self._mean.reserve(steps)
+        self._variance.reserve(steps)
+
+    def __call__(self, lattice) -> None:
+        """Records the latest state of the lattice."""
+        self.record(lattice._frame())
+
+    def record(self, frame: np.ndarray) -> None:
+        """Updates every quantity with a frame.
+
+        Args:
+            frame (np.ndarray): The frame to record.
+        """
+        if frame.shape != self._shape:
+            raise ValueError(f"Frame must be of shape {self._shape}.")
+        self.count += 1
+        mean = frame.mean(axis=(-2, -1))
+        if 'mean' in self.quantities:
+            self._mean.append(mean)
+        if 'variance' in self.quantities:
+            deviation = np.subtract(frame, mean[..., None, None], out=self._scratch)
+            np.square(deviation, out=deviation)
+            self._variance.append(deviation.mean(axis=(-2, -1)))
+        if 'sync' in self.quantities:
+            self._update_sync(frame, mean)
+        if 'histogram' in self.quantities:
+            self._update_histogram(frame)
+
+    def _update_sync(self, frame: np.ndarray, mean: np.ndarray) -> None:
+        """Updates the running variances of the sites and of the mean field."""
+        # Welford's update, with the variances kept as sums of squared deviations.
+        delta = np.subtract(frame, self._site_mean, out=self._scratch)
+        step = np.divide(delta, self.count, out=self._work)
+        self._site_mean += step
+        np.subtract(frame, self._site_mean, out=step)
+        delta *= step
+        self._site_m2 += delta
+        field_delta = mean - self._field_mean
+        self._field_mean += field_delta / self.count
+        self._field_m2 += field_delta * (mean - self._field_mean)
+
+    def _update_histogram(self, frame: np.ndarray) -> None:
+        """Adds the site values of a frame to the histogram counts."""
+        if self.range is None:
+            self.range = (float(np.nanmin(frame)), float(np.nanmax(frame)))
+        low, high = self.range
+        scaled = np.subtract(frame, low, out=self._scratch)
+        scaled *= self.bins / (high - low) if high > low else 0
+        np.nan_to_num(scaled, copy=False)
+        np.clip(scaled, 0, self.bins - 1, out=scaled)
+        indices = scaled.astype(np.intp)
+        indices += self._offsets
+        counts = np.bincount(indices.ravel(), minlength=self._counts.size)
+        self._counts += counts.reshape(self._counts.shape)
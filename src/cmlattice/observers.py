@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+from .history import History
+
+
+class Observer:
+    """Base class for objects notified at the step boundaries of a lattice.
+
+    Observers are attached with `CoupledMapLattice.add_observer` and called
+    with the lattice after every update. Any callable taking the lattice can
+    be attached; subclassing `Observer` adds a hook for the start of a run.
+    """
+
+    def start(self, lattice, steps: int) -> None:
+        """Called when `simulate` starts a run.
+
+        Args:
+            lattice (CoupledMapLattice): The lattice being simulated.
+            steps (int): The number of steps of the run.
+        """
+
+    def __call__(self, lattice) -> None:
+        """Called after every update of the lattice.
+
+        Args:
+            lattice (CoupledMapLattice): The lattice that was updated.
+        """
+
+
+class Probe(Observer):
+    """Records the time series of selected neurons only.
+
+    Probes are attached with `CoupledMapLattice.add_probe` and record the
+    selected neurons of every recorded state. Combined with the `'none'`
+    retention mode, the traces of a long run cost O(T * k) memory instead
+    of O(T * n * n).
+
+    Attributes:
+        neurons (np.ndarray): The `(k, 2)` indices of the recorded neurons.
+    """
+
+    def __init__(
+        self,
+        neurons,
+        shape: tuple[int, ...],
+        dtype: np.dtype = np.float64,
+    ) -> None:
+        """Initializes the probe.
+
+        Args:
+            neurons (Sequence[tuple[int, int]]): The `(i, j)` indices of the neurons.
+            shape (tuple[int, ...]): The shape of the frames it records.
+            dtype (np.dtype): The dtype of the frames. Defaults to `np.float64`.
+        """
+        self.neurons = np.atleast_2d(np.asarray(neurons, dtype=np.intp))
+        if self.neurons.ndim != 2 or self.neurons.shape[1] != 2:
+            raise ValueError('Neurons must be (i, j) index pairs.')
+        self._rows, self._cols = self.neurons.T
+        self._history = History((*shape[:-2], len(self.neurons)), dtype)
+
+    def __repr__(self) -> str:
+        return f"Probe(neurons={self.neurons.tolist()}, steps={len(self._history)})"
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Returns a read-only `(T, ..., k)` view of the recorded values."""
+        return self._history.view()
+
+    def trace(self, neuron: tuple[int, int]) -> np.ndarray:
+        """Returns the time series of one of the recorded neurons.
+
+        Args:
+            neuron (tuple[int, int]): The `(i, j)` index of the neuron.
+
+        Returns:
+            np.ndarray: A strided view of the recorded values.
+        """
+        matches = np.flatnonzero((self.neurons == neuron).all(axis=1))
+        if len(matches) == 0:
+            raise ValueError(f"Neuron {neuron} is not recorded by this probe.")
+        return self.values[..., matches[0]]
+
+    def start(self, lattice, steps: int) -> None:
+        """Preallocates room for the states of a run."""
+        self._history.reserve(steps)
+
+    def __call__(self, lattice) -> None:
+        """Records the selected neurons of the latest state."""
+        self.record(lattice._frame())
+
+    def record(self, frame: np.ndarray) -> None:
+        """Records the selected neurons of a frame.
+
+        Args:
+            frame (np.ndarray): The frame to record from.
+        """
+        self._history.append(frame[..., self._rows, self._cols])
+
+
+class Checkpointer(Observer):
+    """Saves a checkpoint of the lattice every few steps.
+
+    Before each checkpoint, a history streamed to disk is flushed, so the
+    checkpoint never refers to frames that are not in the file yet. A run
+    interrupted at any point can be resumed with
+    `CoupledMapLattice.from_checkpoint` from the latest checkpoint.
+
+    Attributes:
+        path (str | os.PathLike): The path of the `.npz` checkpoint.
+        every (int): The number of steps between checkpoints.
+    """
+
+    def __init__(self, path: str | os.PathLike, every: int = 100) -> None:
+        if every < 1:
+            raise ValueError('Every must be a positive integer.')
+        self.path = path
+        self.every = every
+        self._saved = 0
+
+    def __repr__(self) -> str:
+        return f"Checkpointer(path={self.path!r}, every={self.every})"
+
+    def start(self, lattice, steps: int) -> None:
+        """Counts the steps to the next checkpoint from the start of the run."""
+        self._saved = lattice.time
+
+    def __call__(self, lattice) -> None:
+        """Saves a checkpoint once `every` steps have passed since the last one."""
+        if lattice.time - self._saved >= self.every:
+            self.save(lattice)
+
+    def save(self, lattice) -> None:
+        """Flushes the history of the lattice and saves a checkpoint.
+
+        Args:
+            lattice (CoupledMapLattice): The lattice to save.
+        """
+        flush = getattr(lattice._history, 'flush', None)
+        if flush is not None:
+            flush()
+        lattice.save_checkpoint(self.path)
+        self._saved = lattice.time
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import copy
+import multiprocessing
+import os
+import traceback
+from collections.abc import Generator
+from multiprocessing.shared_memory import SharedMemory
+from threading import BrokenBarrierError
+from typing import Self
+
+import numpy as np
+
+from .history import MemmapHistory
+from .observers import Observer
+
+
+class DomainDecomposition:
+    """Runs the updates of one large lattice over several worker processes.
+
+    Each worker owns a block of rows, which it keeps padded with one halo
+    row on either side and updates with the kernel of the lattice. After
+    every step, the workers exchange the rows at the edges of their blocks
+    through two alternating states in `multiprocessing.shared_memory`,
+    with a barrier between the steps. The halo rows cover the neighbours
+    of the base, Kaneko and Rulkov couplings, and the kernel performs the
+    same operations on every site, so the results are bit-identical to
+    `CoupledMapLattice.simulate`.
+
+    Recorded states are copied back into the lattice, so its history,
+    observers and checkpoints work as usual.
+
+    Attributes:
+        lattice (CoupledMapLattice): The lattice being simulated.
+        workers (int): The number of worker processes.
+        blocks (list[tuple[int, int]]): The `(start, stop)` rows of each worker.
+    """
+
+    def __init__(self, lattice, workers: int | None = None) -> None:
+        """Starts the worker processes.
+
+        Args:
+            lattice (CoupledMapLattice): The lattice to simulate.
+            workers (int | None): The number of worker processes. Defaults
+                to the number of cores available to this process.
+        """
+        if lattice._frame().ndim != 2:
+            raise ValueError('Domain decomposition only supports single lattices.')
+        if lattice.coupling is not None:
+            raise ValueError('Domain decomposition only supports the row neighbours.')
+        if not getattr(lattice, 'synchronous', True):
+            raise ValueError(
+                'Domain decomposition only supports synchronous updates, since '
+                'sequential sweeps carry every row over to the next one.',
+            )
+        self.lattice = lattice
+        shape = lattice._state.shape
+        workers = workers or os.process_cpu_count() or 1
+        self.workers = min(workers, shape[-2])
+        bounds = np.linspace(0, shape[-2], self.workers + 1).astype(int)
+        self.blocks = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+        self._shared = [
+            SharedMemory(create=True, size=max(1, lattice._state.nbytes))
+            for _ in range(2)
+        ]
+        self._states = [
+            np.ndarray(shape, lattice.dtype, buffer=shared.buf)
+            for shared in self._shared
+        ]
+        self._current = 0
+
+        template = copy.copy(lattice)
+        template.__dict__.update(
+            _state=None,
+            _buffers={},
+            _history=None,
+            _observers=[],
+            instrumentation=None,
+        )
+        context = multiprocessing.get_context()
+        barrier = context.Barrier(self.workers)
+        self._connections = []
+        self._processes = []
+        for start, stop in self.blocks:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_work,
+                args=(
+                    template,
+                    [shared.name for shared in self._shared],
+                    shape,
+                    start,
+                    stop,
+                    barrier,
+                    child,
+                ),
+                daemon=True,
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def __repr__(self) -> str:
+        return f"DomainDecomposition(workers={self.workers}, blocks={self.blocks})"
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def simulate(
+        self,
+        steps: int,
+        burn_in: int = 0,
+        every: int = 1,
+    ) -> Generator[np.ndarray]:
+        """Simulates the lattice over the workers. See `CoupledMapLattice.simulate`.
+
+        Args:
+            steps (int): The number of steps to simulate after the burn-in.
+            burn_in (int): The number of steps to run first without recording
+                or yielding anything. Defaults to 0.
+            every (int): Only every `every`-th state is recorded, passed to
+                the observers and yielded. Defaults to 1.
+
+        Yields:
+            np.ndarray: The state of the lattice at each recorded step.
+        """
+        for _ in self._run(steps, burn_in, every):
+            yield self.lattice.state
+
+    def advance(self, steps: int, burn_in: int = 0, every: int = 1) -> None:
+        """Simulates the lattice over the workers without yielding the states.
+
+        Args:
+            steps (int): The number of steps to simulate after the burn-in.
+            burn_in (int): The number of steps to run first without recording
+                anything. Defaults to 0.
+            every (int): Only every `every`-th state is recorded and passed to
+                the observers. Defaults to 1.
+        """
+        for _ in self._run(steps, burn_in, every):
+            pass
+
+    def close(self) -> None:
+        """Stops the workers and releases the shared memory."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in self._processes:
+            process.join()
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+        self._processes = []
+        self._states = []
+        for shared in self._shared:
+            shared.close()
+            shared.unlink()
+        self._shared = []
+
+    def _run(self, steps: int, burn_in: int, every: int) -> Generator[None]:
+        """Runs a simulation, yielding after every recorded step."""
+        if burn_in < 0 or every < 1:
+            raise ValueError('Burn-in must be non-negative and every positive.')
+        if not self._processes:
+            raise ValueError('The workers have been closed.')
+        lattice = self.lattice
+        np.copyto(self._states[self._current], lattice._state)
+
+        self._advance(burn_in)
+        lattice.time += burn_in
+        recorded = steps // every
+        lattice._history.reserve(recorded)
+        for observer in lattice._observers:
+            if isinstance(observer, Observer):
+                observer.start(lattice, recorded)
+
+        try:
+            for _ in range(recorded):
+                self._advance(every)
+                np.copyto(lattice._state, self._states[self._current])
+                lattice._record()
+                lattice.time += every
+                for observer in lattice._observers:
+                    observer(lattice)
+                yield
+            self._advance(steps % every)
+            np.copyto(lattice._state, self._states[self._current])
+            lattice.time += steps % every
+        finally:
+            if isinstance(lattice._history, MemmapHistory):
+                lattice._history.flush()
+
+    def _advance(self, steps: int) -> None:
+        """Runs a number of steps on every worker and waits for them."""
+        if steps == 0:
+            return
+        for connection in self._connections:
+            connection.send((self._current, steps))
+        failures = [connection.recv() for connection in self._connections]
+        failures = [failure for failure in failures if failure is not None]
+        if failures:
+            self.close()
+            # Workers that did not fail only report the broken barrier.
+            failures.sort(key=lambda failure: isinstance(failure[0], BrokenBarrierError))
+            error, trace = failures[0]
+            error.add_note(f"Raised in a worker process:\n{trace}")
+            raise error
+        self._current = (self._current + steps) % 2
+
+
+def _work(template, names, shape, start, stop, barrier, connection) -> None:
+    """Updates the rows `start:stop` of a shared state, on request.
+
+    The block stays in the worker between the steps of a request, padded
+    with one halo row on either side. After each step the worker publishes
+    its first and last rows in the shared state of that step and, past the
+    barrier, reads the rows next to its block back into the halo rows. The
+    two shared states alternate, so no worker overwrites rows a neighbour
+    has yet to read. The whole block is only written back at the end.
+
+    An exception raised by a request breaks the barrier of the other
+    workers, and is sent back with its formatted traceback, since
+    tracebacks do not survive pickling.
+    """
+    shared = [SharedMemory(name=name, track=False) for name in names]
+    states = [np.ndarray(shape, template.dtype, buffer=s.buf) for s in shared]
+    n = shape[-2]
+    above, below = (start - 1) % n, stop % n
+    lattice = template
+    lattice._state = np.empty((*shape[:-2], stop - start + 2, shape[-1]), template.dtype)
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            current, steps = request
+            try:
+                np.copyto(lattice._state[..., 1:-1, :], states[current][..., start:stop, :])
+                _read_halo(lattice._state, states[current], above, below)
+                for t in range(1, steps + 1):
+                    lattice._step()
+                    if t == steps:
+                        break
+                    state = states[(current + t) % 2]
+                    np.copyto(state[..., start, :], lattice._state[..., 1, :])
+                    np.copyto(state[..., stop - 1, :], lattice._state[..., -2, :])
+                    barrier.wait()
+                    _read_halo(lattice._state, state, above, below)
+                final = states[(current + steps) % 2]
+                np.copyto(final[..., start:stop, :], lattice._state[..., 1:-1, :])
+            except Exception as error:  # noqa: BLE001 - forwarded to and re-raised by the parent.
+                barrier.abort()
+                connection.send((error, traceback.format_exc()))
+            else:
+                connection.send(None)
+    finally:
+        del states
+        for s in shared:
+            s.close()
+
+
+def _read_halo(padded: np.ndarray, state: np.ndarray, above: int, below: int) -> None:
+    """Copies the rows next to a block into its halo rows."""
+    np.copyto(padded[..., 0, :], state[..., above, :])
+    np.copyto(padded[..., -1, :], state[..., below, :])
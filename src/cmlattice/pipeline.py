@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import os
+import queue
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Self
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from .history import MemmapHistory
+from .observers import Observer
+
+if TYPE_CHECKING:
+    from .render import FrameEncoder
+
+_DONE = object()
+
+
+class Stage:
+    """Base class for the consumers of a `Pipeline`.
+
+    Each stage runs in its own thread and consumes the recorded frames in
+    order through `run`.
+    """
+
+    def run(self, frames: Iterator[np.ndarray]) -> None:
+        """Consumes frames until the pipeline is closed.
+
+        Args:
+            frames (Iterator[np.ndarray]): The recorded frames, read-only.
+        """
+        for frame in frames:
+            self.consume(frame)
+
+    def consume(self, frame: np.ndarray) -> None:
+        """Consumes one frame.
+
+        Args:
+            frame (np.ndarray): A recorded frame, read-only.
+        """
+
+
+class HistoryWriter(Stage):
+    """Writes the frames to a `.npy` file, readable with `load_history`.
+
+    Attributes:
+        path (str | os.PathLike): The path of the `.npy` file.
+    """
+
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = path
+
+    def __repr__(self) -> str:
+        return f"HistoryWriter(path={self.path!r})"
+
+    def run(self, frames: Iterator[np.ndarray]) -> None:
+        store = None
+        try:
+            for frame in frames:
+                if store is None:
+                    store = MemmapHistory(self.path, frame.shape, frame.dtype)
+                store.append(frame)
+        finally:
+            if store is not None:
+                store.close()
+
+
+class GifWriter(Stage):
+    """Encodes the frames into an animated GIF as they arrive.
+
+    Pillow keeps the encoded palette frames, one byte per site, until the
+    file is complete. Use `PngWriter` to keep memory bounded.
+
+    Attributes:
+        path (str | os.PathLike): The path of the GIF file.
+        encoder (FrameEncoder): The encoder colouring the frames.
+        fps (int): The number of frames per second.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        encoder: FrameEncoder | None = None,
+        fps: int = 5,
+    ) -> None:
+        self.path = path
+        if encoder is None:
+            # Matplotlib and Pillow are only loaded by the stages that encode.
+            from .render import FrameEncoder
+
+            encoder = FrameEncoder()
+        self.encoder = encoder
+        self.fps = fps
+
+    def __repr__(self) -> str:
+        return f"GifWriter(path={self.path!r}, fps={self.fps})"
+
+    def run(self, frames: Iterator[np.ndarray]) -> None:
+        self.encoder.save_gif(frames, self.path, fps=self.fps)
+
+
+class PngWriter(Stage):
+    """Encodes the frames into a sequence of PNG files as they arrive.
+
+    Attributes:
+        directory (str | os.PathLike): The directory of the PNG files.
+        encoder (FrameEncoder): The encoder colouring the frames.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        encoder: FrameEncoder | None = None,
+    ) -> None:
+        self.directory = directory
+        if encoder is None:
+            from .render import FrameEncoder
+
+            encoder = FrameEncoder()
+        self.encoder = encoder
+
+    def __repr__(self) -> str:
+        return f"PngWriter(directory={self.directory!r})"
+
+    def run(self, frames: Iterator[np.ndarray]) -> None:
+        self.encoder.save_png(frames, self.directory)
+
+
+class Reducer(Stage):
+    """Feeds the frames to an object with a `record(frame)` method.
+
+    Use it to move `Observables` or a `Probe` off the simulation thread.
+
+    Attributes:
+        target (Observables | Probe): The object recording the frames.
+    """
+
+    def __init__(self, target) -> None:
+        self.target = target
+
+    def __repr__(self) -> str:
+        return f"Reducer(target={self.target!r})"
+
+    def consume(self, frame: np.ndarray) -> None:
+        self.target.record(frame)
+
+
+class Pipeline(Observer):
+    """Hands the recorded frames of a lattice to concurrent consumer stages.
+
+    The simulation thread copies every recorded frame once and puts it on
+    a bounded queue per stage. Each stage consumes its queue in its own
+    thread, so writing and rendering overlap with the simulation. When a
+    queue is full the simulation waits, so at most `maxsize` frames per
+    stage are held in memory. NumPy kernels, file writes and image encoding
+    release the GIL, so the stages run alongside the updates. An error in a
+    stage is raised again, with its original traceback, by the next `push`
+    or by `close`, and frames are no longer queued for a stopped stage.
+
+    Attributes:
+        stages (list[Stage]): The consumer stages.
+        maxsize (int): The number of frames each queue can hold.
+        count (int): The number of frames pushed.
+    """
+
+    def __init__(self, stages, maxsize: int = 16) -> None:
+        """Initializes the pipeline.
+
+        Args:
+            stages (Sequence[Stage]): The consumer stages.
+            maxsize (int): The number of frames each queue can hold.
+                Defaults to 16.
+        """
+        if maxsize < 1:
+            raise ValueError('Maxsize must be a positive integer.')
+        self.stages = list(stages)
+        self.maxsize = maxsize
+        self.count = 0
+        self._queues = []
+        self._futures: list[Future] = []
+        self._executor = None
+        self._lattice = None
+
+    def __repr__(self) -> str:
+        return f"Pipeline(stages={self.stages}, frames={self.count})"
+
+    def __enter__(self) -> Self:
+        self.open()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def open(self) -> None:
+        """Starts a thread per stage."""
+        if self._executor is not None:
+            return
+        self._queues = [queue.Queue(self.maxsize) for _ in self.stages]
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, len(self.stages)),
+            thread_name_prefix='pipeline',
+        )
+        self._futures = [
+            self._executor.submit(self._consume, stage, frames)
+            for stage, frames in zip(self.stages, self._queues)
+        ]
+
+    def attach(self, lattice, frames: Iterable[np.ndarray] | None = None) -> None:
+        """Starts the stages and feeds them the current and every recorded state.
+
+        Args:
+            lattice (CoupledMapLattice): The lattice to take the frames from.
+            frames (Iterable[np.ndarray] | None): Frames to push first instead
+                of the current state, such as the history of a resumed run.
+                Defaults to None.
+        """
+        self.open()
+        for frame in [lattice._frame()] if frames is None else frames:
+            self.push(frame)
+        lattice.add_observer(self)
+        self._lattice = lattice
+
+    def push(self, frame: np.ndarray) -> None:
+        """Copies a frame and puts it on every queue, waiting while one is full.
+
+        Args:
+            frame (np.ndarray): The frame to push.
+        """
+        self._raise_failed()
+        if self._executor is None:
+            raise ValueError('The pipeline is not open.')
+        frame = frame.copy()
+        frame.flags.writeable = False
+        for frames, future in zip(self._queues, self._futures):
+            self._put(frames, future, frame)
+        self._raise_failed()
+        self.count += 1
+
+    def __call__(self, lattice) -> None:
+        """Pushes the latest state of the lattice."""
+        self.push(lattice._frame())
+
+    def close(self) -> None:
+        """Waits for the stages to consume every frame and stops them.
+
+        If the pipeline was attached to a lattice, it is detached. The first
+        error raised by a stage is raised again here.
+        """
+        if self._lattice is not None:
+            self._lattice.remove_observer(self)
+            self._lattice = None
+        for frames, future in zip(self._queues, self._futures):
+            self._put(frames, future, _DONE)
+        wait(self._futures)
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._executor = None
+        self._queues = []
+        self._raise_failed()
+
+    def _consume(self, stage: Stage, frames: queue.Queue) -> None:
+        """Runs a stage on the frames of its queue."""
+        def iterate():
+            while (frame := frames.get()) is not _DONE:
+                yield frame
+
+        stage.run(iterate())
+
+    def _put(self, frames: queue.Queue, future: Future, item) -> None:
+        """Puts an item on the queue of a stage, unless the stage has stopped."""
+        while not future.done():
+            try:
+                frames.put(item, timeout=0.05)
+                return
+            except queue.Full:
+                continue
+
+    def _raise_failed(self) -> None:
+        """Raises the error of the first stage that failed, if any."""
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                future.result()
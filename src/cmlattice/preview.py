@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import numpy as np
+
+from .history import History
+from .observers import Observer
+
+REDUCTIONS = ('mean', 'max')
+
+
+def pool(frames: np.ndarray, factor: int, reduce: str = 'mean') -> np.ndarray:
+    """Pools frames over square blocks of sites.
+
+    Each block of `factor` by `factor` sites becomes one site holding the
+    mean or the maximum of the block. Blocks at the bottom and right edges
+    are smaller when the lattice size is not a multiple of `factor`. The
+    blocks are reduced with reshapes, in one pass over the frames.
+
+    Args:
+        frames (np.ndarray): An array of frames of shape `(..., n, n)`.
+        factor (int): The number of sites pooled along each axis.
+        reduce (str): Either `'mean'` or `'max'`. Defaults to `'mean'`.
+
+    Returns:
+        np.ndarray: The `(..., ceil(n / factor), ceil(n / factor))` pooled
+            frames, or the frames themselves if `factor` is 1.
+    """
+    if reduce not in REDUCTIONS:
+        raise ValueError(f"Reduce must be one of {REDUCTIONS}.")
+    if factor < 1:
+        raise ValueError('Factor must be a positive integer.')
+    frames = np.asarray(frames)
+    if factor == 1:
+        return frames
+    if reduce == 'max':
+        return _reduce(_reduce(frames, factor, -1, np.max), factor, -2, np.max)
+    sums = frames.astype(np.result_type(frames.dtype, np.float32), copy=False)
+    sums = _reduce(_reduce(sums, factor, -1, np.sum), factor, -2, np.sum)
+    sums /= np.outer(_sizes(frames.shape[-2], factor), _sizes(frames.shape[-1], factor))
+    return sums
+
+
+def pyramid(
+    frame: np.ndarray,
+    levels: int | None = None,
+    reduce: str = 'mean',
+) -> list[np.ndarray]:
+    """Builds a pyramid of a frame pooled by successive factors of two.
+
+    Level `k` pools blocks of `2**k` sites along each axis, so viewers can
+    pick the coarsest level that still fills the display. Every level is
+    pooled from the one below it, so the whole pyramid costs about 4/3 of
+    one pass over the frame, and the means stay exact at ragged edges.
+
+    Args:
+        frame (np.ndarray): A frame of shape `(..., n, n)`.
+        levels (int | None): The number of levels. Defaults to as many as
+            it takes to pool the frame down to a single site.
+        reduce (str): Either `'mean'` or `'max'`. Defaults to `'mean'`.
+
+    Returns:
+        list[np.ndarray]: The levels, starting with the frame itself.
+    """
+    if reduce not in REDUCTIONS:
+        raise ValueError(f"Reduce must be one of {REDUCTIONS}.")
+    frame = np.asarray(frame)
+    result = [frame]
+    if reduce == 'mean':
+        sums = frame.astype(np.result_type(frame.dtype, np.float32))
+        counts = np.ones(frame.shape[-2:])
+    while (levels is None or len(result) < levels) and max(result[-1].shape[-2:]) > 1:
+        if reduce == 'max':
+            result.append(pool(result[-1], 2, 'max'))
+            continue
+        sums = _reduce(_reduce(sums, 2, -1, np.sum), 2, -2, np.sum)
+        counts = _reduce(_reduce(counts, 2, -1, np.sum), 2, -2, np.sum)
+        result.append(sums / counts)
+    return result
+
+
+def preview_factor(shape: tuple[int, ...], resolution: int | None) -> int:
+    """Returns the smallest factor that pools frames to at most `resolution` sites.
+
+    Args:
+        shape (tuple[int, ...]): The shape of the frames.
+        resolution (int | None): The largest number of sites along each
+            axis, or None to keep every site.
+
+    Returns:
+        int: The pooling factor, 1 if the frames already fit.
+    """
+    if resolution is None:
+        return 1
+    if resolution < 1:
+        raise ValueError('Resolution must be a positive integer.')
+    return max(1, -(-max(shape[-2:]) // resolution))
+
+
+class Preview(Observer):
+    """Records a downsampled stream of the states of a lattice.
+
+    Previews are attached with `CoupledMapLattice.add_preview` and pool
+    every recorded state down to at most `resolution` sites along each
+    axis as it is produced. Combined with the `'none'` retention mode, a
+    run on a huge lattice can be watched or rendered at screen resolution
+    for O(T * resolution**2) memory, and rendering the preview costs the
+    same whatever the size of the lattice.
+
+    Attributes:
+        resolution (int): The largest number of sites along each axis.
+        reduce (str): Either `'mean'` or `'max'`.
+        factor (int): The number of sites pooled along each axis.
+    """
+
+    def __init__(
+        self,
+        shape: tuple[int, ...],
+        resolution: int = 256,
+        reduce: str = 'mean',
+        dtype: np.dtype = np.float64,
+        every: int = 1,
+    ) -> None:
+        """Initializes the preview.
+
+        Args:
+            shape (tuple[int, ...]): The shape of the frames it records.
+            resolution (int): The largest number of sites along each axis.
+                Defaults to 256.
+            reduce (str): Either `'mean'` or `'max'`. Defaults to `'mean'`.
+            dtype (np.dtype): The dtype of the frames. Defaults to `np.float64`.
+            every (int): Only every `every`-th recorded state is kept.
+                Defaults to 1.
+        """
+        if reduce not in REDUCTIONS:
+            raise ValueError(f"Reduce must be one of {REDUCTIONS}.")
+        self.resolution = resolution
+        self.reduce = reduce
+        self.factor = preview_factor(shape, resolution)
+        pooled = [-(-size // self.factor) for size in shape[-2:]]
+        dtype = dtype if reduce == 'max' else np.result_type(dtype, np.float32)
+        self._history = History((*shape[:-2], *pooled), dtype, mode='every', every=every)
+
+    def __repr__(self) -> str:
+        return f"Preview(resolution={self.resolution}, factor={self.factor}, frames={len(self)})"
+
+    def __len__(self) -> int:
+        return len(self._history)
+
+    @property
+    def frames(self) -> np.ndarray:
+        """Returns a read-only `(T, ..., m, m)` view of the pooled frames."""
+        return self._history.view()
+
+    def start(self, lattice, steps: int) -> None:
+        """Preallocates room for the states of a run."""
+        self._history.reserve(steps)
+
+    def __call__(self, lattice) -> None:
+        """Records the pooled latest state."""
+        self.record(lattice._frame())
+
+    def record(self, frame: np.ndarray) -> None:
+        """Records a pooled frame.
+
+        Args:
+            frame (np.ndarray): The frame to record.
+        """
+        if self._history.count % self._history.every == 0:
+            self._history.append(pool(frame, self.factor, self.reduce))
+        else:
+            self._history.count += 1
+
+
+def _reduce(values: np.ndarray, factor: int, axis: int, reduce) -> np.ndarray:
+    """Reduces blocks of `factor` entries along one of the last two axes."""
+    axis %= values.ndim
+    size = values.shape[axis]
+    whole = size - size % factor
+    index = (slice(None),) * axis
+    head = values[(*index, slice(0, whole))]
+    shape = (*values.shape[:axis], whole // factor, factor, *values.shape[axis + 1:])
+    blocks = reduce(head.reshape(shape), axis=axis + 1)
+    if whole == size:
+        return blocks
+    tail = reduce(values[(*index, slice(whole, size))], axis=axis, keepdims=True)
+    return np.concatenate((blocks, tail), axis=axis)
+
+
+def _sizes(size: int, factor: int) -> np.ndarray:
+    """Returns the number of entries in each block of `factor` along an axis."""
+    sizes = np.full(-(-size // factor), factor)
+    sizes[-1] = size - factor * (len(sizes) - 1)
+    return sizes
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+from matplotlib import colormaps
+from PIL import Image
+
+from .preview import pool
+from .preview import preview_factor
+from .preview import REDUCTIONS
+
+
+def colormap_lut(cmap: str = 'plasma') -> np.ndarray:
+    """Builds a lookup table of 256 colours from a matplotlib colormap.
+
+    Args:
+        cmap (str): The name of the colormap. Defaults to `'plasma'`.
+
+    Returns:
+        np.ndarray: A `(256, 3)` uint8 array of RGB colours.
+    """
+    colours = colormaps[cmap](np.linspace(0, 1, 256))[:, :3]
+    return np.round(colours * 255).astype(np.uint8)
+
+
+class FrameEncoder:
+    """Writes lattice histories straight to a GIF or a PNG sequence.
+
+    Frames are mapped to colour indices in bulk and coloured through a
+    precomputed lookup table, without drawing anything with matplotlib.
+    The history is read a chunk of frames at a time, so memory-mapped
+    histories are never loaded as a whole.
+
+    Attributes:
+        lut (np.ndarray): The `(256, 3)` uint8 colour lookup table.
+        vmin (float | None): The value mapped to the first colour. Defaults
+            to the minimum of the first frame, as `imshow` does.
+        vmax (float | None): The value mapped to the last colour. Defaults
+            to the maximum of the first frame.
+        scale (int): The number of pixels per site along each axis.
+        resolution (int | None): The largest number of sites along each
+            axis. Larger frames are pooled over blocks of sites first, so
+            colouring and encoding cost scales with the output size rather
+            than the lattice size. If None, every site is kept.
+        reduce (str): How blocks are pooled, `'mean'` or `'max'`.
+        chunk (int): The number of frames mapped at once.
+        workers (int | None): The number of threads mapping chunks. If None,
+            chunks are mapped in the calling thread.
+    """
+
+    def __init__(
+        self,
+        cmap: str = 'plasma',
+        vmin: float | None = None,
+        vmax: float | None = None,
+        scale: int = 1,
+        chunk: int = 64,
+        workers: int | None = None,
+        resolution: int | None = None,
+        reduce: str = 'mean',
+    ) -> None:
+        if scale < 1:
+            raise ValueError('Scale must be a positive integer.')
+        if resolution is not None and resolution < 1:
+            raise ValueError('Resolution must be a positive integer.')
+        if reduce not in REDUCTIONS:
+            raise ValueError(f"Reduce must be one of {REDUCTIONS}.")
+        self.lut = colormap_lut(cmap)
+        self.vmin = vmin
+        self.vmax = vmax
+        self.scale = scale
+        self.chunk = chunk
+        self.workers = workers
+        self.resolution = resolution
+        self.reduce = reduce
+
+    def indices(
+        self,
+        frames: np.ndarray,
+        limits: tuple[float, float] | None = None,
+    ) -> np.ndarray:
+        """Maps frames to colour indices.
+
+        Args:
+            frames (np.ndarray): An array of frames of shape `(..., n, n)`.
+            limits (tuple[float, float] | None): The values mapped to the
+                first and last colours. Defaults to `vmin` and `vmax`, or to
+                the range of `frames` when those are not set.
+
+        Returns:
+            np.ndarray: The uint8 colour index of each pixel.
+        """
+        vmin, vmax = limits or self._limits(frames)
+        frames = pool(frames, preview_factor(np.shape(frames), self.resolution), self.reduce)
+        values = np.array(frames, dtype=np.float32)
+        np.nan_to_num(values, copy=False)
+        values -= vmin
+        values *= 256 / (vmax - vmin) if vmax > vmin else 0
+        np.clip(values, 0, 255, out=values)
+        indices = values.astype(np.uint8)
+        if self.scale > 1:
+            indices = indices.repeat(self.scale, axis=-2).repeat(self.scale, axis=-1)
+        return indices
+
+    def rgb(self, frames: np.ndarray) -> np.ndarray:
+        """Maps frames to RGB colours through the lookup table.
+
+        Args:
+            frames (np.ndarray): An array of frames of shape `(..., n, n)`.
+
+        Returns:
+            np.ndarray: A uint8 array of shape `(..., m * scale, m * scale, 3)`,
+                where `m` is `n` or the pooled size.
+        """
+        return self.lut[self.indices(frames)]
+
+    def iter_indices(self, history: np.ndarray) -> Iterator[np.ndarray]:
+        """Yields the colour indices of every frame, a chunk at a time.
+
+        Args:
+            history (np.ndarray): The history to encode, of shape `(T, n, n)`.
+
+        Yields:
+            np.ndarray: The colour indices of one frame.
+        """
+        encode = partial(self.indices, limits=self._limits(history[:1]))
+        starts = range(0, len(history), self.chunk)
+        chunks = (history[start:start + self.chunk] for start in starts)
+        if self.workers is None:
+            for indices in map(encode, chunks):
+                yield from indices
+            return
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for indices in executor.map(encode, chunks):
+                yield from indices
+
+    def stream_indices(self, frames: Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        """Yields the colour indices of frames as they arrive.
+
+        Unlike `iter_indices`, the frames do not need to be known in
+        advance. The colour limits are taken from the first frame.
+
+        Args:
+            frames (Iterable[np.ndarray]): The frames to encode, of shape `(n, n)`.
+
+        Yields:
+            np.ndarray: The colour indices of one frame.
+        """
+        limits = None
+        for frame in frames:
+            limits = limits or self._limits(frame)
+            yield self.indices(frame, limits)
+
+    def save_gif(
+        self,
+        history: np.ndarray | Iterable[np.ndarray],
+        path: str | os.PathLike,
+        fps: int = 5,
+    ) -> None:
+        """Writes a history as an animated GIF.
+
+        The colour indices are written directly as palette images, so no
+        colour quantization is needed. The history may also be an iterable
+        of frames, such as a pipeline queue, which is encoded as it arrives.
+
+        Args:
+            history (np.ndarray | Iterable[np.ndarray]): The history to encode,
+                of shape `(T, n, n)`, or an iterable of frames.
+            path (str | os.PathLike): The path of the GIF file.
+            fps (int): The number of frames per second. Defaults to 5.
+        """
+        palette = self.lut.tobytes()
+
+        def images():
+            for indices in self._iter(history):
+                image = Image.fromarray(indices)
+                image.putpalette(palette)
+                yield image
+
+        frames = images()
+        first = next(frames)
+        first.save(
+            path,
+            save_all=True,
+            append_images=frames,
+            duration=1000 / fps,
+            loop=0,
+            optimize=False,
+        )
+
+    def save_png(
+        self,
+        history: np.ndarray | Iterable[np.ndarray],
+        directory: str | os.PathLike,
+    ) -> list[str]:
+        """Writes a history as a sequence of PNG files, one per frame.
+
+        Args:
+            history (np.ndarray | Iterable[np.ndarray]): The history to encode,
+                of shape `(T, n, n)`, or an iterable of frames.
+            directory (str | os.PathLike): The directory to write the files to.
+
+        Returns:
+            list[str]: The paths of the written files.
+        """
+        os.makedirs(directory, exist_ok=True)
+        paths = []
+        for i, indices in enumerate(self._iter(history)):
+            path = os.path.join(directory, f"frame_{i:06d}.png")
+            Image.fromarray(self.lut[indices]).save(path)
+            paths.append(path)
+        return paths
+
+    def _iter(self, history: np.ndarray | Iterable[np.ndarray]) -> Iterator[np.ndarray]:
+        """Yields the colour indices of a history array or of an iterable of frames."""
+        if isinstance(history, np.ndarray):
+            return self.iter_indices(history)
+        return self.stream_indices(history)
+
+    def _limits(self, frames: np.ndarray) -> tuple[float, float]:
+        """Returns the colour limits, taken from `frames` when not set."""
+        vmin = self.vmin if self.vmin is not None else float(np.nanmin(frames))
+        vmax = self.vmax if self.vmax is not None else float(np.nanmax(frames))
+        return vmin, vmax
@@ -2,6 +2,9 @@ from __future__ import annotations
 
 import numpy as np
 
+from .cmlattice import _add_rows
+from .cmlattice import _roll_rows
+from .cmlattice import _row
 from .cmlattice import CoupledMapLattice
 
 
@@ -11,14 +14,21 @@ class RulkovLattice(CoupledMapLattice):
     The Rulkov map is a coupled map lattice model that exhibits
     complex behavior, including chaos and synchronization.
 
+    By default the rows of a coupled lattice are updated one after the
+    other, and each row is coupled to the already updated row before it,
+    as in a sequential loop over the sites. With `synchronous=True`, or
+    with a `coupling`, every site is updated at once from the previous
+    state instead.
+
     Attributes:
         n (int): The size of the lattice.
         r (float): The parameter for the map function.
         mu (float): The parameter for the map function.
         sigma (float): The parameter for the map function.
         epsilion (float): The coupling strength.
+        synchronous (bool): Whether all sites are updated from the previous state.
         state (np.ndarray): The current state of the lattice.
-        history (list[np.ndarray]): The history of the lattice states.
+        history (np.ndarray): A read-only view of the recorded `x` states.
         time (int): The current time step.
     """
 
@@ -29,37 +39,28 @@ class RulkovLattice(CoupledMapLattice):
         mu: float,
         sigma: float,
         epsilon: float = 1,
+        synchronous: bool = False,
+        **kwargs,
     ) -> None:
-        super().__init__(n, r, epsilon)
+        self.synchronous = synchronous
+        super().__init__(n, r, epsilon, **kwargs)
         self.mu = mu
         self.sigma = sigma
-        self.history = [self.state[0]]
 
     def __repr__(self):
         return f"RulkovLattice(n={self.n}, r={self.r}, epsilion={self.epsilon}, mu={self.mu}, sigma={self.sigma})"
 
-    def init_state(self) -> np.ndarray:
-        """Initializes the state of the lattice."""
-        return np.random.uniform(0, 1, (2, self.n, self.n))
+    def _params(self) -> dict[str, float]:
+        return {
+            **super()._params(),
+            'mu': self.mu,
+            'sigma': self.sigma,
+            'synchronous': self.synchronous,
+        }
 
-    @CoupledMapLattice.state.setter
-    def state(self, value: np.ndarray) -> None:
-        """Sets the state of the lattice.
-        Args:
-            value (np.ndarray): The new state of the lattice.
-        """
-        if not isinstance(value, np.ndarray):
-            raise ValueError('State must be a numpy array.')
-        if value.ndim != 3:
-            raise ValueError('State must be a 3D array.')
-        if value.dtype != np.float64:
-            raise ValueError('State must be a float64 array.')
-
-        if value.shape != (2, self.n, self.n):
-            raise ValueError(
-                f"State must be of shape (2, {self.n}, {self.n}).",
-            )
-        self._state = value
+    def _state_shape(self) -> tuple[int, ...]:
+        """Returns the shape of the state, with the `x` and `y` planes first."""
+        return (2, self.n, self.n)
 
     def state_function(self, x: np.ndarray, y: np.ndarray = None) -> np.ndarray:
         """Applies the Rulkov map update function to the state of the lattice.
@@ -75,37 +76,162 @@ class RulkovLattice(CoupledMapLattice):
         y_next = y - self.mu * (x_next - self.sigma)
         return np.array([x_next, y_next])
 
+    def _map(self, state: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the Rulkov map of `state` into `out` without allocating.
+
+        The two components are stored as separate planes, `x` in
+        `state[..., 0, :, :]` and `y` in `state[..., 1, :, :]`.
+
+        Args:
+            state (np.ndarray): The input array of stacked `x` and `y` planes.
+            out (np.ndarray): The array to write the result to.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        x, y = state[..., 0, :, :], state[..., 1, :, :]
+        if type(self).state_function is not RulkovLattice.state_function:
+            np.copyto(out, self.state_function(x, y))
+            return out
+        x_next, y_next = out[..., 0, :, :], out[..., 1, :, :]
+        np.square(x, out=x_next)
+        x_next += 1
+        np.divide(self.r, x_next, out=x_next)
+        x_next += y
+        np.subtract(x_next, self.sigma, out=y_next)
+        y_next *= self.mu
+        np.subtract(y, y_next, out=y_next)
+        return out
+
+    def _neighbours(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the neighbour term of both components of every site into `out`.
+
+        Without a `coupling`, each site is coupled to its left and right
+        neighbours, the sites in the previous and next rows with periodic
+        boundaries.
+        """
+        if self.coupling is not None:
+            return self.coupling.gather(values, out)
+        _roll_rows(values, -1, out)
+        return _add_rows(out, values, 1)
+
     def _update_coupled(self) -> None:
-        """Updates the state of the lattice using the Rulkov map."""
-        state = self.state.copy()
-        for i in range(self.n):
-            left_neighbor = state[:, (i - 1) % self.n]
-            right_neighbor = state[:, (i + 1) % self.n]
-            for j in range(self.n):
-                # Apply the Rulkov map update
-                state[:, i, j] = self.epsilon * self.state_function(
-                    state[0, i, j],
-                    state[1, i, j],
-                ) + (self.epsilon / 2) * (
-                    self.state_function(left_neighbor[0, j], left_neighbor[1, j]) +
-                    self.state_function(
-                        right_neighbor[0, j], right_neighbor[1, j],
-                    )
+        """Updates the state of the lattice using the Rulkov map.
+
+        Synchronous lattices and lattices with a `coupling` update all sites
+        at once from the previous state. The others are updated by `_sweep`.
+        """
+        if self.synchronous or self.coupling is not None:
+            super()._update_coupled()
+            return
+        self._sweep(self._buffer('next'))
+        self._swap('next')
+
+    def _tangent_coupled(self, v: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """Writes the Jacobian of `_update_coupled` times `v` into `out`."""
+        if self.synchronous or self.coupling is not None:
+            return super()._tangent_coupled(v, out)
+        self._sweep(self._buffer('tangent_next'), v, out)
+        return out
+
+    def _sweep(
+        self,
+        out: np.ndarray,
+        v: np.ndarray | None = None,
+        tangent: np.ndarray | None = None,
+    ) -> None:
+        """Writes the next state of a sequential update into `out`.
+
+        The rows are updated in order, and row `i` sees the updated row
+        `i - 1` and the previous row `i + 1`, except that the last row sees
+        the updated first row. The sites of a row do not depend on each
+        other, so both components of each row are updated at once. If `v`
+        is given, the Jacobian of the update times `v` is written into
+        `tangent`.
+
+        Args:
+            out (np.ndarray): The array to write the next state to.
+            v (np.ndarray | None): Tangent vectors, of shape `(k, *state.shape)`.
+            tangent (np.ndarray | None): The array to write the tangent to.
+        """
+        center, neighbour = self._weights()
+        state = self._state
+        n = state.shape[-2]
+        mapped = self._buffer('mapped')
+        for i in range(n):
+            self._map(_row(state, i), _row(mapped, i))
+        updated = self._buffer('sweep_updated', _row(state, 0))
+        first = self._buffer('sweep_first', _row(state, 0))
+        if v is not None:
+            local = self._buffer('sweep_local', _row(v, 0))
+        for i in range(n):
+            last = 0 < i == n - 1
+            before = _row(state, n - 1) if i == 0 else _row(out, i - 1)
+            after = _row(out, 0) if last else _row(state, (i + 1) % n)
+            if v is not None:
+                # The chain rule through the rows updated earlier in the sweep.
+                row = self._derivative(
+                    before, _row(v, n - 1) if i == 0 else _row(tangent, i - 1), _row(tangent, i),
+                )
+                row += self._derivative(
+                    after, _row(tangent if last else v, (i + 1) % n), local,
                 )
-        self.state = state
-
-    def _update_independent(self) -> None:
-        """Updates the state of the lattice using an independent map."""
-        self.state = self.state_function(self.state[0], self.state[1])
-
-    def update(self):
-        if self.epsilon < 1:
-            self._update_coupled()
-        else:
-            self._update_independent()
-
-        assert self.state[0].shape == (
-            self.n, self.n,
-        ), 'The shape is not correct'
-        self.append_history(self.state[0])
-        self.time += 1
+                row *= neighbour
+                self._derivative(_row(state, i), _row(v, i), local)
+                local *= center
+                row += local
+            if i > 0:
+                self._map(before, updated)
+            if last:
+                self._map(after, first)
+            left = _row(mapped, n - 1) if i == 0 else updated
+            right = first if last else _row(mapped, (i + 1) % n)
+            row = np.add(left, right, out=_row(out, i))
+            row *= neighbour
+            mapped_row = _row(mapped, i)
+            mapped_row *= center
+            row += mapped_row
+
+    def _derivative(
+        self,
+        state: np.ndarray,
+        v: np.ndarray,
+        out: np.ndarray,
+    ) -> np.ndarray:
+        """Writes the Jacobian of the Rulkov map at `state` times `v` into `out`.
+
+        Args:
+            state (np.ndarray): The point the Jacobian is taken at.
+            v (np.ndarray): Tangent vectors, broadcasting against `state`.
+            out (np.ndarray): The array to write the result to.
+
+        Returns:
+            np.ndarray: `out`.
+        """
+        if type(self).state_function is not RulkovLattice.state_function:
+            raise NotImplementedError(
+                'Lattices with a custom state_function must implement _derivative.',
+            )
+        x = state[..., 0, :, :]
+        dx, dy = v[..., 0, :, :], v[..., 1, :, :]
+        dx_next, dy_next = out[..., 0, :, :], out[..., 1, :, :]
+        # d(r / (1 + x^2)) / dx = -2 r x / (1 + x^2)^2
+        slope = self._buffer('slope', x)
+        np.square(x, out=slope)
+        slope += 1
+        np.square(slope, out=slope)
+        np.divide(x, slope, out=slope)
+        slope *= -2 * self.r
+        np.multiply(dx, slope, out=dx_next)
+        dx_next += dy
+        np.multiply(dx_next, self.mu, out=dy_next)
+        np.subtract(dy, dy_next, out=dy_next)
+        return out
+
+    def _weights(self) -> tuple[float, float]:
+        """Returns the weights of a site and of each of its neighbours."""
+        return self.epsilon, self.epsilon / 2
+
+    def _frame(self) -> np.ndarray:
+        """Returns a view of the `x` plane, which is recorded in history."""
+        return self._state[..., 0, :, :]
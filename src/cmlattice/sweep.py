@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .attractor import AttractorDetector
+from .ensemble import CoupledMapEnsemble
+from .ensemble import KanekoEnsemble
+from .ensemble import RulkovEnsemble
+
+ENSEMBLES = {
+    'cml': CoupledMapEnsemble,
+    'kaneko': KanekoEnsemble,
+    'rulkov': RulkovEnsemble,
+}
+
+
+def parameter_grid(
+    r,
+    epsilon,
+    mu=None,
+    sigma=None,
+    seeds=(0,),
+) -> dict[str, np.ndarray]:
+    """Builds the cartesian product of parameter values as flat arrays.
+
+    Args:
+        r (float | Sequence[float]): The values of `r`.
+        epsilon (float | Sequence[float]): The values of `epsilon`.
+        mu (float | Sequence[float] | None): The values of `mu`, for Rulkov lattices.
+        sigma (float | Sequence[float] | None): The values of `sigma`, for Rulkov lattices.
+        seeds (Sequence[int]): The seeds of the initial states. Defaults to `(0,)`.
+
+    Returns:
+        dict[str, np.ndarray]: One array per parameter, each with one entry per point.
+    """
+    axes = {
+        'r': r,
+        'epsilon': epsilon,
+        'mu': np.nan if mu is None else mu,
+        'sigma': np.nan if sigma is None else sigma,
+        'seed': seeds,
+    }
+    points = list(
+        itertools.product(*(np.atleast_1d(v).tolist() for v in axes.values())),
+    )
+    grid = {key: np.array(values) for key, values in zip(axes, zip(*points))}
+    grid['seed'] = grid['seed'].astype(np.int64)
+    return grid
+
+
+def sweep(
+    key: str,
+    n: int,
+    steps: int,
+    grid: dict[str, np.ndarray],
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    dtype: np.dtype = np.float64,
+    attractor: AttractorDetector | None = None,
+) -> dict[str, np.ndarray]:
+    """Runs one lattice per parameter point over a process pool.
+
+    The points are split into chunks, and each worker runs a chunk as one
+    ensemble with its history switched off. Workers only send back the
+    final state and the mean activation of every step.
+
+    With an `attractor` detector, each chunk stops simulating once all its
+    points are on fixed points or cycles. If the detector extrapolates,
+    the remaining means are filled in from the cycles, and otherwise they
+    are NaN and `final` is the state the chunk stopped at.
+
+    Args:
+        key (str): The model to run, one of `'cml'`, `'kaneko'` or `'rulkov'`.
+        n (int): The size of each lattice.
+        steps (int): The number of steps to simulate.
+        grid (dict[str, np.ndarray]): The parameter points, see `parameter_grid`.
+        workers (int | None): The number of worker processes. Defaults to
+            the number of cores available to this process.
+        chunk_size (int | None): The number of points run by each task.
+            Defaults to a few tasks per worker.
+        dtype (np.dtype): The precision of the lattices. Defaults to `np.float64`.
+        attractor (AttractorDetector | None): The detector copied to every
+            chunk. Defaults to None, which simulates every step.
+
+    Returns:
+        dict[str, np.ndarray]: The parameter arrays of `grid`, plus `final`,
+            the final recorded state of each point, and `mean`, the mean of
+            each recorded state over the lattice with shape `(points, steps + 1)`.
+            With a detector, `period` and `onset` hold the period and onset
+            time of the cycle of each point, or -1.
+    """
+    _check(key, grid)
+    results = _map_chunks(
+        _run_chunk,
+        grid,
+        workers,
+        chunk_size,
+        key,
+        n,
+        steps,
+        dtype,
+        attractor,
+    )
+    arrays = {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+    return {**grid, **arrays}
+
+
+def lyapunov_sweep(
+    key: str,
+    n: int,
+    steps: int,
+    grid: dict[str, np.ndarray],
+    vectors: int = 1,
+    transient: int = 0,
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    dtype: np.dtype = np.float64,
+) -> dict[str, np.ndarray]:
+    """Estimates the leading Lyapunov exponents at every parameter point.
+
+    Like `sweep`, the points are split into chunks and each worker runs a
+    chunk as one ensemble, whose exponents are estimated together with
+    `CoupledMapLattice.lyapunov`.
+
+    Args:
+        key (str): The model to run, one of `'cml'`, `'kaneko'` or `'rulkov'`.
+        n (int): The size of each lattice.
+        steps (int): The number of steps to average the growth over.
+        grid (dict[str, np.ndarray]): The parameter points, see `parameter_grid`.
+        vectors (int): The number of exponents to estimate. Defaults to 1.
+        transient (int): The number of steps to run first. Defaults to 0.
+        workers (int | None): The number of worker processes. Defaults to
+            the number of cores available to this process.
+        chunk_size (int | None): The number of points run by each task.
+            Defaults to a few tasks per worker.
+        dtype (np.dtype): The precision of the lattices. Defaults to `np.float64`.
+
+    Returns:
+        dict[str, np.ndarray]: The parameter arrays of `grid`, plus
+            `lyapunov`, the exponents of each point with shape `(points, vectors)`.
+    """
+    _check(key, grid)
+    results = _map_chunks(
+        _run_lyapunov_chunk,
+        grid,
+        workers,
+        chunk_size,
+        key,
+        n,
+        steps,
+        vectors,
+        transient,
+        dtype,
+    )
+    return {**grid, 'lyapunov': np.concatenate(results)}
+
+
+def save_sweep(path: str | os.PathLike, results: dict[str, np.ndarray]) -> None:
+    """Saves the results of a sweep to a single `.npz` file.
+
+    Args:
+        path (str | os.PathLike): The path of the output file.
+        results (dict[str, np.ndarray]): The results returned by `sweep`.
+    """
+    np.savez(path, **results)
+
+
+def _check(key: str, grid: dict[str, np.ndarray]) -> None:
+    """Checks that a model can run over a parameter grid."""
+    if key not in ENSEMBLES:
+        raise ValueError(f"Model must be one of {tuple(ENSEMBLES)}.")
+    if key == 'rulkov' and (np.isnan(grid['mu']).any() or np.isnan(grid['sigma']).any()):
+        raise ValueError('Mu and sigma are required for Rulkov lattices.')
+
+
+def _map_chunks(
+    func,
+    grid: dict[str, np.ndarray],
+    workers: int | None,
+    chunk_size: int | None,
+    *args,
+) -> list:
+    """Calls `func(chunk, *args)` for chunks of the grid over a process pool."""
+    points = len(grid['r'])
+    workers = workers or os.process_cpu_count() or 1
+    chunk_size = chunk_size or max(1, -(-points // (4 * workers)))
+    chunks = [
+        {name: values[start:start + chunk_size] for name, values in grid.items()}
+        for start in range(0, points, chunk_size)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(func, chunks, *(itertools.repeat(arg) for arg in args)))
+
+
+def _make_ensemble(
+    key: str,
+    n: int,
+    chunk: dict[str, np.ndarray],
+    dtype: np.dtype = np.float64,
+):
+    """Builds the ensemble of a chunk of parameter points, seeded per member."""
+    if key == 'rulkov':
+        ensemble = RulkovEnsemble(
+            n,
+            chunk['r'],
+            chunk['mu'],
+            chunk['sigma'],
+            chunk['epsilon'],
+            retention='none',
+            dtype=dtype,
+            seed=chunk['seed'].tolist(),
+        )
+    else:
+        ensemble = ENSEMBLES[key](
+            n,
+            chunk['r'],
+            chunk['epsilon'],
+            retention='none',
+            dtype=dtype,
+            seed=chunk['seed'].tolist(),
+        )
+    member_shape = ensemble.state.shape[1:]
+    ensemble.state = np.stack([
+        np.random.default_rng(seed).uniform(0, 1, member_shape).astype(dtype)
+        for seed in chunk['seed']
+    ])
+    return ensemble
+
+
+def _run_chunk(
+    chunk: dict[str, np.ndarray],
+    key: str,
+    n: int,
+    steps: int,
+    dtype: np.dtype = np.float64,
+    attractor: AttractorDetector | None = None,
+) -> dict[str, np.ndarray]:
+    """Runs a chunk of parameter points as one ensemble."""
+    ensemble = _make_ensemble(key, n, chunk, dtype)
+    mean = np.full((len(ensemble), steps + 1), np.nan)
+    mean[:, 0] = ensemble._frame().mean(axis=(-2, -1))
+    # `simulate` would copy the whole batched state at every step.
+    for t, _ in enumerate(ensemble._run(steps, None, 0, 1, attractor), start=1):
+        mean[:, t] = ensemble._frame().mean(axis=(-2, -1))
+    results = {'final': ensemble._frame().copy(), 'mean': mean}
+    if attractor is not None:
+        results['period'] = np.atleast_1d(attractor.period)
+        results['onset'] = np.atleast_1d(attractor.onset)
+    return results
+
+
+def _run_lyapunov_chunk(
+    chunk: dict[str, np.ndarray],
+    key: str,
+    n: int,
+    steps: int,
+    vectors: int,
+    transient: int,
+    dtype: np.dtype = np.float64,
+) -> np.ndarray:
+    """Estimates the exponents of a chunk of parameter points as one ensemble."""
+    ensemble = _make_ensemble(key, n, chunk, dtype)
+    return ensemble.lyapunov(steps, vectors, transient)
@@ -9,41 +9,87 @@ from matplotlib import animation
 from matplotlib.animation import PillowWriter
 from matplotlib.image import AxesImage
 
+from .archive import Archive
 from .cmlattice import CoupledMapLattice
+from .history import neuron_trace
+from .preview import pool
+from .preview import preview_factor
+from .preview import REDUCTIONS
+from .render import FrameEncoder
 
 
 class Visualization:
-    """A class for visualizing the state of a Coupled Map Lattice (CML)."""
+    """A class for visualizing the state of a Coupled Map Lattice (CML).
 
-    def __init__(self, lattice: CoupledMapLattice) -> None:
+    The lattice may also be given as a history array of shape `(T, n, n)`,
+    such as the lazy memory map returned by `load_history`, or as an
+    `Archive`. Frames are read one at a time, or a chunk at a time for
+    archives, so histories on disk are never loaded as a whole.
+
+    Frames larger than the display are pooled over blocks of sites before
+    they are drawn, so drawing costs scale with the number of pixels shown
+    rather than the size of the lattice. `animate` pools down to the size
+    of the axes in pixels, and `render` down to `resolution` if it is set.
+    """
+
+    def __init__(
+        self,
+        lattice: CoupledMapLattice | np.ndarray | Archive,
+        resolution: int | None = None,
+        reduce: str = 'mean',
+    ) -> None:
+        """Initializes the visualization.
+
+        Args:
+            lattice (CoupledMapLattice | np.ndarray | Archive): The lattice,
+                or a history array or archive.
+            resolution (int | None): The largest number of sites drawn along
+                each axis. Defaults to None, which is the size of the axes
+                for `animate` and every site for `render`.
+            reduce (str): How blocks of sites are pooled, `'mean'` or
+                `'max'`. Defaults to `'mean'`.
+        """
+        if reduce not in REDUCTIONS:
+            raise ValueError(f"Reduce must be one of {REDUCTIONS}.")
         self.lattice = lattice
+        self.resolution = resolution
+        self.reduce = reduce
 
     @property
-    def lattice(self) -> CoupledMapLattice:
+    def lattice(self) -> CoupledMapLattice | np.ndarray | Archive:
         """Returns the current lattice."""
         return self._lattice
 
     @lattice.setter
-    def lattice(self, value: CoupledMapLattice) -> None:
+    def lattice(self, value: CoupledMapLattice | np.ndarray | Archive) -> None:
         """Sets the lattice to the given value.
         Args:
-            value (CoupledMapLattice): The new lattice.
+            value (CoupledMapLattice | np.ndarray | Archive): The new lattice,
+                or a history array or archive.
         """
-        if not isinstance(value, CoupledMapLattice):
+        if not isinstance(value, (CoupledMapLattice, np.ndarray, Archive)):
             raise ValueError(
-                'lattice must be an instance of CoupledMapLattice.',
+                'lattice must be an instance of CoupledMapLattice or a history array.',
             )
 
+        history = value.history if isinstance(value, CoupledMapLattice) else value
         assert (
             len(
-                value.history,
+                history,
             )
             > 1
         ), 'History must contain at least two elements.'
-        assert len(np.array(value.history).shape) <= 3, ('Histroy must be 2D.')
+        assert history.ndim <= 3, ('Histroy must be 2D.')
 
         self._lattice = value
 
+    @property
+    def history(self) -> np.ndarray | Archive:
+        """Returns the history being visualized."""
+        if isinstance(self.lattice, CoupledMapLattice):
+            return self.lattice.history
+        return self.lattice
+
     def animate(self, show: bool = False, save: bool = True) -> animation.FuncAnimation:
         """Vizulizes the simulation of the lattice over time.
         This method creates an animation of the lattice's state over time
@@ -63,7 +109,57 @@ class Visualization:
         """
         self.lattice = self.lattice
         self.fig, self.ax = plt.subplots()
-        return self._animate(frames=len(self.lattice.history), show=show, save=save)
+        return self._animate(frames=len(self.history), show=show, save=save)
+
+    def render(
+        self,
+        path: str | os.PathLike | None = None,
+        fmt: str = 'gif',
+        fps: int = 5,
+        cmap: str = 'plasma',
+        scale: int = 1,
+        workers: int | None = None,
+    ) -> str:
+        """Writes the history straight to a GIF or a PNG sequence.
+
+        This is a fast alternative to `animate`. Frames are coloured in bulk
+        through a colormap lookup table instead of being drawn by matplotlib,
+        and are streamed from the history a chunk at a time.
+
+        Args:
+            path (str | os.PathLike | None): The GIF file, or the directory of
+                the PNG files. Defaults to a generated name in `map_animations`.
+            fmt (str): Either `'gif'` or `'png'`. Defaults to `'gif'`.
+            fps (int): The number of frames per second of a GIF. Defaults to 5.
+            cmap (str): The name of the colormap. Defaults to `'plasma'`.
+            scale (int): The number of pixels per neuron along each axis.
+                Defaults to 1.
+            workers (int | None): The number of threads colouring frames.
+                Defaults to None, which colours them in the calling thread.
+
+        Returns:
+            str: The path that was written.
+        """
+        if fmt not in ('gif', 'png'):
+            raise ValueError("Format must be 'gif' or 'png'.")
+        if path is None:
+            os.makedirs('map_animations', exist_ok=True)
+            path = os.path.join('map_animations', self.generate_filename())
+            if fmt == 'png':
+                path = os.path.splitext(path)[0]
+
+        encoder = FrameEncoder(
+            cmap=cmap,
+            scale=scale,
+            workers=workers,
+            resolution=self.resolution,
+            reduce=self.reduce,
+        )
+        if fmt == 'gif':
+            encoder.save_gif(self.history, path, fps=fps)
+        else:
+            encoder.save_png(self.history, path)
+        return str(path)
 
     def show_nueron(self, nueron: tuple[int]) -> None:
         """Shows the activation over time of a single neuron.
@@ -75,14 +171,14 @@ class Visualization:
                 or if the history does not contain at least two elements.
         """
         self.fig, self.ax = plt.subplots()
-        hist = np.array(self.lattice.history)
-        self.ax.plot(hist[:, nueron[0], nueron[1]])
+        self.ax.plot(neuron_trace(self.history, nueron))
         self.ax.set_title(f"Neuron {nueron} Activation Over Time")
         self.ax.set_xlabel('Time')
         self.ax.set_ylabel('Activation')
         plt.show()
 
-    def generate_filename(self) -> str:
+    @staticmethod
+    def generate_filename() -> str:
         """Generate a filename for the animation based on the current date and time.
 
         Returns:
@@ -94,8 +190,13 @@ class Visualization:
     def init_animation(self) -> AxesImage:
         """Initialize the animation."""
         self.ax.clear()
+        resolution = self.resolution
+        if resolution is None:
+            extent = self.ax.get_window_extent()
+            resolution = max(1, int(max(extent.width, extent.height)))
+        self._factor = preview_factor(self.history.shape, resolution)
         self.im = self.ax.imshow(
-            self.lattice.history[0],
+            self._preview(0),
             cmap='plasma',
             interpolation='nearest',
             animated=True,
@@ -108,7 +209,7 @@ class Visualization:
         Args:
             i (int): The current frame number.
         """
-        self.im.set_array(np.nan_to_num(self.lattice.history[i]))
+        self.im.set_array(np.nan_to_num(self._preview(i)))
 
         self.ax.set_title(f"Time: {i}")
         self.ax.set_xlabel('X-axis')
@@ -116,6 +217,10 @@ class Visualization:
         self.ax.set_xticks([])
         return (self.im,)
 
+    def _preview(self, i: int) -> np.ndarray:
+        """Returns frame `i` pooled to the resolution being drawn."""
+        return pool(self.history[i], self._factor, self.reduce)
+
     def _animate(self, show: bool, frames: int | None = None, save: bool = True) -> animation.FuncAnimation:
         """Animate the visualization.
 
@@ -129,7 +234,7 @@ class Visualization:
         """
         self.ax.clear()
         if frames is None:
-            frames = len(self.lattice.history)
+            frames = len(self.history)
 
         ani = animation.FuncAnimation(
             self.fig,
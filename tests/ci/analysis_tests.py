@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapEnsemble
+from cmlattice import RulkovLattice
+from cmlattice.analysis import power_spectrum
+from cmlattice.analysis import radial_average
+from cmlattice.analysis import spatial_correlation
+from cmlattice.analysis import structure_factor
+from cmlattice.archive import load_archive
+from cmlattice.archive import save_archive
+
+
+def test_spatial_statistics(tmp_path):
+    """Test the structure factor and correlations against direct sums."""
+    history = np.random.default_rng(0).standard_normal((30, 6, 7))
+    fluctuations = history - history.mean(axis=(1, 2), keepdims=True)
+    expected = (np.abs(np.fft.fft2(fluctuations)) ** 2).mean(axis=0) / 42
+    for chunk in (4, 256):
+        assert np.allclose(structure_factor(history, chunk), expected), (
+            'The structure factor should not depend on the chunk size.'
+        )
+
+    covariance = np.array([
+        [np.mean(fluctuations * np.roll(fluctuations, (-dy, -dx), (1, 2))) for dx in range(7)]
+        for dy in range(6)
+    ])
+    correlation = spatial_correlation(history, chunk=7)
+    assert np.allclose(correlation, covariance / covariance[0, 0]), (
+        'The correlations should match the mean products of the fluctuations.'
+    )
+    assert radial_average(correlation)[0] == 1, 'A site should be correlated with itself.'
+
+    save_archive(tmp_path / 'history.cmla', history, chunk=8)
+    assert np.allclose(structure_factor(load_archive(tmp_path / 'history.cmla')), expected), (
+        'Archives should give the same structure factor.'
+    )
+
+
+def test_power_spectrum():
+    """Test the Welch estimate of the temporal spectrum."""
+    t = np.arange(400)
+    history = np.sin(2 * np.pi * 0.1 * t)[:, None, None] * np.ones((1, 4, 4))
+    frequencies, psd = power_spectrum(history, segment=100, overlap=0, window='boxcar')
+    assert frequencies[psd.argmax()] == pytest.approx(0.1), 'The peak should be at 0.1.'
+    assert psd.sum() * frequencies[1] == pytest.approx(0.5), (
+        'The spectrum should integrate to the variance.'
+    )
+    frequencies, _ = power_spectrum(history, segment=100, spacing=2)
+    assert frequencies[-1] == pytest.approx(0.25), 'Spacing should scale the frequencies.'
+    with pytest.raises(ValueError):
+        power_spectrum(history, overlap=1)
+
+
+def test_analysis_lattices():
+    """Test that lattices and ensembles are analysed from their histories."""
+    ensemble = CoupledMapEnsemble(8, r=[3.6, 3.9], epsilon=0.4, seed=1)
+    ensemble.advance(64)
+    assert structure_factor(ensemble).shape == (2, 8, 8), (
+        'Ensembles should have a structure factor per member.'
+    )
+    assert power_spectrum(ensemble, segment=32)[1].shape == (2, 17), (
+        'Ensembles should have a spectrum per member.'
+    )
+
+    rulkov = RulkovLattice(8, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=1)
+    rulkov.advance(40)
+    assert np.array_equal(spatial_correlation(rulkov), spatial_correlation(rulkov.history)), (
+        'Rulkov lattices should be analysed from their x history.'
+    )
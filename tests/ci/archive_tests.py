@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+from cmlattice import Visualization
+from cmlattice.archive import ArchiveWriter
+from cmlattice.archive import load_archive
+from cmlattice.archive import save_archive
+from cmlattice.history import neuron_trace
+
+
+def test_archive_round_trip(tmp_path):
+    """Test lossless and quantized archives against the history."""
+    lattice = CoupledMapLattice(10, r=3.9, epsilon=0.5, seed=0)
+    lattice.advance(100)
+    history = lattice.history
+    for codec in ('zlib', 'lzma', 'none'):
+        for delta in (True, False):
+            path = tmp_path / f"{codec}_{delta}.cmla"
+            save_archive(path, history, chunk=16, rows=3, codec=codec, delta=delta)
+            assert np.array_equal(np.asarray(load_archive(path)), history), (
+                f"{codec} archives should be lossless, with delta={delta}."
+            )
+
+    save_archive(tmp_path / 'half.cmla', history, precision='float16')
+    half = load_archive(tmp_path / 'half.cmla')
+    assert half.dtype == history.dtype, 'Archives should read back in the original dtype.'
+    assert np.allclose(half.read(), history, atol=1e-3), 'Float16 archives should be close.'
+    save_archive(tmp_path / 'fixed.cmla', history, precision=1e-6)
+    fixed = load_archive(tmp_path / 'fixed.cmla').read()
+    assert np.abs(fixed - history).max() <= 5e-7 + 1e-12, (
+        'Fixed-point archives should round to the step.'
+    )
+
+    stable = CoupledMapLattice(10, r=2.8, epsilon=0.7, seed=0)
+    stable.advance(300)
+    save_archive(tmp_path / 'stable.cmla', stable.history)
+    size = (tmp_path / 'stable.cmla').stat().st_size
+    assert size < stable.history.nbytes / 4, 'Settled histories should compress well.'
+
+    with pytest.raises(ValueError):
+        save_archive(tmp_path / 'nan.cmla', np.full((2, 3, 3), np.nan), precision=1e-3)
+    with pytest.raises(ValueError):
+        ArchiveWriter(tmp_path / 'bad.cmla', (3, 3), codec='gzip')
+
+
+def test_archive_partial_reads(tmp_path):
+    """Test time windows and neuron traces read from an archive."""
+    ensemble = CoupledMapEnsemble(9, r=[3.6, 3.9], epsilon=0.4, seed=[0, 1])
+    ensemble.advance(50)
+    history = ensemble.history
+    path = tmp_path / 'ensemble.cmla'
+    with ArchiveWriter(path, history.shape[1:], chunk=8, rows=2) as writer:
+        writer.extend(history)
+    archive = load_archive(path)
+    assert archive.shape == history.shape and len(archive) == 51, (
+        'Archives should keep the shape of the history.'
+    )
+    assert np.array_equal(archive[10:40:3], history[10:40:3]), 'Slices should match.'
+    assert np.array_equal(archive[::-4], history[::-4]), 'Reversed slices should match.'
+    assert np.array_equal(archive[-1, 1], history[-1, 1]), 'Frames should match.'
+    assert np.array_equal(archive.read(7, 9), history[7:9]), 'Windows should match.'
+    assert np.array_equal(np.stack(list(archive)), history), 'Iterating should match.'
+    assert np.array_equal(neuron_trace(archive, (7, 3)), history[..., 7, 3]), (
+        'Neuron traces should match.'
+    )
+    neurons = [(0, 1), (8, 8)]
+    assert np.array_equal(archive.trace(neurons), neuron_trace(history, neurons)), (
+        'Traces of several neurons should match.'
+    )
+
+    decoded = []
+    archive._read_block = lambda c, block, read=archive._read_block: (
+        decoded.append(block) or read(c, block)
+    )
+    archive.trace((4, 4))
+    assert set(decoded) == {2}, 'Traces should only decode the block of the neuron.'
+
+    lattice = CoupledMapLattice(6, r=3.9, epsilon=0.5, seed=0)
+    lattice.advance(10)
+    save_archive(tmp_path / 'lattice.cmla', lattice.history)
+    viz = Visualization(load_archive(tmp_path / 'lattice.cmla'))
+    viz.render(tmp_path / 'archive.gif')
+    assert (tmp_path / 'archive.gif').exists(), 'Archives should render directly.'
+
+
+def test_archive_errors(tmp_path):
+    """Test that fixed point rejects values out of range and failed runs stay unclosed."""
+    path = tmp_path / 'large.cmla'
+    with pytest.raises(ValueError), ArchiveWriter(path, (3, 3), chunk=2, precision=1e-12) as writer:
+        writer.extend(np.full((2, 3, 3), 1e8))
+    with pytest.raises(ValueError, match='not closed'):
+        load_archive(path)
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import numpy as np
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+from cmlattice.attractor import AttractorDetector
+from cmlattice.sweep import parameter_grid
+from cmlattice.sweep import sweep
+
+
+def test_stop_on_fixed_point():
+    """Test that runs stop once the lattice settles on a fixed point."""
+    lattice = CoupledMapLattice(16, r=2.8, epsilon=0.7, seed=0)
+    detector = AttractorDetector(tolerance=1e-9)
+    states = list(lattice.simulate(5000, attractor=detector))
+    assert detector.detected and detector.period == 1, 'A fixed point has period 1.'
+    assert lattice.time == len(states) < 5000, 'The run should stop at the detection.'
+    assert detector.onset == lattice.time - 2, (
+        'The onset should be the first state repeated by the confirmed states.'
+    )
+    assert np.allclose(lattice.history[-1], lattice.history[detector.onset], atol=1e-9), (
+        'States after the onset should repeat.'
+    )
+
+    chaotic = CoupledMapLattice(8, r=3.9, epsilon=0.5, seed=0)
+    detector = AttractorDetector(max_period=8)
+    chaotic.advance(200, attractor=detector)
+    assert not detector.detected and detector.period == -1, (
+        'Chaotic lattices should not be detected.'
+    )
+    assert chaotic.time == 200 and len(detector._entries) == 8, (
+        'The run should finish with a bounded cache.'
+    )
+
+
+def test_period_and_cache():
+    """Test period detection and the bound on detectable periods."""
+    lattice = CoupledMapLattice(6, r=3.2, seed=0)
+    lattice.advance(200)
+    detector = AttractorDetector(tolerance=1e-6)
+    lattice.advance(100, attractor=detector)
+    assert detector.period == 2, 'Uncoupled logistic maps at r=3.2 have period 2.'
+
+    detector = AttractorDetector(tolerance=1e-6, max_period=1)
+    lattice.advance(300, attractor=detector)
+    assert not detector.detected, 'Periods beyond the cache should not be detected.'
+
+    detector = AttractorDetector(tolerance=1e-6, interval=3)
+    lattice.advance(100, attractor=detector)
+    assert detector.period == 6, 'Checks every 3 steps should see a period of 6.'
+
+
+def test_extrapolate():
+    """Test that extrapolated runs match simulated runs."""
+    r = [2.8, 3.2, 3.3]
+    full = CoupledMapEnsemble(6, r=r, epsilon=[0.7, 1.0, 1.0], seed=[0, 1, 2])
+    fast = CoupledMapEnsemble(6, r=r, epsilon=[0.7, 1.0, 1.0], seed=[0, 1, 2])
+    full.advance(1001, every=2)
+    detector = AttractorDetector(extrapolate=True)
+    means = []
+    fast.add_observer(lambda lattice: means.append(lattice.state.mean()))
+    fast.advance(1001, every=2, attractor=detector)
+    assert detector.detected and (detector.period == 2).all(), (
+        'Every member should be on a cycle.'
+    )
+    assert fast.time == full.time == 1001, 'Extrapolated runs should reach the end.'
+    assert np.allclose(fast.history, full.history, atol=1e-8), (
+        'Extrapolated states should match the simulation.'
+    )
+    assert np.allclose(fast.state, full.state, atol=1e-8), (
+        'The final state should match the simulation.'
+    )
+    assert len(means) == 500, 'Observers should see the extrapolated states.'
+
+    grid = parameter_grid([2.8, 3.2], [0.7, 1.0])
+    results = sweep('cml', 5, 400, grid, workers=1)
+    detected = sweep(
+        'cml', 5, 400, grid, workers=1, attractor=AttractorDetector(extrapolate=True),
+    )
+    assert np.allclose(detected['mean'], results['mean'], atol=1e-8), (
+        'Sweeps should extrapolate the mean field.'
+    )
+    assert (detected['period'] > 0).all() and detected['onset'].shape == (4,), (
+        'Sweeps should report the cycle of every point.'
+    )
+    stopped = sweep('cml', 5, 400, grid, workers=1, attractor=AttractorDetector())
+    assert np.isnan(stopped['mean'][:, -1]).all(), 'Stopped sweeps should leave NaN means.'
+
+
+def test_fingerprints_are_exact():
+    """Test that a change of one cell changes the fingerprint of a large state."""
+    lattice = CoupledMapLattice(256, r=3.9, epsilon=0.4, seed=0)
+    detector = AttractorDetector(tolerance=1e-12)
+    detector.start(lattice, 0)
+    state = lattice.state.reshape(1, -1)
+    # Weighted sums of the cells are far past the precision of a float64.
+    before = detector._hash(state)[0].copy()
+    state[0, 1000] += 1.5e-12
+    after = detector._hash(state)[0]
+    assert (before != after).all(), 'States one cell apart should not collide.'
+
+
+def test_diverged_states_are_skipped():
+    """Test that NaN and infinite states are never reported as cycles."""
+    ensemble = CoupledMapEnsemble(6, r=[3.9, 2.5], epsilon=1, seed=0)
+    state = ensemble.state
+    state[0] = np.nan
+    ensemble.state = state
+    detector = AttractorDetector()
+    with np.errstate(invalid='raise'):
+        list(ensemble.simulate(200, attractor=detector))
+    assert detector.periods.tolist() == [-1, 1], (
+        'Only the member on a fixed point should have a period.'
+    )
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from cmlattice.bench import compare
+from cmlattice.bench import load_results
+from cmlattice.bench import run_suite
+from cmlattice.bench import save_results
+
+
+def test_bench(tmp_path):
+    """Test running, saving and comparing benchmark results."""
+    results = run_suite(sizes=(8,), steps=3, repeat=1)
+    cases = {(r['model'], r['mode'], r['history']) for r in results['results']}
+    assert len(cases) == 10, 'Kaneko should skip the independent mode.'
+    assert all(r['steps_per_sec'] > 0 for r in results['results']), (
+        'Every case should report a rate.'
+    )
+    kept = next(r for r in results['results'] if r['history'] == 'on')
+    dropped = next(r for r in results['results'] if r['history'] == 'off')
+    assert kept['peak_memory'] > dropped['peak_memory'], (
+        'Keeping history should use more memory.'
+    )
+
+    save_results(tmp_path / 'bench.json', results)
+    baseline = load_results(tmp_path / 'bench.json')
+    assert compare(baseline, results) == [], 'A run should not regress against itself.'
+    for result in baseline['results']:
+        result['steps_per_sec'] *= 2
+    assert len(compare(baseline, results)) == len(results['results']), (
+        'Halving every rate should be reported as a regression.'
+    )
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapLattice
+from cmlattice import RulkovLattice
+from cmlattice.cache import ResultCache
+
+
+def make(**kwargs):
+    return CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=5, **kwargs)
+
+
+def assert_same(lattice, reference):
+    assert lattice.time == reference.time, 'Cached runs should end at the same time.'
+    assert np.array_equal(lattice.state, reference.state), (
+        'Cached runs should end in the same state.'
+    )
+    assert np.array_equal(lattice.history, reference.history), (
+        'Cached runs should have the same history.'
+    )
+    assert lattice.rng.bit_generator.state == reference.rng.bit_generator.state, (
+        'Cached runs should leave the generator in the same state.'
+    )
+
+
+def test_cache_hit_and_extend(tmp_path):
+    """Test that cached runs match plain ones and resume from the longest prefix."""
+    cache = ResultCache(tmp_path)
+    for steps, simulated in ((50, 50), (50, 0), (120, 70), (30, 30)):
+        lattice = make()
+        assert cache.advance(lattice, steps) == simulated, (
+            f"{simulated} steps should be simulated for a run of {steps}."
+        )
+        reference = make()
+        reference.advance(steps)
+        assert_same(lattice, reference)
+    assert len(cache) == 1, 'Runs of the same lattice should share an entry.'
+
+    other = CoupledMapLattice(8, r=3.8, epsilon=0.4, seed=5)
+    assert cache.key(other) != cache.key(make()), 'Parameters should change the key.'
+
+
+def test_cache_burn_in_every(tmp_path):
+    """Test resuming runs with a burn-in and a recording stride."""
+    cache = ResultCache(tmp_path)
+
+    def rulkov():
+        return RulkovLattice(
+            6, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5,
+            retention='every', every=3, seed=7,
+        )
+
+    for steps in (20, 47, 90):
+        lattice = rulkov()
+        cache.advance(lattice, steps, burn_in=10, every=2)
+        reference = rulkov()
+        reference.advance(steps, burn_in=10, every=2)
+        assert_same(lattice, reference)
+    assert cache.key(rulkov(), 10, 2) != cache.key(rulkov(), 10, 1), (
+        'The recording stride should change the key.'
+    )
+
+
+def test_cache_eviction(tmp_path):
+    """Test that the least recently used runs are removed first."""
+    cache = ResultCache(tmp_path, max_bytes=0)
+    cache.advance(make(), 20)
+    cache.advance(CoupledMapLattice(8, r=3.8, epsilon=0.4, seed=5), 20)
+    assert len(cache) == 1, 'Only the latest run should be kept.'
+    assert cache.advance(CoupledMapLattice(8, r=3.8, epsilon=0.4, seed=5), 20) == 0, (
+        'The latest run should still be cached.'
+    )
+    cache.clear()
+    assert len(cache) == 0 and cache.nbytes == 0, 'Clearing should remove every run.'
+
+
+def test_cache_errors(tmp_path):
+    """Test that unsupported runs are rejected."""
+    cache = ResultCache(tmp_path)
+    with pytest.raises(ValueError):
+        cache.advance(make(retention='ring', window=4), 10)
+    lattice = make()
+    lattice.advance(1)
+    with pytest.raises(ValueError):
+        cache.advance(lattice, 10)
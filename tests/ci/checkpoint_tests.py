@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import numpy as np
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+from cmlattice import load_history
+from cmlattice import RulkovLattice
+from cmlattice.observers import Checkpointer
+
+
+def test_seed():
+    """Test that seeded lattices start from the same state."""
+    first = CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=3)
+    second = CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=3)
+    other = CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=4)
+    assert np.array_equal(first.state, second.state), (
+        'Lattices with the same seed should have the same state.'
+    )
+    assert not np.array_equal(first.state, other.state), (
+        'Lattices with different seeds should have different states.'
+    )
+    first.reset()
+    second.reset()
+    assert np.array_equal(first.state, second.state), (
+        'Resetting should draw from the seeded generator.'
+    )
+
+
+def test_checkpoint_resume(tmp_path):
+    """Test that a resumed run matches an uninterrupted one."""
+    checkpoint = tmp_path / 'checkpoint.npz'
+    history_file = tmp_path / 'history.npy'
+
+    def make():
+        return RulkovLattice(
+            6, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5,
+            retention='every', every=3, seed=7,
+        )
+
+    reference = make()
+    list(reference.simulate(30))
+
+    lattice = make()
+    lattice.add_observer(Checkpointer(checkpoint, every=10))
+    for _ in lattice.simulate(30, history_file=history_file):
+        if lattice.time == 25:
+            break
+
+    resumed = CoupledMapLattice.from_checkpoint(checkpoint, history_file=history_file)
+    assert isinstance(resumed, RulkovLattice), 'The model should be restored.'
+    assert resumed.time == 20, 'The latest checkpoint should be restored.'
+    list(resumed.simulate(30 - resumed.time))
+    assert np.array_equal(resumed.state, reference.state), (
+        'The resumed run should match the uninterrupted run.'
+    )
+    assert np.array_equal(load_history(history_file), reference.history), (
+        'The history file should continue from the checkpoint.'
+    )
+    assert resumed.rng.random() == reference.rng.random(), (
+        'The generator state should be restored.'
+    )
+
+    ensemble = CoupledMapEnsemble(5, r=[3.7, 3.9], epsilon=[0.4, 1], seed=1)
+    ensemble.save_checkpoint(checkpoint)
+    restored = CoupledMapLattice.from_checkpoint(checkpoint)
+    assert np.array_equal(restored.epsilon, ensemble.epsilon), (
+        'Ensemble parameters should be restored.'
+    )
+    assert np.array_equal(restored.state, ensemble.state), (
+        'Ensemble state should be restored.'
+    )
+
+
+def test_checkpoint_retention(tmp_path):
+    """Test that a run that kept no history can be restored with one."""
+    path = tmp_path / 'run.npz'
+    lattice = CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=0, retention='none')
+    lattice.advance(5)
+    lattice.save_checkpoint(path)
+
+    restored = CoupledMapLattice.from_checkpoint(path, retention='all')
+    restored.advance(3)
+    lattice.advance(3)
+    assert len(restored.history) == 3, 'The restored lattice should keep its states.'
+    assert np.array_equal(restored.history[-1], lattice.state), (
+        'The restored lattice should continue the run.'
+    )
+    assert len(CoupledMapLattice.from_checkpoint(path).history) == 0, (
+        'The retention of the checkpoint should be the default.'
+    )
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import numpy as np
+import pytest
 from cmlattice import CoupledMapLattice
 from cmlattice import KanekoLattice
 from cmlattice import RulkovLattice
@@ -133,3 +134,168 @@ def test_simulate():
     assert np.array_equal(lattice.history[0], initial_state), (
         'First element in history should be the initial state.'
     )
+
+
+def test_coupled_matches_loop():
+    """Test the vectorized coupled update against a per-site loop."""
+    lattice = CoupledMapLattice(16, r=3.9, epsilon=0.3)
+    for _ in range(3):
+        previous = lattice.state
+        expected = previous.copy()
+        for i in range(lattice.n):
+            left_neighbor = previous[(i - 1) % lattice.n]
+            for j in range(lattice.n):
+                expected[i, j] = lattice.epsilon * lattice.state_function(
+                    previous[i, j],
+                ) + (1 - lattice.epsilon) * lattice.state_function(left_neighbor[j])
+        lattice.update()
+        assert np.array_equal(lattice.state, expected), (
+            'Vectorized update should match the per-site loop.'
+        )
+    assert np.array_equal(lattice.history[-2], previous), (
+        'History should not be overwritten by the update buffers.'
+    )
+
+
+def test_kaneko_matches_loop():
+    """Test the synchronous Kaneko update against a per-site loop."""
+    lattice = KanekoLattice(12, r=1.5, epsilon=0.4, synchronous=True)
+    for _ in range(3):
+        previous = lattice.state
+        expected = previous.copy()
+        for i in range(lattice.n):
+            left_neighbor = previous[(i - 1) % lattice.n]
+            right_neighbor = previous[(i + 1) % lattice.n]
+            for j in range(lattice.n):
+                expected[i, j] = lattice.epsilon * lattice.state_function(
+                    previous[i, j],
+                ) + (lattice.epsilon / 2) * lattice.state_function(
+                    left_neighbor[j] + lattice.state_function(right_neighbor[j]),
+                )
+        lattice.update()
+        assert np.array_equal(lattice.state, expected), (
+            'Vectorized update should match the per-site loop.'
+        )
+
+
+def test_rulkov_matches_loop():
+    """Test the synchronous Rulkov updates against per-site loops."""
+    lattice = RulkovLattice(12, r=4.1, mu=0.01, sigma=0.2, epsilon=1)
+    for _ in range(3):
+        previous = lattice.state
+        lattice.update()
+        assert np.array_equal(
+            lattice.state, lattice.state_function(previous[0], previous[1]),
+        ), 'Independent update should match the state function.'
+
+    lattice = RulkovLattice(12, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, synchronous=True)
+    for _ in range(3):
+        previous = lattice.state
+        expected = previous.copy()
+        for i in range(lattice.n):
+            left_neighbor = previous[:, (i - 1) % lattice.n]
+            right_neighbor = previous[:, (i + 1) % lattice.n]
+            for j in range(lattice.n):
+                expected[:, i, j] = lattice.epsilon * lattice.state_function(
+                    previous[0, i, j],
+                    previous[1, i, j],
+                ) + (lattice.epsilon / 2) * (
+                    lattice.state_function(left_neighbor[0, j], left_neighbor[1, j]) +
+                    lattice.state_function(
+                        right_neighbor[0, j], right_neighbor[1, j],
+                    )
+                )
+        lattice.update()
+        # Scalar `x**2` goes through libm `pow`, which can differ from the
+        # array square by one ulp.
+        np.testing.assert_allclose(lattice.state, expected, rtol=1e-12, atol=0)
+        assert np.array_equal(lattice.history[-1], lattice.state[0]), (
+            'History should record the x component.'
+        )
+
+
+def test_float32():
+    """Test that float32 lattices keep their precision through updates."""
+    pairs = [
+        (
+            CoupledMapLattice(8, r=3.2, epsilon=0.5, dtype=np.float32),
+            CoupledMapLattice(8, r=3.2, epsilon=0.5),
+        ),
+        (
+            KanekoLattice(8, r=1.5, epsilon=0.4, dtype=np.float32),
+            KanekoLattice(8, r=1.5, epsilon=0.4),
+        ),
+        (
+            RulkovLattice(8, 4.1, 0.01, 0.2, 0.5, dtype=np.float32),
+            RulkovLattice(8, 4.1, 0.01, 0.2, 0.5),
+        ),
+    ]
+    for lattice, reference in pairs:
+        reference.state = lattice.state.astype(np.float64)
+        for _ in range(3):
+            lattice.update()
+            reference.update()
+        assert lattice.state.dtype == np.float32, 'State should stay float32.'
+        assert lattice.history.dtype == np.float32, 'History should be float32.'
+        np.testing.assert_allclose(lattice.state, reference.state, rtol=1e-4)
+
+    with pytest.raises(ValueError):
+        CoupledMapLattice(8, r=3.2, dtype=np.float32).state = np.zeros((8, 8))
+
+
+def test_sequential_matches_loop():
+    """Test the row sweeps against the in-place loops of the original models.
+
+    The loops read their neighbours from the array they are writing, so
+    every row but the first sees an already updated neighbour. The Rulkov
+    loop evaluates the map on one-element arrays, since NumPy squares
+    scalars through `pow`, which can differ from the array square by one ulp.
+    """
+    for n in (1, 2, 7):
+        lattice = KanekoLattice(n, r=1.5, epsilon=0.4, seed=0)
+        for _ in range(3):
+            state = lattice.state
+            for i in range(lattice.n):
+                left_neighbor = state[(i - 1) % lattice.n]
+                right_neighbor = state[(i + 1) % lattice.n]
+                for j in range(lattice.n):
+                    state[i, j] = lattice.epsilon * lattice.state_function(state[i, j]) + (
+                        lattice.epsilon / 2
+                    ) * lattice.state_function(
+                        left_neighbor[j] + lattice.state_function(right_neighbor[j]),
+                    )
+            lattice.update()
+            assert np.array_equal(lattice.state, state), (
+                'The Kaneko sweep should match the in-place loop.'
+            )
+
+        lattice = RulkovLattice(n, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=0)
+        for _ in range(3):
+            state = lattice.state
+            for i in range(lattice.n):
+                left_neighbor = state[:, (i - 1) % lattice.n]
+                right_neighbor = state[:, (i + 1) % lattice.n]
+                for j in range(lattice.n):
+                    site = slice(j, j + 1)
+                    state[:, i, site] = lattice.epsilon * lattice.state_function(
+                        state[0, i, site],
+                        state[1, i, site],
+                    ) + (lattice.epsilon / 2) * (
+                        lattice.state_function(left_neighbor[0, site], left_neighbor[1, site]) +
+                        lattice.state_function(right_neighbor[0, site], right_neighbor[1, site])
+                    )
+            lattice.update()
+            assert np.array_equal(lattice.state, state), (
+                'The Rulkov sweep should match the in-place loop.'
+            )
+
+    sequential = KanekoLattice(7, r=1.5, epsilon=0.4, seed=0)
+    synchronous = KanekoLattice(7, r=1.5, epsilon=0.4, seed=0, synchronous=True)
+    sequential.update()
+    synchronous.update()
+    assert np.array_equal(sequential.state[0], synchronous.state[0]), (
+        'The first row should not depend on the update order.'
+    )
+    assert not np.isclose(sequential.state[1:], synchronous.state[1:]).any(), (
+        'Synchronous updates should not see updated neighbours.'
+    )
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapLattice
+from cmlattice import load_history
+from cmlattice.cli import main
+
+
+@pytest.mark.parametrize('renderer', ['direct', 'matplotlib'])
+def test_simulate_resume(tmp_path, monkeypatch, renderer):
+    """Test that a direct-render checkpointed run resumes into either renderer."""
+    monkeypatch.chdir(tmp_path)
+    options = [
+        '-n', '8', '-r', '3.7', '--checkpoint', 'ck.npz', '--checkpoint-every', '5',
+        '--history-file', 'history.npy',
+    ]
+    main(['simulate', '-t', '20', '--renderer', 'direct', '--seed', '1', *options])
+    checkpoint = CoupledMapLattice.from_checkpoint('ck.npz')
+    assert checkpoint.time == 20, 'The last checkpoint should be at the end of the run.'
+
+    main(['simulate', '-t', '40', '--renderer', renderer, '--resume', *options])
+    reference = CoupledMapLattice(8, r=3.7, epsilon=0.5, seed=1)
+    reference.advance(40)
+    resumed = CoupledMapLattice.from_checkpoint('ck.npz')
+    assert resumed.time == 40, 'The resumed run should continue to the new end.'
+    assert np.array_equal(resumed.state, reference.state), (
+        'The resumed run should match an uninterrupted one.'
+    )
+    assert np.array_equal(load_history('history.npy'), reference.history), (
+        'The history file should hold the whole run.'
+    )
+    assert list((tmp_path / 'map_animations').glob('*.gif')), (
+        'The runs should save an animation.'
+    )
+
+
+@pytest.mark.parametrize('renderer', ['direct', 'matplotlib'])
+def test_simulate_history_file(tmp_path, monkeypatch, renderer):
+    """Test that both renderers write the history file through the pipeline."""
+    monkeypatch.chdir(tmp_path)
+    args = ['simulate', '-n', '8', '-r', '3.7', '-t', '12', '--every', '3', '--seed', '2']
+    main([*args, '--renderer', renderer, '--history-file', 'history.npy'])
+    reference = CoupledMapLattice(8, r=3.7, epsilon=0.5, seed=2)
+    reference.advance(12, every=3)
+    assert np.array_equal(load_history('history.npy'), reference.history), (
+        'The history file should hold the recorded states.'
+    )
+
+    main([*args, '--renderer', renderer, '--cache', 'cache'])
+    main([*args, '--renderer', renderer, '--cache', 'cache'])
+    assert len(list((tmp_path / 'cache').iterdir())) == 1, (
+        'The second run should reuse the cached result.'
+    )
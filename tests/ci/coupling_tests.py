@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+from cmlattice import KanekoLattice
+from cmlattice import RulkovLattice
+from cmlattice.coupling import Convolution
+from cmlattice.coupling import GlobalCoupling
+from cmlattice.coupling import Topology
+
+
+def test_stencil_matches_default_neighbours():
+    """Test that stencils of the default neighbours give the same updates."""
+    default = CoupledMapLattice(6, r=3.9, epsilon=0.4, seed=0)
+    stencil = CoupledMapLattice(
+        6, r=3.9, epsilon=0.4, seed=0, coupling=Topology.stencil(6, [(-1, 0)]),
+    )
+    list(default.simulate(10))
+    list(stencil.simulate(10))
+    assert np.array_equal(default.history, stencil.history), (
+        'A stencil of the row above should match the default coupling.'
+    )
+
+    default = RulkovLattice(
+        6, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=0, synchronous=True,
+    )
+    stencil = RulkovLattice(
+        6, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=0,
+        coupling=Topology.stencil(6, [(-1, 0), (1, 0)]),
+    )
+    list(default.simulate(10))
+    list(stencil.simulate(10))
+    assert np.array_equal(default.state, stencil.state), (
+        'A stencil of the rows above and below should match the Rulkov coupling.'
+    )
+
+
+def test_topology_gather():
+    """Test irregular topologies against a loop over the edges."""
+    adjacency = [[1, 2], [], [0, 0, 3], [1]]
+    weights = [[0.5, 2.0], [], [1.0, 1.0, -1.0], [3.0]]
+    topology = Topology.from_adjacency(adjacency, weights)
+    edges = Topology.from_edges([1, 2, 0, 0, 3, 1], [0, 0, 2, 2, 2, 3], 4, [0.5, 2, 1, 1, -1, 3])
+    assert np.array_equal(topology.indptr, edges.indptr), 'Both builders should agree.'
+
+    values = np.arange(8, dtype=np.float64).reshape(2, 2, 2)
+    expected = np.zeros((2, 4))
+    for node, (row, ws) in enumerate(zip(adjacency, weights)):
+        for source, w in zip(row, ws):
+            expected[:, node] += w * values.reshape(2, 4)[:, source]
+    for t in (topology, edges):
+        out = t.gather(values, np.empty_like(values))
+        assert np.allclose(out.reshape(2, 4), expected), (
+            'Gathering should sum the weighted values of every edge.'
+        )
+
+    assert (Topology.von_neumann(5).degrees() == 4).all(), 'Von Neumann has 4 neighbours.'
+    assert (Topology.moore(5, radius=2).degrees() == 24).all(), 'Moore r=2 has 24 neighbours.'
+    world = Topology.small_world(5, k=4, p=0.5, seed=0)
+    assert len(world) == 100, 'Small worlds should keep k edges per site.'
+    normalized = world.normalized()
+    ones = normalized.gather(np.ones((5, 5)), np.empty((5, 5)))
+    assert np.allclose(ones, 1), 'Normalized weights should sum to one.'
+
+
+def test_topology_empty_nodes():
+    """Test that nodes without edges do not cut the edges of other nodes."""
+    values = np.arange(1, 5, dtype=np.float64).reshape(2, 2)
+    cases = {
+        ((1, 2, 3), (), (), ()): [9, 0, 0, 0],
+        ((1,), (2, 3), (), ()): [2, 7, 0, 0],
+        ((), (0, 1), (), (2, 3)): [0, 3, 0, 7],
+    }
+    for adjacency, expected in cases.items():
+        out = Topology.from_adjacency(adjacency).gather(values, np.empty_like(values))
+        assert out.ravel().tolist() == expected, (
+            f"Gathering {adjacency} should give {expected}."
+        )
+
+
+def test_topology_lattices(tmp_path):
+    """Test topologies with ensembles, tangent maps and checkpoints."""
+    topology = Topology.small_world(4, k=2, p=0.3, seed=1).normalized()
+    ensemble = CoupledMapEnsemble(4, r=[3.7, 3.9], epsilon=0.4, seed=0, coupling=topology)
+    single = CoupledMapLattice(4, r=3.9, epsilon=0.4, coupling=topology)
+    single.state = ensemble.state[1]
+    ensemble.advance(5)
+    single.advance(5)
+    assert np.allclose(ensemble.state[1], single.state), (
+        'Ensemble members should share the topology.'
+    )
+
+    state = single.state
+    v = np.random.default_rng(0).standard_normal((1, 4, 4))
+    jv = single._tangent(v, np.empty_like(v))[0]
+    h = 1e-6
+    single.state = state + h * v[0]
+    single._step()
+    forward = single.state
+    single.state = state - h * v[0]
+    single._step()
+    assert np.allclose((forward - single.state) / (2 * h), jv, atol=1e-7), (
+        'The tangent map should follow the topology.'
+    )
+
+    single.save_checkpoint(tmp_path / 'checkpoint.npz')
+    restored = CoupledMapLattice.from_checkpoint(tmp_path / 'checkpoint.npz')
+    assert np.array_equal(restored.coupling.indices, topology.indices), (
+        'Checkpoints should keep the topology.'
+    )
+    assert np.array_equal(restored.coupling.weights, topology.weights), (
+        'Checkpoints should keep the edge weights.'
+    )
+    with np.load(tmp_path / 'checkpoint.npz', allow_pickle=False) as checkpoint:
+        assert all(checkpoint[name].dtype != object for name in checkpoint.files), (
+            'Checkpoints should only hold plain arrays.'
+        )
+
+    with pytest.raises(ValueError):
+        KanekoLattice(4, r=1.5, coupling=topology)
+    with pytest.raises(ValueError):
+        CoupledMapLattice(5, r=3.9, coupling=topology)
+
+
+def test_convolution_matches_stencil():
+    """Test that FFT convolutions match sparse stencils of the same weights."""
+    offsets = [(-1, 0), (1, 0), (0, 2), (-3, -1)]
+    weights = [0.5, 0.25, 0.125, 0.125]
+    kernel = np.zeros((7, 7))
+    for (di, dj), w in zip(offsets, weights):
+        kernel[di, dj] = w
+    convolution = Convolution(kernel)
+    stencil = Topology.stencil(7, offsets, weights)
+    values = np.random.default_rng(0).random((3, 7, 7))
+    for dtype, atol in ((np.float64, 1e-12), (np.float32, 1e-5)):
+        out = convolution.gather(values.astype(dtype), np.empty(values.shape, dtype))
+        expected = stencil.gather(values, np.empty_like(values))
+        assert out.dtype == dtype and np.allclose(out, expected, atol=atol), (
+            'Convolutions should sum the weighted values at every offset.'
+        )
+    assert len([key for key in convolution._buffers if key[0] == 'spectrum']) == 2, (
+        'The kernel spectrum should be computed once per dtype.'
+    )
+
+    lattice = RulkovLattice(
+        7, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=0, coupling=convolution,
+    )
+    reference = RulkovLattice(
+        7, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=0, coupling=stencil,
+    )
+    lattice.advance(5)
+    reference.advance(5)
+    assert np.allclose(lattice.state, reference.state), (
+        'Rulkov lattices should couple through the kernel.'
+    )
+
+    decaying = Convolution.power_law(9, alpha=2)
+    assert decaying.kernel[0, 0] == 0 and np.isclose(decaying.kernel.sum(), 1), (
+        'Power-law kernels should be normalized and exclude the site itself.'
+    )
+    assert decaying.kernel[0, 1] > decaying.kernel[1, 1] > decaying.kernel[4, 4], (
+        'Power-law weights should decay with distance.'
+    )
+
+
+def test_global_coupling(tmp_path):
+    """Test mean-field coupling against uniform kernels and the mean field."""
+    ensemble = CoupledMapEnsemble(
+        8, r=[3.7, 3.9], epsilon=0.3, seed=0, coupling=GlobalCoupling(),
+    )
+    uniform = CoupledMapEnsemble(
+        8, r=[3.7, 3.9], epsilon=0.3, seed=0, coupling=Convolution(np.full((8, 8), 1 / 64)),
+    )
+    state = ensemble.state
+    ensemble.advance(1)
+    mapped = 3.7 * state[0] * (1 - state[0])
+    assert np.allclose(ensemble.state[0], 0.3 * mapped + 0.7 * mapped.mean()), (
+        'Global coupling should add the mean of the mapped values.'
+    )
+    uniform.advance(1)
+    assert np.allclose(uniform.state, ensemble.state), (
+        'Uniform kernels should reduce to the mean field.'
+    )
+
+    lattice = CoupledMapLattice(8, r=3.9, epsilon=0.05, seed=0, coupling=GlobalCoupling())
+    lattice.advance(200)
+    assert np.ptp(lattice.state) < 1e-6, 'Strong global coupling should synchronize.'
+
+    lattice.save_checkpoint(tmp_path / 'checkpoint.npz')
+    restored = CoupledMapLattice.from_checkpoint(tmp_path / 'checkpoint.npz')
+    assert isinstance(restored.coupling, GlobalCoupling), (
+        'Checkpoints should keep the coupling.'
+    )
+    uniform.save_checkpoint(tmp_path / 'uniform.npz')
+    restored = CoupledMapEnsemble.from_checkpoint(tmp_path / 'uniform.npz')
+    assert np.array_equal(restored.coupling.kernel, uniform.coupling.kernel), (
+        'Checkpoints should keep the kernel.'
+    )
+    with pytest.raises(ValueError):
+        CoupledMapLattice(5, r=3.9, coupling=Convolution(np.ones((4, 4))))
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+from cmlattice import KanekoEnsemble
+from cmlattice import KanekoLattice
+from cmlattice import RulkovEnsemble
+from cmlattice import RulkovLattice
+
+
+def _members(ensemble, lattices):
+    """Copies each member state of an ensemble into a single lattice."""
+    for i, lattice in enumerate(lattices):
+        lattice.state = ensemble.state[i]
+    return lattices
+
+
+def test_ensemble_matches_lattices():
+    """Test that ensembles advance each member like a single lattice."""
+    r = [3.6, 3.8, 4.0]
+    epsilon = [0.2, 0.7, 1.0]
+    cases = [
+        (
+            CoupledMapEnsemble(8, r, epsilon),
+            [CoupledMapLattice(8, a, e) for a, e in zip(r, epsilon)],
+        ),
+        (
+            KanekoEnsemble(8, r, epsilon),
+            [KanekoLattice(8, a, e) for a, e in zip(r, epsilon)],
+        ),
+        (
+            RulkovEnsemble(8, r, 0.01, [0.1, 0.2, 0.3], epsilon),
+            [
+                RulkovLattice(8, a, 0.01, s, e)
+                for a, s, e in zip(r, [0.1, 0.2, 0.3], epsilon)
+            ],
+        ),
+    ]
+    for ensemble, lattices in cases:
+        assert len(ensemble) == 3, 'Ensemble should hold one member per parameter.'
+        lattices = _members(ensemble, lattices)
+        for _ in range(4):
+            ensemble.update()
+            for lattice in lattices:
+                lattice.update()
+        for i, lattice in enumerate(lattices):
+            assert np.array_equal(ensemble.state[i], lattice.state), (
+                f"Member {i} of {ensemble!r} should match a single lattice."
+            )
+        assert ensemble.history.shape == (5, 3, 8, 8), (
+            'Ensemble history should have a batch axis.'
+        )
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapLattice
+from cmlattice import load_history
+from cmlattice import RulkovLattice
+from cmlattice import Visualization
+from cmlattice.history import History
+
+
+def test_history_all():
+    """Test that the default history keeps every state as a read-only view."""
+    lattice = CoupledMapLattice(8, r=3.7, epsilon=0.5)
+    states = [lattice.state] + list(lattice.simulate(20))
+    history = lattice.history
+    assert history.shape == (21, 8, 8), 'History should keep every state.'
+    assert np.array_equal(history, np.array(states)), (
+        'History should match the simulated states.'
+    )
+    assert not history.flags.writeable, 'History should be read-only.'
+    assert np.shares_memory(history, lattice.history), (
+        'Reading the history should not copy it.'
+    )
+
+
+def test_history_ring():
+    """Test that ring retention keeps the last states in order."""
+    lattice = RulkovLattice(6, r=4.1, mu=0.01, sigma=0.2, retention='ring', window=5)
+    states = [lattice.state[0]] + [state[0] for state in lattice.simulate(12)]
+    assert np.array_equal(lattice.history, np.array(states[-5:])), (
+        'Ring history should hold the last window states.'
+    )
+    assert lattice._history.nbytes == 2 * 5 * 6 * 6 * 8, (
+        'Ring history should not grow past its buffer.'
+    )
+
+
+def test_history_every():
+    """Test that strided retention keeps every k-th state."""
+    history = History((2,), mode='every', every=3)
+    history.reserve(10)
+    allocated = history.nbytes
+    history.extend(np.full(2, i, dtype=np.float64) for i in range(10))
+    assert history[:, 0].tolist() == [0, 3, 6, 9], (
+        'History should keep every third state.'
+    )
+    assert history.nbytes == allocated, 'Reserved history should not reallocate.'
+    with pytest.raises(ValueError):
+        History((2,), mode='ring')
+
+
+def test_history_memmap(tmp_path):
+    """Test streaming the history to a memory-mapped file."""
+    path = tmp_path / 'history.npy'
+    lattice = CoupledMapLattice(8, r=3.7, epsilon=0.5)
+    states = [lattice.state] + list(lattice.simulate(15, history_file=path))
+    assert isinstance(lattice.history, np.memmap), 'History should be memory-mapped.'
+
+    loaded = load_history(path)
+    assert isinstance(loaded, np.memmap), 'Loaded history should be lazy.'
+    assert np.array_equal(loaded, np.array(states)), (
+        'The file should hold every simulated state.'
+    )
+    assert np.array_equal(np.load(path), loaded), 'The file should be a valid .npy file.'
+
+    list(lattice.simulate(5))
+    lattice._history.close()
+    assert load_history(path).shape == (21, 8, 8), (
+        'The file should grow with further steps.'
+    )
+    assert Visualization(load_history(path)).history.shape == (21, 8, 8), (
+        'Visualization should accept a history array.'
+    )
+
+
+def test_trace_and_probe():
+    """Test neuron traces from history and from probes."""
+    lattice = CoupledMapLattice(8, r=3.9, epsilon=0.4)
+    probed = CoupledMapLattice(8, r=3.9, epsilon=0.4, retention='none')
+    probed.state = lattice.state
+    probe = probed.add_probe([(1, 2), (7, 0)])
+    list(lattice.simulate(12))
+    list(probed.simulate(12))
+
+    trace = lattice.trace((1, 2))
+    assert np.shares_memory(trace, lattice.history), 'A single trace should be a view.'
+    assert np.array_equal(trace, lattice.history[:, 1, 2]), 'Trace should follow the neuron.'
+    assert lattice.trace([(1, 2), (7, 0)]).shape == (13, 2), (
+        'Several traces should be stacked.'
+    )
+
+    assert len(probed.history) == 0, 'No history should be kept.'
+    assert np.array_equal(probe.values, lattice.trace([(1, 2), (7, 0)])), (
+        'The probe should record the selected neurons.'
+    )
+    assert np.array_equal(probe.trace((7, 0)), lattice.history[:, 7, 0]), (
+        'The probe should return the trace of one neuron.'
+    )
+
+
+def test_burn_in_and_every():
+    """Test skipping a burn-in and recording every k-th state."""
+    reference = CoupledMapLattice(6, r=3.9, epsilon=0.4, seed=0)
+    list(reference.simulate(30))
+
+    lattice = CoupledMapLattice(6, r=3.9, epsilon=0.4, seed=0)
+    probe = lattice.add_probe([(1, 2)])
+    states = list(lattice.simulate(20, burn_in=10, every=5))
+    assert lattice.time == 30, 'Burn-in steps should advance the time.'
+    assert np.array_equal(np.array(states), reference.history[15::5]), (
+        'Only every fifth state after the burn-in should be yielded.'
+    )
+    assert np.array_equal(lattice.history[1:], reference.history[15::5]), (
+        'Only every fifth state after the burn-in should be recorded.'
+    )
+    assert len(probe) == 5, 'Observers should only see recorded states.'
+
+    advanced = CoupledMapLattice(6, r=3.9, epsilon=0.4, seed=0, retention='none')
+    assert advanced.advance(30) is None, 'Advancing should not yield states.'
+    assert np.array_equal(advanced.state, reference.state), (
+        'Advancing should run the same updates.'
+    )
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import cmlattice
+from cmlattice.cli import main
+from cmlattice.viz import Visualization
+
+HEADLESS = (
+    'import sys\n'
+    'import cmlattice\n'
+    'import cmlattice.archive\n'
+    'import cmlattice.cache\n'
+    'import cmlattice.pipeline\n'
+    'import cmlattice.preview\n'
+    'import cmlattice.sweep\n'
+    "print(' '.join(sorted(sys.modules)))\n"
+)
+
+
+def test_headless_import():
+    """Test that the lattices import without the plotting libraries."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', HEADLESS],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set(result.stdout.split())
+    for name in ('matplotlib', 'PIL'):
+        assert name not in modules, f"Importing cmlattice should not load {name}."
+
+    # Cumulative import times in microseconds, excluding NumPy.
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            times[fields[2].strip()] = int(fields[1])
+    assert times['cmlattice'] - times['numpy'] < 500_000, (
+        'Importing cmlattice should take well under a second.'
+    )
+
+
+def test_lazy_attributes():
+    """Test that the visualization and CLI load on first use."""
+    assert cmlattice.Visualization is Visualization, 'Visualization should load lazily.'
+    assert cmlattice.main is main, 'The CLI should load lazily.'
+    assert {'Visualization', 'main'} <= set(dir(cmlattice)), (
+        'Lazy attributes should be listed.'
+    )
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from cmlattice import CoupledMapLattice
+from cmlattice import KanekoLattice
+from cmlattice import RulkovLattice
+from cmlattice.observers import Observer
+
+
+class Counter(Observer):
+    """Counts the steps it observes."""
+
+    def __init__(self):
+        self.planned = 0
+        self.times = []
+
+    def start(self, lattice, steps):
+        self.planned += steps
+
+    def __call__(self, lattice):
+        self.times.append(lattice.time)
+
+
+def test_instrumentation():
+    """Test step instrumentation and observers on every lattice class."""
+    lattices = [
+        CoupledMapLattice(8, r=3.9, epsilon=0.4),
+        KanekoLattice(8, r=1.5, epsilon=0.4),
+        RulkovLattice(8, 4.1, 0.01, 0.2, 0.5),
+    ]
+    for lattice in lattices:
+        counter = Counter()
+        lattice.add_observer(counter)
+        stats = lattice.instrument(window=4, track_memory=True)
+        list(lattice.simulate(6))
+        assert counter.planned == 6, 'Observers should be told about the run.'
+        assert counter.times == [1, 2, 3, 4, 5, 6], 'Observers should see every step.'
+
+        summary = stats.summary()
+        assert summary['steps'] == 6, 'Every update should be measured.'
+        assert summary['mean_kernel'] > 0 and summary['mean_history'] > 0, (
+            'Kernel and history time should be measured.'
+        )
+        assert summary['bytes'] > 0, 'Allocations should be traced.'
+        assert stats.rate > 0, 'The rolling rate should be reported.'
+        assert len(lattice.history) == 7, 'Measured updates should still record history.'
+
+        stats.close()
+        lattice.instrumentation = None
+        lattice.remove_observer(counter)
+        lattice.update()
+        assert len(stats.records) == 6, 'Disabled instrumentation should not measure.'
+        assert len(counter.times) == 6, 'Removed observers should not be called.'
+
+
+def test_instrumentation_bounded():
+    """Test that only the latest records are kept while the summary covers every update."""
+    lattice = CoupledMapLattice(8, r=3.9, epsilon=0.4, retention='none')
+    stats = lattice.instrument(keep=4)
+    lattice.advance(10)
+    assert len(stats.records) == 4, 'Only the latest records should be kept.'
+    assert stats.last == dict(zip(stats.FIELDS, stats.records[-1].tolist())), (
+        'The last record should be the latest update.'
+    )
+    summary = stats.summary()
+    assert summary['steps'] == 10, 'The summary should cover every update.'
+    assert summary['mean_wall'] > 0, 'Means should come from the running totals.'
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+from cmlattice import KanekoLattice
+from cmlattice import RulkovEnsemble
+from cmlattice import RulkovLattice
+from cmlattice.sweep import lyapunov_sweep
+from cmlattice.sweep import parameter_grid
+
+
+@pytest.mark.parametrize(
+    'lattice',
+    [
+        CoupledMapLattice(6, r=3.9, epsilon=0.4, seed=0),
+        CoupledMapLattice(6, r=3.9, epsilon=1, seed=0),
+        KanekoLattice(6, r=1.5, epsilon=0.4, seed=0),
+        RulkovLattice(6, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=0),
+        CoupledMapEnsemble(6, r=[3.7, 3.9], epsilon=[0.4, 1], seed=0),
+        RulkovEnsemble(6, r=[4.1, 4.3], mu=0.01, sigma=0.2, epsilon=[0.5, 1], seed=0),
+    ],
+)
+def test_tangent_matches_finite_differences(lattice):
+    """Test the analytic tangent map against central differences of a step."""
+    state = lattice.state
+    tangent = lattice.rng.standard_normal((2, *state.shape))
+    out = lattice._tangent(tangent, np.empty_like(tangent))
+
+    h = 1e-6
+    for v, jv in zip(tangent, out):
+        lattice.state = state + h * v
+        lattice._step()
+        forward = lattice.state
+        lattice.state = state - h * v
+        lattice._step()
+        backward = lattice.state
+        assert np.allclose((forward - backward) / (2 * h), jv, atol=1e-7), (
+            'The tangent map should match the derivative of a step.'
+        )
+
+
+def test_lyapunov():
+    """Test the exponents of known logistic maps, single and batched."""
+    lattice = CoupledMapLattice(4, r=4.0, seed=0)
+    exponents = lattice.lyapunov(4000, vectors=2, transient=100)
+    assert np.allclose(exponents, np.log(2), atol=0.01), (
+        'The uncoupled logistic map at r = 4 should have exponents of log 2.'
+    )
+    assert len(lattice.history) == 1, 'Estimating exponents should not record history.'
+    assert lattice.time == 4100, 'Estimating exponents should advance the time.'
+    reference = CoupledMapLattice(4, r=4.0, seed=0)
+    reference.advance(4100)
+    assert np.array_equal(lattice.state, reference.state), (
+        'The state should match the time of the lattice.'
+    )
+
+    grid = parameter_grid([3.2, 4.0], [0.4, 1.0])
+    results = lyapunov_sweep('cml', 4, 2000, grid, transient=200, workers=1)
+    assert results['lyapunov'].shape == (4, 1), 'Sweeps should keep one exponent per point.'
+    assert (results['lyapunov'][:2] < 0).all(), 'The periodic map should be stable.'
+    assert np.isclose(results['lyapunov'][3, 0], np.log(2), atol=0.01), (
+        'Each point should get its own exponent.'
+    )
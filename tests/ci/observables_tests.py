@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import numpy as np
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+
+
+def test_observables():
+    """Test that streaming observables match the post-processed history."""
+    lattice = CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=0)
+    observables = lattice.add_observables(bins=10, range=(0, 1))
+    list(lattice.simulate(50))
+    history = lattice.history
+    results = observables.results()
+
+    assert np.allclose(results['mean'], history.mean(axis=(1, 2))), (
+        'The mean field should match the history.'
+    )
+    assert np.allclose(results['variance'], history.var(axis=(1, 2))), (
+        'The spatial variance should match the history.'
+    )
+    sync = history.mean(axis=(1, 2)).var() / history.var(axis=0).mean()
+    assert np.isclose(results['sync'], sync), (
+        'The order parameter should match the history.'
+    )
+    counts, edges = np.histogram(history, bins=10, range=(0, 1))
+    assert np.array_equal(results['histogram'], counts), (
+        'The histogram should match the history.'
+    )
+    assert np.allclose(results['edges'], edges), 'The bin edges should match.'
+
+
+def test_observables_ensemble():
+    """Test observables without history, per ensemble member."""
+    ensemble = CoupledMapEnsemble(6, r=[3.7, 3.9], epsilon=0.4, retention='none', seed=2)
+    reference = CoupledMapEnsemble(6, r=[3.7, 3.9], epsilon=0.4, seed=2)
+    observables = ensemble.add_observables(('mean', 'sync', 'histogram'), bins=4)
+    list(ensemble.simulate(20))
+    list(reference.simulate(20))
+
+    assert len(ensemble.history) == 0, 'History should stay off.'
+    assert observables.mean.shape == (21, 2), 'The mean field should be per member.'
+    assert np.allclose(observables.mean, reference.history.mean(axis=(2, 3))), (
+        'The mean field of each member should match its history.'
+    )
+    assert observables.sync.shape == (2,), 'The order parameter should be per member.'
+    counts, _ = observables.histogram
+    assert counts.shape == (2, 4), 'The histogram should be per member.'
+    assert (counts.sum(axis=1) == 21 * 6 * 6).all(), 'Every value should be counted.'
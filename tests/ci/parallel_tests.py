@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapEnsemble
+from cmlattice import CoupledMapLattice
+from cmlattice import KanekoLattice
+from cmlattice import RulkovLattice
+
+
+class FailingLattice(CoupledMapLattice):
+    """A lattice whose update fails in the worker owning the last block."""
+
+    def _step(self) -> None:
+        if self._state.shape[-2] == 5:
+            raise ZeroDivisionError('boom')
+        super()._step()
+
+
+@pytest.mark.parametrize(
+    'make',
+    [
+        lambda: CoupledMapLattice(7, r=3.9, epsilon=0.4, seed=0),
+        lambda: CoupledMapLattice(7, r=3.9, epsilon=1, seed=0),
+        lambda: KanekoLattice(7, r=1.5, epsilon=0.4, seed=0, synchronous=True),
+        lambda: RulkovLattice(
+            7, r=4.1, mu=0.01, sigma=0.2, epsilon=0.5, seed=0, synchronous=True,
+        ),
+    ],
+)
+def test_decomposition_matches_single_process(make):
+    """Test that row blocks over worker processes give bit-identical results."""
+    reference = make()
+    states = list(reference.simulate(20, burn_in=3, every=4))
+
+    lattice = make()
+    probe = lattice.add_probe([(0, 0), (6, 3)])
+    with lattice.decompose(workers=3) as engine:
+        assert engine.blocks == [(0, 2), (2, 4), (4, 7)], 'Rows should be split evenly.'
+        recorded = list(engine.simulate(20, burn_in=3, every=4))
+        assert np.array_equal(np.array(recorded), states), (
+            'Recorded states should be bit-identical.'
+        )
+        engine.advance(5)
+    list(reference.simulate(5))
+    assert np.array_equal(lattice.state, reference.state), (
+        'The final state should be bit-identical.'
+    )
+    assert np.array_equal(lattice.history, reference.history), (
+        'The history should be bit-identical.'
+    )
+    assert lattice.time == reference.time, 'The time should advance.'
+    assert len(probe) == 11, 'Observers should see every recorded state.'
+
+    with pytest.raises(ValueError):
+        CoupledMapEnsemble(4, r=[3.7, 3.9]).decompose(2)
+    with pytest.raises(ValueError):
+        KanekoLattice(7, r=1.5, epsilon=0.4).decompose(2)
+
+
+def test_decomposition_errors():
+    """Test that a failing worker raises its error with the worker traceback."""
+    lattice = FailingLattice(7, r=3.9, epsilon=0.4, seed=0)
+    engine = lattice.decompose(workers=3)
+    with pytest.raises(ZeroDivisionError, match='boom') as raised:
+        engine.advance(5)
+    notes = ''.join(raised.value.__notes__)
+    assert 'in _step' in notes, 'The worker traceback should be attached.'
+    with pytest.raises(ValueError):
+        engine.advance(5)
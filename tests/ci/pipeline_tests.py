@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from cmlattice import CoupledMapLattice
+from cmlattice import load_history
+from cmlattice.observables import Observables
+from cmlattice.pipeline import GifWriter
+from cmlattice.pipeline import HistoryWriter
+from cmlattice.pipeline import Pipeline
+from cmlattice.pipeline import Reducer
+from cmlattice.pipeline import Stage
+from PIL import Image
+
+
+def test_pipeline(tmp_path):
+    """Test that pipeline stages consume every recorded frame in order."""
+    reference = CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=0)
+    list(reference.simulate(20))
+
+    lattice = CoupledMapLattice(8, r=3.9, epsilon=0.4, seed=0, retention='none')
+    observables = Observables((8, 8), ('mean',))
+    stages = [
+        HistoryWriter(tmp_path / 'history.npy'),
+        GifWriter(tmp_path / 'lattice.gif'),
+        Reducer(observables),
+    ]
+    with Pipeline(stages, maxsize=2) as pipeline:
+        pipeline.attach(lattice)
+        lattice.advance(20)
+    assert pipeline.count == 21, 'The pipeline should see the initial and recorded states.'
+    assert pipeline not in lattice._observers, 'Closing should detach the pipeline.'
+    assert np.array_equal(load_history(tmp_path / 'history.npy'), reference.history), (
+        'The history writer should write every frame.'
+    )
+    assert np.allclose(observables.mean, reference.history.mean(axis=(1, 2))), (
+        'Reducers should record every frame.'
+    )
+    with Image.open(tmp_path / 'lattice.gif') as gif:
+        assert gif.size == (8, 8), 'The GIF should be written.'
+
+
+def test_pipeline_errors():
+    """Test that a failing stage neither blocks the simulation nor goes unnoticed."""
+    class Failing(Stage):
+        def consume(self, frame):
+            raise RuntimeError('stage failed')
+
+    lattice = CoupledMapLattice(4, r=3.9, retention='none')
+    pipeline = Pipeline([Failing(), Stage()], maxsize=1)
+    pipeline.attach(lattice)
+    with pytest.raises(RuntimeError) as raised:
+        lattice.advance(10_000)
+    assert lattice.time < 10_000, 'A failing stage should stop the simulation.'
+    assert any(entry.name == 'consume' for entry in raised.traceback), (
+        'The error should keep the traceback of the stage.'
+    )
+    with pytest.raises(RuntimeError):
+        pipeline.close()
+    with pytest.raises(RuntimeError):
+        pipeline.push(lattice.state)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import numpy as np
+from cmlattice import CoupledMapLattice
+from cmlattice import Visualization
+from cmlattice.preview import pool
+from cmlattice.preview import pyramid
+from PIL import Image
+
+
+def test_pool():
+    """Test pooling blocks of sites, including the ragged edge blocks."""
+    frames = np.random.default_rng(0).random((2, 10, 11))
+    blocks = [
+        [frames[:, i:i + 3, j:j + 3] for j in range(0, 11, 3)]
+        for i in range(0, 10, 3)
+    ]
+    means = np.array([[block.mean(axis=(1, 2)) for block in row] for row in blocks])
+    maxima = np.array([[block.max(axis=(1, 2)) for block in row] for row in blocks])
+    assert np.allclose(pool(frames, 3), means.transpose(2, 0, 1)), (
+        'Blocks should be pooled to their means.'
+    )
+    assert np.array_equal(pool(frames, 3, 'max'), maxima.transpose(2, 0, 1)), (
+        'Blocks should be pooled to their maxima.'
+    )
+
+    levels = pyramid(frames[0])
+    assert [level.shape for level in levels] == [(10, 11), (5, 6), (3, 3), (2, 2), (1, 1)], (
+        'Every level should halve the size of the one below it.'
+    )
+    assert np.allclose(levels[2], pool(frames[0], 4)), 'Levels should match direct pooling.'
+    assert np.isclose(levels[-1][0, 0], frames[0].mean()), 'The top should be the mean.'
+
+
+def test_preview():
+    """Test recording and rendering a downsampled stream of a large lattice."""
+    lattice = CoupledMapLattice(64, r=3.9, epsilon=0.4, retention='none', seed=0)
+    preview = lattice.add_preview(16, every=2)
+    reference = CoupledMapLattice(64, r=3.9, epsilon=0.4, seed=0)
+    lattice.advance(9)
+    reference.advance(9)
+    assert preview.factor == 4, 'The lattice should be pooled by blocks of 4 sites.'
+    assert np.allclose(preview.frames, pool(reference.history[::2], 4)), (
+        'The preview should hold every second pooled state.'
+    )
+
+
+def test_render_resolution(tmp_path):
+    """Test that rendering pools frames down to the requested resolution."""
+    history = np.random.default_rng(0).random((3, 40, 40))
+    path = Visualization(history, resolution=16, reduce='max').render(tmp_path / 'out.gif')
+    with Image.open(path) as gif:
+        assert gif.size == (14, 14), 'Frames should be pooled by blocks of 3 sites.'
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import numpy as np
+from cmlattice import CoupledMapLattice
+from cmlattice import Visualization
+from cmlattice.render import FrameEncoder
+from PIL import Image
+
+
+def test_encoder_indices():
+    """Test that frames map onto the colour table by value."""
+    encoder = FrameEncoder(vmin=0, vmax=1, scale=2)
+    frames = np.array([[[0.0, 0.5], [np.nan, 1.0]]])
+    indices = encoder.indices(frames)
+    assert indices.shape == (1, 4, 4), 'Frames should be scaled up.'
+    assert indices[0, ::2, ::2].tolist() == [[0, 128], [0, 255]], (
+        'Values should map linearly onto the colour table.'
+    )
+    assert np.array_equal(encoder.rgb(frames)[0, 0, 0], encoder.lut[0]), (
+        'Colours should come from the lookup table.'
+    )
+
+
+def test_render(tmp_path):
+    """Test writing a history as a GIF and as PNG files."""
+    lattice = CoupledMapLattice(6, r=3.9, epsilon=0.4)
+    list(lattice.simulate(9))
+    viz = Visualization(lattice)
+
+    path = viz.render(tmp_path / 'lattice.gif', scale=3, workers=2)
+    with Image.open(path) as gif:
+        assert gif.n_frames == 10, 'The GIF should hold one frame per state.'
+        assert gif.size == (18, 18), 'The GIF should be scaled up.'
+
+    directory = viz.render(tmp_path / 'frames', fmt='png')
+    assert len(list((tmp_path / 'frames').iterdir())) == 10, (
+        'There should be one PNG per state.'
+    )
+    assert directory == str(tmp_path / 'frames'), 'The output path should be returned.'
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import numpy as np
+from cmlattice import CoupledMapLattice
+from cmlattice import RulkovLattice
+from cmlattice.sweep import parameter_grid
+from cmlattice.sweep import save_sweep
+from cmlattice.sweep import sweep
+
+
+def test_sweep(tmp_path):
+    """Test that a sweep matches single lattices run from the same seeds."""
+    grid = parameter_grid([3.6, 3.9], [0.3, 1.0], seeds=[0, 1])
+    results = sweep('cml', 6, 10, grid, workers=2, chunk_size=3)
+    assert results['final'].shape == (8, 6, 6), 'Sweep should keep one final state per point.'
+    assert results['mean'].shape == (8, 11), 'Sweep should keep one mean per step.'
+
+    for k in (0, 5):
+        lattice = CoupledMapLattice(6, results['r'][k], results['epsilon'][k])
+        lattice.state = np.random.default_rng(results['seed'][k]).uniform(0, 1, (6, 6))
+        lattice.history = [lattice.state]
+        list(lattice.simulate(10))
+        assert np.array_equal(results['final'][k], lattice.state), (
+            'Sweep results should match a single lattice.'
+        )
+        assert np.allclose(results['mean'][k], lattice.history.mean(axis=(1, 2))), (
+            'Sweep means should match the lattice history.'
+        )
+
+    save_sweep(tmp_path / 'sweep.npz', results)
+    with np.load(tmp_path / 'sweep.npz') as saved:
+        assert np.array_equal(saved['final'], results['final']), (
+            'Saved results should round-trip.'
+        )
+
+
+def test_sweep_rulkov():
+    """Test a Rulkov sweep, which records the x component."""
+    grid = parameter_grid(4.1, [0.5, 1.0], mu=0.01, sigma=[0.1, 0.2])
+    results = sweep('rulkov', 5, 4, grid, workers=1)
+    lattice = RulkovLattice(5, 4.1, 0.01, 0.2, 1.0)
+    lattice.state = np.random.default_rng(0).uniform(0, 1, (2, 5, 5))
+    list(lattice.simulate(4))
+    assert np.array_equal(results['final'][-1], lattice.state[0]), (
+        'Rulkov sweeps should return the final x component.'
+    )